@@ -0,0 +1,263 @@
+"""
+Local stand-ins for the services the actions talk to, for offline benchmarks.
+
+- FakeOpenAI: an OpenAI-compatible server for chat completions (plain and streamed)
+  and the responses API image_generation tool, returning a canned base64 PNG.
+  Latency per call is configurable.
+- FakeLinkedIn: serves benchmarks/fixtures/linkedin_post.html for any /feed/update/
+  URL and accepts the comment-create request the replica's composer sends.
+
+Both run on a background thread on 127.0.0.1 and count the requests they served.
+
+Usage (standalone, e.g. to point a dev action server at it):
+    python benchmarks/fakes.py [--port 8099] [--chat-latency-ms 300] [--image-latency-ms 1500]
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=fake action-server start
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POST_FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "linkedin_post.html")
+
+_TOPICS = ["pipelines", "clusters", "dashboards", "caches", "benchmarks", "queues", "containers", "runners"]
+
+
+def canned_caption(prompt: str) -> str:
+    """
+    A deterministic caption per prompt, so different posts get different captions.
+    """
+    topic = _TOPICS[int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(_TOPICS)]
+    return f"YO DAWG, I heard you like {topic}|||so I put {topic} in your {topic} so you ship while you ship!"
+
+
+def canned_png(width: int = 1024, height: int = 1536) -> bytes:
+    """
+    A noisy gradient PNG with the dimensions (and roughly the weight) of a generated image.
+    """
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 48)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.FLIP_TOP_BOTTOM)))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+class _Server:
+    def __init__(self, handler_class, port: int = 0):
+        handler = type(handler_class.__name__, (handler_class,), {"owner": self})
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def count(self, name: str):
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    owner = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self):
+        request = self._read_json()
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            self.owner.count("chat")
+            return self._chat(request)
+        if self.path.rstrip("/").endswith("/responses"):
+            self.owner.count("image")
+            return self._image(request)
+        self._send(404, b'{"error": {"message": "not found"}}')
+
+    def _prompt(self, request: dict) -> str:
+        messages = request.get("messages") or []
+        return str(messages[-1].get("content", "")) if messages else str(request.get("input", ""))
+
+    def _chat(self, request: dict):
+        caption = canned_caption(self._prompt(request))
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", "fake")
+        if not request.get("stream"):
+            time.sleep(self.owner.chat_latency)
+            body = {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": caption}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 200, "completion_tokens": 24, "total_tokens": 224},
+            }
+            return self._send(200, json.dumps(body).encode("utf-8"))
+
+        # Streamed: the same total latency, spread over word-sized chunks
+        pieces = [word + " " for word in caption.split(" ")]
+        pieces[-1] = pieces[-1].rstrip() + "\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        delay = self.owner.chat_latency / (len(pieces) + 1)
+        try:
+            for piece in pieces + [None]:
+                time.sleep(delay)
+                delta = {"content": piece} if piece is not None else {}
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None if piece is not None else "stop"}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading once the caption was complete
+
+    def _image(self, request: dict):
+        time.sleep(self.owner.image_latency)
+        body = {
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": request.get("model", "fake"),
+            "output": [
+                {
+                    "id": f"ig_{uuid.uuid4().hex[:12]}",
+                    "type": "image_generation_call",
+                    "status": "completed",
+                    "result": self.owner.image_base64,
+                }
+            ],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [{"type": "image_generation"}],
+        }
+        self._send(200, json.dumps(body).encode("utf-8"))
+
+
+class FakeOpenAI(_Server):
+    """
+    OpenAI-compatible fake; point clients at fake.base_url + '/v1'.
+    :param chat_latency_ms: Time to a full chat completion (streamed ones spread it over the chunks).
+    :param image_latency_ms: Time to an image_generation response.
+    """
+
+    def __init__(self, port: int = 0, chat_latency_ms: float = 300, image_latency_ms: float = 1500, image_png=None):
+        super().__init__(_OpenAIHandler, port)
+        self.chat_latency = chat_latency_ms / 1000.0
+        self.image_latency = image_latency_ms / 1000.0
+        self.image_base64 = base64.b64encode(image_png or canned_png()).decode("ascii")
+
+
+class _LinkedInHandler(_Handler):
+    def do_GET(self):
+        if self.path.startswith("/feed/update/"):
+            self.owner.count("post_page")
+            time.sleep(self.owner.latency)
+            return self._send(200, self.owner.page, "text/html; charset=utf-8")
+        self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        self._read_json()
+        if self.path.startswith("/voyager/api/") and "comment" in self.path:
+            self.owner.count("comment_create")
+            time.sleep(self.owner.latency)
+            return self._send(201, b'{"created": true}')
+        self._send(404, b"not found", "text/plain")
+
+
+class FakeLinkedIn(_Server):
+    """
+    Serves the post page replica for post_url(n) and accepts comments posted from it.
+    :param latency_ms: Added to every page load and comment create.
+    """
+
+    def __init__(self, port: int = 0, latency_ms: float = 50, fixture: str = POST_FIXTURE):
+        super().__init__(_LinkedInHandler, port)
+        self.latency = latency_ms / 1000.0
+        with open(fixture, "rb") as f:
+            self.page = f.read()
+
+    def post_url(self, n: int) -> str:
+        return f"{self.base_url}/feed/update/urn:li:activity:{7000000000000000000 + n}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--linkedin-port", type=int, default=8098)
+    parser.add_argument("--chat-latency-ms", type=float, default=300)
+    parser.add_argument("--image-latency-ms", type=float, default=1500)
+    args = parser.parse_args()
+    with FakeOpenAI(args.port, args.chat_latency_ms, args.image_latency_ms) as openai_fake, \
+            FakeLinkedIn(args.linkedin_port) as linkedin_fake:
+        print(f"Fake OpenAI at {openai_fake.base_url}/v1, LinkedIn replica at {linkedin_fake.post_url(0)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-import budget check for the action package.
+
+Imports src/yodawg/yo-dog-actions.py in fresh interpreters under `python -X importtime`
+and reports the median wall-clock import time of the module, the heaviest imports, and
+which deferred dependencies were loaded anyway. Fails (exit 1) when the median exceeds
+the budget or a dependency that should load on first use was imported up front.
+
+Usage:
+    python benchmarks/import_budget.py [--runs 5] [--budget-ms 250] [--top 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "yodawg.yo-dog-actions"
+
+# Heavy dependencies that must not load until an action actually needs them
+DEFERRED = ["openai", "httpx", "PIL", "playwright", "robocorp.browser"]
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Wall-clock timing: importtime lines stop once sema4ai.actions swaps sys.stderr, so the
+# module's own cumulative line is never printed; they still give the per-dependency breakdown.
+_PROBE = (
+    "import importlib, sys, time; start = time.perf_counter(); importlib.import_module({module!r}); "
+    "print('MS:%.3f' % ((time.perf_counter() - start) * 1000)); "
+    "print('LOADED:' + ','.join(m for m in {deferred!r} if m in sys.modules))"
+)
+
+
+def run_once():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.join(ROOT, "src") + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("YODAWG_QUEUE_AUTOSTART", "false")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=MODULE, deferred=DEFERRED)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Import failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((int(match[2]), int(match[1]), len(match[3]), match[4]))
+    output = dict(line.split(":", 1) for line in proc.stdout.splitlines() if line.startswith(("MS:", "LOADED:")))
+    loaded = [m for m in output.get("LOADED", "").split(",") if m]
+    return float(output["MS"]), rows, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("YODAWG_IMPORT_BUDGET_MS") or 250))
+    parser.add_argument("--top", type=int, default=10, help="Show the N heaviest top-level imports")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total_ms, rows, loaded = run_once()
+        totals.append(total_ms)
+    median = statistics.median(totals)
+
+    print(f"{MODULE}: median {median:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Heaviest top-level imports (cumulative ms):")
+    direct = sorted((r for r in rows if r[2] <= 2 and r[3] != "site" and r[3] not in sys.builtin_module_names), reverse=True)
+    for cumulative_us, _, _, name in direct[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: deferred dependencies imported at startup: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: cold import {median:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+Offline throughput benchmark for the meme paths, with no OpenAI or LinkedIn traffic.
+
+Starts the local fakes from benchmarks/fakes.py (an OpenAI-compatible server with
+configurable latency, and a LinkedIn post replica with a working comment composer),
+points the action package at them, and calls the real action functions:
+
+- quote:   generate_yo_dawg_quote_only
+- overlay: batch_overlay_yo_dawg_captions (one ready-made caption, rendered inline)
+- poor:    poor_mans_yo_dawg_comment (caption + template overlay)
+- rich:    rich_mans_yo_dawg_comment (caption + generated image)
+
+By default poor/rich run on custom context only. With --browser (needs an installed
+Playwright Chromium) they open, scrape and comment on the replica post page instead.
+
+Reports p50/p95 latency and memes/sec per path, per-step p50s from the action trace,
+and per-meme file I/O (files opened for reading/writing, bytes written to the image
+store) and memory (process RSS high-water mark; with --memory also the peak traced
+Python allocation per path, which slows the runs down). It writes the results as JSON (default benchmarks/results/offline-<commit>.json)
+so runs can be diffed between commits; --compare prints the change against an earlier file.
+Caches are off unless --caches is given, so every run pays for its model calls.
+
+Usage:
+    python benchmarks/offline_suite.py [--runs 10] [--paths quote,overlay,poor,rich]
+        [--chat-latency-ms 300] [--image-latency-ms 1500] [--concurrency 1]
+        [--browser] [--caches] [--persist async] [--memory] [--output FILE] [--compare FILE]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fakes import FakeLinkedIn, FakeOpenAI, canned_caption  # noqa: E402
+
+PATHS = ["quote", "overlay", "poor", "rich"]
+MODEL = "gpt-4o-mini"
+POST_TEXT = (
+    "We just moved our entire CI to self-hosted runners on a Raspberry Pi k3s cluster. "
+    "Build times dropped 40% and the electricity bill is a rounding error."
+)
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile (no interpolation, so small samples report a real observation).
+    """
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def make_call(actions, path, linkedin, browser):
+    def call(i):
+        content = f"{POST_TEXT} (run {i})"
+        if path == "quote":
+            return actions.generate_yo_dawg_quote_only(yo_dawg_content=content, model=MODEL)
+        if path == "overlay":
+            return actions.batch_overlay_yo_dawg_captions(captions=[canned_caption(content)], max_workers=1)
+        target = {"post_url": linkedin.post_url(i)} if browser else {"custom_context": content}
+        if path == "poor":
+            return actions.poor_mans_yo_dawg_comment(model=MODEL, **target)
+        return actions.rich_mans_yo_dawg_comment(model=MODEL, **target)
+
+    return call
+
+
+class FileOpens:
+    """
+    Counts files opened under a directory, by read/write mode, through Python's audit hooks.
+    SQLite and Chromium file access is not included.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.reads = 0
+        self.writes = 0
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        if event != "open" or not isinstance(args[0], str) or not os.path.abspath(args[0]).startswith(self.root):
+            return
+        mode = args[1] or "r"
+        if any(c in mode for c in "wax+"):
+            self.writes += 1
+        else:
+            self.reads += 1
+
+    def snapshot(self):
+        return self.reads, self.writes
+
+
+def rss_high_water_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def read_trace(trace_path, offset):
+    if not os.path.exists(trace_path):
+        return [], offset
+    with open(trace_path, encoding="utf-8") as f:
+        f.seek(offset)
+        records = [json.loads(line) for line in f if line.strip()]
+        return records, f.tell()
+
+
+def step_p50s(records):
+    steps = {}
+    for record in records:
+        totals = {}
+        for span in record.get("spans", []):
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["seconds"]
+        for name, seconds in totals.items():
+            steps.setdefault(name, []).append(seconds)
+    return {name: round(statistics.median(values) * 1000, 1) for name, values in sorted(steps.items())}
+
+
+def run_path(actions, path, args, openai_fake, linkedin_fake, trace_path, trace_offset, file_opens):
+    from yodawg.image_store import get_image_store
+    from yodawg.telemetry import get_telemetry
+
+    store = get_image_store()
+    telemetry = get_telemetry()
+    call = make_call(actions, path, linkedin_fake, args.browser)
+    for i in range(args.warmup):
+        call(-1 - i)
+    store.flush()
+    telemetry.flush()
+    _, trace_offset = read_trace(trace_path, trace_offset)
+    requests_before = dict(openai_fake.requests)
+    opens_before = file_opens.snapshot()
+    store_bytes_before = store.bytes_written
+    if args.memory:
+        tracemalloc.reset_peak()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            call(i)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    # Playwright's sync API is thread-bound, so browser paths always run sequentially
+    concurrency = 1 if args.browser and path in ("poor", "rich") else args.concurrency
+    wall_start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(args.runs):
+            timed(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(timed, range(args.runs)))
+    wall = time.perf_counter() - wall_start
+    # Background meme writes still running after the last call are part of this path's I/O
+    flush_start = time.perf_counter()
+    store.flush()
+    flush = time.perf_counter() - flush_start
+    reads, writes = (now - before for now, before in zip(file_opens.snapshot(), opens_before))
+
+    telemetry.flush()
+    records, trace_offset = read_trace(trace_path, trace_offset)
+    calls = {k: v - requests_before.get(k, 0) for k, v in openai_fake.requests.items()}
+    result = {
+        "runs": args.runs,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        "memes_per_sec": round(len(latencies) / wall, 3) if wall else 0.0,
+        "wall_seconds": round(wall, 3),
+        "model_calls_per_meme": {k: round(v / args.runs, 2) for k, v in sorted(calls.items()) if v},
+        "steps_p50_ms": step_p50s(records),
+        "io_per_meme": {
+            "file_reads": round(reads / args.runs, 2),
+            "file_writes": round(writes / args.runs, 2),
+            "image_store_bytes_written": round((store.bytes_written - store_bytes_before) / args.runs),
+        },
+        "persist_flush_ms": round(flush * 1000, 1),
+        "rss_high_water_mb": rss_high_water_mb(),
+    }
+    if args.memory:
+        result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    if errors:
+        result["first_error"] = errors[0]
+    return result, trace_offset
+
+
+def compare(previous_path, results):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nChange vs {previous.get('commit', '?')} ({previous_path}):")
+    for path, now in results["paths"].items():
+        before = previous.get("paths", {}).get(path)
+        if not before or not before.get("p50_ms") or not now.get("p50_ms"):
+            continue
+        print(
+            f"  {path:8s} p50 {now['p50_ms'] - before['p50_ms']:+8.1f} ms "
+            f"({(now['p50_ms'] / before['p50_ms'] - 1) * 100:+.1f}%), "
+            f"memes/sec {now['memes_per_sec'] - before['memes_per_sec']:+.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per path")
+    parser.add_argument("--paths", default=",".join(PATHS), help=f"Comma-separated subset of {','.join(PATHS)}")
+    parser.add_argument("--chat-latency-ms", type=float, default=300)
+    parser.add_argument("--image-latency-ms", type=float, default=1500)
+    parser.add_argument("--linkedin-latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent calls per path")
+    parser.add_argument("--browser", action="store_true", help="Comment on the LinkedIn replica in Chromium")
+    parser.add_argument("--caches", action="store_true", help="Keep the caption/image/post caches on")
+    parser.add_argument("--persist", choices=["sync", "async", "off"], help="YODAWG_IMAGE_PERSIST for the run")
+    parser.add_argument("--memory", action="store_true", help="Trace Python allocations for a per-path peak")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/offline-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to diff against")
+    args = parser.parse_args()
+
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    unknown = sorted(set(paths) - set(PATHS))
+    if unknown:
+        parser.error(f"unknown paths: {', '.join(unknown)}")
+    commit, dirty = git_commit()
+    output = os.path.abspath(args.output or os.path.join(ROOT, "benchmarks", "results", f"offline-{commit}.json"))
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = tempfile.mkdtemp(prefix="yodawg-bench-")
+    with FakeOpenAI(chat_latency_ms=args.chat_latency_ms, image_latency_ms=args.image_latency_ms) as openai_fake, \
+            FakeLinkedIn(latency_ms=args.linkedin_latency_ms) as linkedin_fake:
+        os.environ.update({
+            "OPENAI_BASE_URL": f"{openai_fake.base_url}/v1",
+            "OPENAI_API_KEY": "offline-benchmark",
+            "YODAWG_CACHE_DIR": os.path.join(workdir, "cache"),
+            "YODAWG_QUEUE_AUTOSTART": "false",
+            "YODAWG_POST_RATE_PER_MINUTE": "100000",
+            "YODAWG_POST_BURST": "100000",
+            "LINKEDIN_USERNAME": "offline@example.com",
+            "LINKEDIN_PASSWORD": "offline",
+        })
+        if not args.caches:
+            for name in ("YODAWG_CAPTION_CACHE_ENABLED", "YODAWG_IMAGE_CACHE_ENABLED", "YODAWG_POST_CACHE_ENABLED"):
+                os.environ[name] = "false"
+        if args.persist:
+            os.environ["YODAWG_IMAGE_PERSIST"] = args.persist
+        # Generated images land in <workdir>/yo-dawg-images rather than the repo
+        os.chdir(workdir)
+        file_opens = FileOpens(os.path.realpath(workdir))
+        if args.memory:
+            tracemalloc.start()
+        actions = importlib.import_module("yodawg.yo-dog-actions")
+        from yodawg.telemetry import get_telemetry
+
+        trace_path = get_telemetry().trace_path
+        trace_offset = 0
+        results = {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                "runs": args.runs,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "chat_latency_ms": args.chat_latency_ms,
+                "image_latency_ms": args.image_latency_ms,
+                "linkedin_latency_ms": args.linkedin_latency_ms,
+                "browser": args.browser,
+                "caches": args.caches,
+                "persist": os.getenv("YODAWG_IMAGE_PERSIST") or "async",
+                "memory": args.memory,
+            },
+            "paths": {},
+        }
+        for path in paths:
+            result, trace_offset = run_path(
+                actions, path, args, openai_fake, linkedin_fake, trace_path, trace_offset, file_opens
+            )
+            results["paths"][path] = result
+            print(
+                f"{path:8s} p50 {result['p50_ms'] or 0:8.1f} ms  p95 {result['p95_ms'] or 0:8.1f} ms  "
+                f"{result['memes_per_sec']:6.2f} memes/sec  errors {result['errors']}"
+            )
+            io = result["io_per_meme"]
+            memory = f", peak traced {result['peak_traced_mb']} MB" if args.memory else ""
+            print(
+                f"         per meme: {io['file_reads']} file reads, {io['file_writes']} file writes, "
+                f"{io['image_store_bytes_written']} bytes stored; RSS high water {result['rss_high_water_mb']} MB{memory}"
+            )
+            if result.get("first_error"):
+                print(f"         first error: {result['first_error']}")
+        if args.browser:
+            actions.get_browser_session().close()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Results written to {output}")
+    if compare_path:
+        compare(compare_path, results)
+    return 1 if any(r["errors"] for r in results["paths"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
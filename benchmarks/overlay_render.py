@@ -0,0 +1,80 @@
+"""
+Static overlay render benchmark.
+
+Renders a set of captions onto the static template twice: once with the legacy
+outline (the text stamped in black at every offset of a 9x9 grid, then in white)
+and once with the current single-pass stroked renderer, and reports the per-image
+render time of both. Output correctness against the baseline renderer is covered by
+the golden-image test (tests/test_overlay_golden.py).
+
+Usage:
+    python benchmarks/overlay_render.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from yodawg import image_generation  # noqa: E402
+from yodawg.encoding import EncodeSettings  # noqa: E402
+from yodawg.image_generation import render_static_overlay  # noqa: E402
+
+TEMPLATE = os.path.join(ROOT, "templates", "GtGTtP_WIAAHKqP.jpg")
+
+CAPTIONS = [
+    "YO DAWG, I heard you like pipelines|||so I put a deploy in your deploy so you ship while you ship!",
+    "YO DAWG, I heard you like tiny clusters|||so I put a Pi in your k8s so you kube while you kube!",
+    "YO DAWG, I heard you like infra code|||so I put HCL in your HCL so you plan while you apply!",
+    "YO DAWG|||so I put a meme in your meme",
+]
+
+# Fast lossless encode, so the timings are dominated by rendering
+LOSSLESS = EncodeSettings(format="png", compress_level=1)
+
+
+def legacy_outlined_text(draw, xy, text, font, outline_width=image_generation.OUTLINE_WIDTH):
+    x, y = xy
+    for ox in range(-outline_width, outline_width + 1):
+        for oy in range(-outline_width, outline_width + 1):
+            draw.text((x + ox, y + oy), text, font=font, fill="black")
+    draw.text((x, y), text, font=font, fill="white")
+
+
+def render_all(out_dir, runs):
+    timings = []
+    for _ in range(runs):
+        for i, caption in enumerate(CAPTIONS):
+            start = time.perf_counter()
+            render_static_overlay(caption, TEMPLATE, os.path.join(out_dir, f"{i}.png"), encode_settings=LOSSLESS)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    stroked = image_generation.draw_stroked_text
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as current_dir:
+        image_generation.draw_stroked_text = legacy_outlined_text
+        try:
+            render_all(legacy_dir, 1)  # warm fonts and layouts
+            legacy = render_all(legacy_dir, args.runs)
+        finally:
+            image_generation.draw_stroked_text = stroked
+        current = render_all(current_dir, args.runs)
+
+        print(f"legacy 9x9 outline : median {statistics.median(legacy) * 1000:8.1f} ms/image")
+        print(f"single-pass stroke : median {statistics.median(current) * 1000:8.1f} ms/image")
+        print(f"speedup            : {statistics.median(legacy) / statistics.median(current):8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Post content extraction benchmark against saved HTML snapshots.
+
+Runs the single-pass extractor over each snapshot in benchmarks/fixtures (or the
+files given), reporting the matched strategy and median latency with the built-in
+selector order (cold) and after the extractor has learned which selector wins (warm).
+
+With --browser (needs an installed Playwright Chromium) each snapshot is also loaded
+into a real page to compare the legacy one-locator-per-selector chain against the
+single in-page evaluation.
+
+Usage:
+    python benchmarks/post_extraction.py [--runs 50] [--browser] [snapshot.html ...]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from yodawg.post_content import PostContentExtractor  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+LEGACY_SELECTORS = [
+    ".update-components-text",
+    "[data-test-id='main-feed-activity-card'] .feed-shared-text",
+    ".feed-shared-text",
+]
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def bench_offline(path, runs):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    cold = []
+    for _ in range(runs):
+        result = PostContentExtractor().extract_html(html)
+        cold.append(result.seconds)
+    extractor = PostContentExtractor()
+    extractor.extract_html(html)  # learn the winning selector
+    warm = [extractor.extract_html(html).seconds for _ in range(runs)]
+    return result, median_ms(cold), median_ms(warm)
+
+
+def legacy_extract(page):
+    for selector in LEGACY_SELECTORS:
+        try:
+            return page.locator(selector).first.inner_text()
+        except Exception:
+            continue
+    return "this post"
+
+
+def bench_browser(paths, runs):
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        page.set_default_timeout(2000)  # legacy misses each wait out this timeout
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                page.set_content(f.read())
+            extractor = PostContentExtractor()
+            legacy, single = [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                legacy_extract(page)
+                legacy.append(time.perf_counter() - start)
+                single.append(extractor.extract(page, timeout=2000).seconds)
+            print(
+                f"{os.path.basename(path)} [browser]: legacy {median_ms(legacy):.1f} ms, "
+                f"single-pass {median_ms(single):.1f} ms ({extractor.last.strategy})"
+            )
+        browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshots", nargs="*", help="HTML snapshots (default: benchmarks/fixtures/*.html)")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--browser", action="store_true", help="Also compare against the legacy chain in Chromium")
+    args = parser.parse_args()
+
+    paths = args.snapshots or sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+    failed = False
+    for path in paths:
+        result, cold, warm = bench_offline(path, args.runs)
+        preview = result.text.splitlines()[0][:60] if result.text else ""
+        print(
+            f"{os.path.basename(path)}: strategy={result.strategy or 'fallback'} "
+            f"cold {cold:.2f} ms, warm {warm:.2f} ms, text='{preview}'"
+        )
+        failed = failed or not result.matched
+    if args.browser:
+        bench_browser(paths, max(1, args.runs // 10))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
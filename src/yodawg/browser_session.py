@@ -0,0 +1,293 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+LINKEDIN_LOGIN_URL = "https://www.linkedin.com/login"
+
+
+def _robocorp_browsers_path() -> str:
+    # Where robocorp.browser.install() puts browsers (outside an isolated environment)
+    if os.name == "nt":
+        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "robocorp", "playwright")
+    return os.path.join(os.path.expanduser("~"), ".robocorp", "playwright")
+
+
+def _is_authenticated(page) -> bool:
+    # Try to find an element that only appears when logged in, e.g., the profile avatar or "Me" menu
+    try:
+        # This selector may need adjustment based on LinkedIn's DOM
+        page.get_by_role("navigation").get_by_text("Me", exact=True).first.wait_for(timeout=3000)
+        return True
+    except Exception:
+        return False
+
+
+class BrowserSession:
+    """
+    Keeps one authenticated persistent browser context warm across actions and
+    hands out pages from a small pre-opened pool. The context is recycled after
+    a number of uses, after repeated failures, or when the headless mode changes.
+
+    Playwright's sync API is bound to the thread that started it, so a session
+    must only be used from the thread that created it.
+
+    Environment variables:
+    - YODAWG_BROWSER_PAGE_POOL: pages kept open and ready (default: 2)
+    - YODAWG_BROWSER_SESSION_MAX_USES: page checkouts before the context is recycled (default: 50)
+    - YODAWG_BROWSER_SESSION_MAX_FAILURES: failed checkouts before the context is recycled (default: 3)
+    """
+
+    def __init__(self, context_directory: Optional[str] = None):
+        self.context_directory = context_directory or os.path.join(os.getcwd(), "browser_context")
+        self.pool_size = int(os.getenv("YODAWG_BROWSER_PAGE_POOL") or 2)
+        self.max_uses = int(os.getenv("YODAWG_BROWSER_SESSION_MAX_USES") or 50)
+        self.max_failures = int(os.getenv("YODAWG_BROWSER_SESSION_MAX_FAILURES") or 3)
+        self.headless = True
+        self.uses = 0
+        self.failures = 0
+        self.launches = 0
+        self.logins = 0
+        self.checked_out = 0
+        self._playwright = None
+        self._context = None
+        self._idle: List = []
+        self._context_hooks: List = []
+        self._release_hooks: List = []
+        self._owner = threading.get_ident()
+
+    def configure(self, headless: bool = True):
+        """
+        Set the headless mode; a live context in the other mode is recycled on next use.
+        """
+        if self._context is not None and headless != self.headless:
+            self.close()
+        self.headless = headless
+
+    def add_context_hook(self, hook):
+        """
+        Register a callable(context) run on every freshly launched context (e.g. request routing).
+        """
+        if hook in self._context_hooks:
+            return
+        self._context_hooks.append(hook)
+        if self._context is not None:
+            hook(self._context)
+
+    def add_release_hook(self, hook):
+        """
+        Register a callable(page) run whenever a page is handed back to the pool.
+        """
+        if hook not in self._release_hooks:
+            self._release_hooks.append(hook)
+
+    @property
+    def context(self):
+        self._ensure_context()
+        return self._context
+
+    def _alive(self) -> bool:
+        if self._context is None:
+            return False
+        try:
+            self._context.pages  # raises once the browser is gone
+            return True
+        except Exception:
+            return False
+
+    def _ensure_context(self):
+        if threading.get_ident() != self._owner:
+            raise RuntimeError("BrowserSession must be used from the thread that created it.")
+        if self._alive() and (
+            (self.uses < self.max_uses and self.failures < self.max_failures)
+            # Never recycle under pages that other tabs are still using
+            or self.checked_out
+        ):
+            return
+        if self._context is not None:
+            print(f"Recycling browser context (uses={self.uses}, failures={self.failures}).")
+            self.close()
+        self._launch()
+
+    def _launch(self):
+        from playwright.sync_api import Error, sync_playwright
+
+        # Use the same browser install location as robocorp.browser
+        os.environ.setdefault("PLAYWRIGHT_BROWSERS_PATH", _robocorp_browsers_path())
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        try:
+            self._context = self._playwright.chromium.launch_persistent_context(
+                self.context_directory, headless=self.headless
+            )
+        except Error as e:
+            if "executable doesn't exist" not in str(e).lower():
+                raise
+            from robocorp import browser
+
+            print("Chromium is not installed; installing it with robocorp.browser.")
+            browser.install("chromium")
+            self._context = self._playwright.chromium.launch_persistent_context(
+                self.context_directory, headless=self.headless
+            )
+        self.launches += 1
+        self.uses = 0
+        self.failures = 0
+        for hook in self._context_hooks:
+            hook(self._context)
+        # The persistent context opens with a blank page; keep it plus fresh ones ready
+        self.checked_out = 0
+        self._idle = [p for p in self._context.pages if not p.is_closed()]
+        while len(self._idle) < self.pool_size:
+            self._idle.append(self._context.new_page())
+
+    def acquire_page(self):
+        """
+        Check out a ready page from the pool (opening one if the pool is empty).
+        """
+        self._ensure_context()
+        self.uses += 1
+        self.checked_out += 1
+        while self._idle:
+            page = self._idle.pop()
+            if not page.is_closed():
+                return page
+        return self._context.new_page()
+
+    def release_page(self, page, failed: bool = False):
+        """
+        Return a page to the pool, or close it if the pool is full or the checkout failed.
+        """
+        if failed:
+            self.failures += 1
+        if page is not None:
+            self.checked_out = max(0, self.checked_out - 1)
+            for hook in self._release_hooks:
+                hook(page)
+        if page is None or page.is_closed():
+            return
+        if failed or len(self._idle) >= self.pool_size or not self._alive():
+            try:
+                page.close()
+            except Exception:
+                pass
+            return
+        try:
+            page.goto("about:blank")
+            self._idle.append(page)
+        except Exception:
+            try:
+                page.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def page(self):
+        """
+        Context manager around acquire_page/release_page; an exception marks the checkout as failed.
+        """
+        page = self.acquire_page()
+        try:
+            yield page
+        except Exception:
+            self.release_page(page, failed=True)
+            raise
+        else:
+            self.release_page(page)
+
+    def login(self, username: Optional[str], password: Optional[str], page=None, timeout: float = 30000) -> bool:
+        """
+        Log into LinkedIn on the given (or a pooled) page. Returns True once the login redirect lands.
+        """
+        if not username or not password:
+            raise ValueError("LinkedIn credentials are not set in environment variables.")
+        own_page = page is None
+        page = page or self.acquire_page()
+        try:
+            page.goto(LINKEDIN_LOGIN_URL)
+            if "/login" not in page.url:
+                # The persistent context is still signed in; LinkedIn redirected us away
+                return True
+            page.get_by_role("textbox", name="Email or phone").fill(username)
+            page.get_by_role("textbox", name="Password").fill(password)
+            page.get_by_role("button", name="Sign in", exact=True).click()
+            try:
+                page.wait_for_url(lambda url: "/login" not in url and "/uas/" not in url, timeout=timeout)
+            except Exception:
+                return False
+            self.logins += 1
+            return True
+        finally:
+            if own_page:
+                self.release_page(page)
+
+    def ensure_authenticated(
+        self, page, username: Optional[str], password: Optional[str], timeout: float = 30000
+    ) -> bool:
+        """
+        Health check a page already on LinkedIn; re-login transparently when the session has lapsed.
+        Returns True if the page is (now) authenticated.
+        """
+        if _is_authenticated(page):
+            return True
+        if not username or not password:
+            return False
+        url = page.url
+        print("Browser session is not authenticated; logging in again.")
+        if not self.login(username, password, page=page, timeout=timeout):
+            self.failures += 1
+            return False
+        if url and url != "about:blank" and "/login" not in url:
+            page.goto(url, wait_until="domcontentloaded")
+        return _is_authenticated(page)
+
+    def close(self):
+        for page in self._idle:
+            try:
+                page.close()
+            except Exception:
+                pass
+        self._idle = []
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception:
+                pass
+        self._context = None
+
+    def stop(self):
+        self.close()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def stats(self) -> dict:
+        return {
+            "alive": self._alive(),
+            "headless": self.headless,
+            "uses": self.uses,
+            "failures": self.failures,
+            "launches": self.launches,
+            "logins": self.logins,
+            "idle_pages": len(self._idle),
+            "checked_out": self.checked_out,
+        }
+
+
+_session: Optional[BrowserSession] = None
+_session_lock = threading.Lock()
+
+
+def get_browser_session() -> BrowserSession:
+    """
+    Return the process-wide warm browser session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = BrowserSession()
+    return _session
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from typing import Optional, Tuple
+
+from .config import bool_env
+from .sqlite_cache import SQLiteTTLCache
+
+
+def default_cache_dir() -> str:
+    """
+    Directory for persistent caches. Defaults to devdata/cache, which docker-compose mounts from the host.
+    """
+    return os.getenv("YODAWG_CACHE_DIR") or os.path.join("devdata", "cache")
+
+
+def normalize_content(content: str) -> str:
+    """
+    Normalize post content so cosmetic differences (unicode forms, case, whitespace) share a cache entry.
+    """
+    text = unicodedata.normalize("NFKC", content or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def caption_cache_key(content: str, model: str, prompt_version: str) -> str:
+    payload = "\x1f".join([prompt_version, model, normalize_content(content)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CaptionCache(SQLiteTTLCache):
+    """
+    Persistent SQLite cache of generated captions keyed by a hash of the normalized
+    content, model id and caption prompt version.
+
+    Environment variables:
+    - YODAWG_CAPTION_CACHE_ENABLED: bool (default: true)
+    - YODAWG_CAPTION_CACHE_PATH: database file (default: <YODAWG_CACHE_DIR>/captions.sqlite3)
+    - YODAWG_CAPTION_CACHE_TTL: entry lifetime in seconds, 0 keeps forever (default: 604800, 7 days)
+    - YODAWG_CAPTION_CACHE_MAX_ENTRIES: least recently used entries are evicted past this (default: 5000)
+    """
+
+    table = "captions"
+    columns = ("model TEXT NOT NULL", "caption TEXT NOT NULL")
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        super().__init__(
+            path or os.getenv("YODAWG_CAPTION_CACHE_PATH") or os.path.join(default_cache_dir(), "captions.sqlite3"),
+            ttl if ttl is not None else int(os.getenv("YODAWG_CAPTION_CACHE_TTL") or 7 * 24 * 3600),
+            max_entries or int(os.getenv("YODAWG_CAPTION_CACHE_MAX_ENTRIES") or 5000),
+            enabled=bool_env("YODAWG_CAPTION_CACHE_ENABLED", True),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached caption for key, or None on a miss or an expired entry.
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        Return (caption, model that wrote it) for key, or None on a miss or an expired entry.
+        """
+        if not self.enabled:
+            return None
+        return self._lookup(key, "caption, model")
+
+    def put(self, key: str, model: str, caption: str):
+        """
+        Cache caption under key. model is the model that wrote it (for a model list, the route winner).
+        """
+        if not self.enabled or not caption:
+            return
+        self._store(key, model=model, caption=caption)
+
+
+_cache: Optional[CaptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_caption_cache() -> CaptionCache:
+    """
+    Return the process-wide caption cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CaptionCache()
+    return _cache
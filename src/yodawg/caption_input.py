@@ -0,0 +1,222 @@
+import math
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .config import bool_env
+
+# LinkedIn UI text that ends up in scraped posts
+_UI_NOISE = re.compile(
+    r"(?:…|\.\.\.)?\s*\b(?:see more|see less|show more|show less|see translation|…more)\b|…more",
+    re.IGNORECASE,
+)
+_URL = re.compile(r"https?://\S+|\bwww\.\S+|\blnkd\.in/\S+", re.IGNORECASE)
+_HASHTAG = re.compile(r"(?:hashtag\s*)?#(\w[\w-]*)", re.IGNORECASE)
+# '@name' mentions, but not the '@' inside e-mail addresses or dotted handles
+_MENTION = re.compile(r"(?<![\w.])@(\w[\w.-]*)")
+# A line (or tail) that is nothing but hashtags
+_HASHTAG_BLOCK = re.compile(r"^(?:\s*(?:hashtag\s*)?#\w[\w-]*[\s,;]*){2,}$", re.IGNORECASE | re.MULTILINE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+# Rough GPT-style pre-tokenization: words (with a leading space), digit runs, single symbols
+_PIECES = re.compile(r" ?[^\W\d_]+| ?\d+|[^\w\s]|\s+", re.UNICODE)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can could did do does for from had has have how i if in into is it its "
+    "just me more my no not of on or our so than that the their them then there these they this to too up us "
+    "was we were what when which who why will with would you your i'm it's we're i've".split()
+)
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def _is_emoji(char: str) -> bool:
+    # Symbols (emoji, dingbats), plus the joiner and variation selector inside emoji sequences
+    return unicodedata.category(char) == "So" or char in ("\u200d", "\ufe0f")
+
+
+def _tiktoken_encoder():
+    """
+    tiktoken's o200k encoding when the package is installed (it is optional), else None.
+    """
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    import tiktoken
+
+                    _encoder = tiktoken.get_encoding("o200k_base")
+                except Exception:  # not installed, or its encoding files cannot be fetched
+                    _encoder = False
+    return _encoder or None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of text: exact with tiktoken installed, otherwise an offline estimate
+    (about one token per short word, longer words split every ~8 letters, digits in
+    groups of three, symbols and emoji a token or two each).
+    """
+    if not text:
+        return 0
+    encoder = _tiktoken_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            tokens += 1 if len(piece) > 1 else 0
+        elif stripped.isdigit():
+            tokens += math.ceil(len(stripped) / 3)
+        elif stripped[0].isalpha():
+            tokens += 1 + (len(stripped) - 1) // 8
+        else:
+            # Symbols, and word characters that are neither letters nor digits ('½', 'Ⅳ'), per character
+            tokens += sum(2 if ord(c) > 0x2000 else 1 for c in stripped)
+    return tokens
+
+
+def normalize_post_text(text: str) -> str:
+    """
+    Strip the noise scraped posts carry: 'see more' UI text, URLs, hashtag blocks,
+    '#'/'@' markers, emoji runs and repeated lines or sentences.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _UI_NOISE.sub(" ", text)
+    text = _URL.sub(" ", text)
+    text = _HASHTAG_BLOCK.sub(" ", text)
+    text = _HASHTAG.sub(lambda m: _split_camel(m.group(1)), text)
+    text = _MENTION.sub(r"\1", text)
+
+    # Emoji runs collapse to their first emoji; ones used as bullets go entirely
+    out, previous_emoji = [], False
+    for char in text:
+        emoji = _is_emoji(char)
+        if not (emoji and previous_emoji):
+            out.append(char)
+        previous_emoji = emoji
+    text = re.sub(r"(?m)^[^\w\n]*\s", lambda m: "" if any(_is_emoji(c) for c in m.group(0)) else m.group(0), "".join(out))
+
+    seen, lines = set(), []
+    for sentence in _sentences(text):
+        key = re.sub(r"\W+", " ", sentence.lower()).strip()
+        if key and key not in seen:
+            seen.add(key)
+            lines.append(sentence)
+    return "\n".join(lines)
+
+
+def _split_camel(tag: str) -> str:
+    # '#PlatformEngineering' reads better to the model as 'Platform Engineering'
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", tag)
+
+
+def _sentences(text: str) -> List[str]:
+    return [re.sub(r"\s+", " ", s).strip() for s in _SENTENCE_END.split(text) if s and s.strip(" \t-•|·")]
+
+
+def hashtag_keywords(text: str) -> set:
+    """
+    Lowercased words of the post's hashtags ('#PlatformEngineering' -> platform, engineering): the author's own topic list.
+    """
+    words = set()
+    for tag in _HASHTAG.findall(text or ""):
+        words.update(w.lower() for w in _WORD.findall(_split_camel(tag)))
+    return words - _STOPWORDS
+
+
+def select_salient(text: str, budget: int, keywords: Optional[set] = None) -> str:
+    """
+    Keep the most salient sentences that fit the token budget, in their original order.
+    Sentences score by the content words they carry (words repeated across the post and
+    the given keywords, such as its hashtags, count extra) per token, and earlier
+    sentences, where posts put their hook, score higher.
+    """
+    sentences = _sentences(text)
+    if not sentences:
+        return ""
+    keywords = keywords or set()
+    frequency: dict = {}
+    for sentence in sentences:
+        for word in set(w.lower() for w in _WORD.findall(sentence)):
+            if word not in _STOPWORDS:
+                frequency[word] = frequency.get(word, 0) + 1
+
+    costs = [estimate_tokens(s) + 1 for s in sentences]
+    scores = []
+    for i, sentence in enumerate(sentences):
+        words = set(w.lower() for w in _WORD.findall(sentence)) - _STOPWORDS
+        weight = sum(frequency[w] + (2 if w in keywords else 0) for w in words)
+        scores.append(weight / math.sqrt(costs[i]) * (1.5 - 0.5 * i / len(sentences)))
+
+    chosen, used = set(), 0
+    for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        if used + costs[i] <= budget:
+            chosen.add(i)
+            used += costs[i]
+    if not chosen:
+        # Not even one sentence fits: cut the best one to the budget by words
+        best = max(range(len(sentences)), key=lambda i: scores[i])
+        words, kept = sentences[best].split(), []
+        for word in words:
+            if estimate_tokens(" ".join(kept + [word])) > budget:
+                break
+            kept.append(word)
+        return " ".join(kept)
+    return "\n".join(sentences[i] for i in sorted(chosen))
+
+
+@dataclass
+class CaptionInput:
+    """
+    Post content as sent to the caption model, with token counts before and after preprocessing.
+    """
+    text: str
+    original_tokens: int
+    sent_tokens: int
+    trimmed: bool
+
+    def describe(self) -> str:
+        note = f"input tokens {self.original_tokens}->{self.sent_tokens}"
+        return note + " (trimmed to budget)" if self.trimmed else note
+
+
+def prepare_caption_input(
+    content: str, budget: Optional[int] = None, custom_context: Optional[str] = None
+) -> CaptionInput:
+    """
+    Normalize post content and trim it to the token budget before it goes into the caption prompt.
+    Custom context is the caller's own text: it is appended as is, and its tokens are reserved
+    out of the budget so that only the post is trimmed (the post keeps at least a quarter of it).
+
+    Environment variables:
+    - YODAWG_CAPTION_PREPROCESS: bool, normalize and trim caption input (default: true)
+    - YODAWG_CAPTION_INPUT_BUDGET: token budget for the content, 0 disables trimming (default: 400)
+
+    :param content: Scraped post text.
+    :param budget: Token budget (default: YODAWG_CAPTION_INPUT_BUDGET).
+    :param custom_context: Optional custom context appended after the post.
+    """
+    custom_context = (custom_context or "").strip()
+    combined = f"{content}\n\n{custom_context}" if custom_context else content
+    original_tokens = estimate_tokens(combined)
+    if not bool_env("YODAWG_CAPTION_PREPROCESS", True):
+        return CaptionInput(combined, original_tokens, original_tokens, False)
+    if budget is None:
+        budget = int(os.getenv("YODAWG_CAPTION_INPUT_BUDGET") or 400)
+    text = normalize_post_text(content) or (content or "").strip()
+    post_budget = budget
+    if budget and custom_context:
+        post_budget = max(budget - estimate_tokens(custom_context) - 1, budget // 4)
+    trimmed = bool(budget) and estimate_tokens(text) > post_budget
+    if trimmed:
+        text = select_salient(text, post_budget, hashtag_keywords(content))
+    if custom_context:
+        text = f"{text}\n\n{custom_context}" if text else custom_context
+    return CaptionInput(text, original_tokens, estimate_tokens(text), trimmed)
@@ -0,0 +1,137 @@
+import os
+import time
+from typing import Optional, Tuple
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+_SEPARATOR = "|||"
+
+
+def _partial_suffix(text: str, tag: str) -> int:
+    """
+    Length of the longest suffix of text that is a proper prefix of tag (a tag split across chunks).
+    """
+    for n in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:n]):
+            return n
+    return 0
+
+
+class CaptionStreamParser:
+    """
+    Incremental parser for a streamed 'top|||bottom' caption. <think> blocks are
+    dropped as they stream (even when a tag is split across chunks), and the
+    caption counts as complete once the bottom line has been terminated by a newline.
+    """
+
+    def __init__(self):
+        self.visible = ""
+        self._pending = ""
+        self._in_think = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume a streamed chunk. Returns True once a complete top|||bottom pair has been seen.
+        """
+        buf = self._pending + (text or "")
+        self._pending = ""
+        while buf:
+            if self._in_think:
+                i = buf.find(_THINK_CLOSE)
+                if i < 0:
+                    keep = _partial_suffix(buf, _THINK_CLOSE)
+                    self._pending = buf[len(buf) - keep:] if keep else ""
+                    break
+                buf = buf[i + len(_THINK_CLOSE):]
+                self._in_think = False
+            else:
+                i = buf.find(_THINK_OPEN)
+                if i < 0:
+                    keep = _partial_suffix(buf, _THINK_OPEN)
+                    self.visible += buf[:len(buf) - keep]
+                    self._pending = buf[len(buf) - keep:]
+                    break
+                self.visible += buf[:i]
+                buf = buf[i + len(_THINK_OPEN):]
+                self._in_think = True
+        return self.complete
+
+    @property
+    def complete(self) -> bool:
+        if _SEPARATOR not in self.visible:
+            return False
+        top, rest = self.visible.split(_SEPARATOR, 1)
+        rest = rest.lstrip()
+        return bool(top.strip()) and "\n" in rest and bool(rest.split("\n", 1)[0].strip())
+
+    def caption(self) -> str:
+        """
+        The caption parsed so far: 'top|||bottom' when the separator was seen, else the visible text.
+        """
+        text = self.visible + ("" if self._in_think else self._pending)
+        if _SEPARATOR not in text:
+            return text.strip()
+        top, rest = text.split(_SEPARATOR, 1)
+        top_lines = top.strip().splitlines()
+        bottom_lines = rest.strip().splitlines()
+        # Keep only the line touching the separator on each side (drops preambles like 'Output:')
+        top = top_lines[-1].strip() if top_lines else ""
+        bottom = bottom_lines[0].strip() if bottom_lines else ""
+        return f"{top}{_SEPARATOR}{bottom}"
+
+
+def stream_caption(client, model: str, prompt: str, max_tokens: Optional[int] = None) -> Tuple[str, dict]:
+    """
+    Stream a chat completion and stop as soon as a complete caption pair exists. The
+    token ceiling is sent as max_tokens, so the server stops generating there; streamed
+    chunks are also counted and the stream is closed at the ceiling in case a server
+    ignores the limit.
+    :param client: OpenAI-compatible client.
+    :param model: Bare model name.
+    :param prompt: Caption prompt.
+    :param max_tokens: Token ceiling (default: YODAWG_CAPTION_MAX_TOKENS or 512).
+    :return: (caption, metrics) where metrics has time_to_first_token, time_to_caption,
+        tokens (streamed chunks), stopped_early and hit_token_ceiling.
+    """
+    max_tokens = max_tokens or int(os.getenv("YODAWG_CAPTION_MAX_TOKENS") or 512)
+    parser = CaptionStreamParser()
+    start = time.perf_counter()
+    first_token = None
+    tokens = 0
+    stopped_early = False
+    hit_ceiling = False
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].finish_reason == "length":
+                hit_ceiling = True
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            tokens += 1
+            if parser.feed(delta):
+                stopped_early = True
+                break
+            if tokens >= max_tokens:
+                hit_ceiling = True
+                break
+    finally:
+        # Closing the response aborts generation server-side for early stops
+        stream.close()
+    metrics = {
+        "time_to_first_token": round(first_token, 4) if first_token is not None else None,
+        "time_to_caption": round(time.perf_counter() - start, 4),
+        "tokens": tokens,
+        "stopped_early": stopped_early,
+        "hit_token_ceiling": hit_ceiling and not stopped_early,
+    }
+    return parser.caption(), metrics
@@ -0,0 +1,147 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:  # openai and httpx are imported on first client creation
+    import httpx
+    from openai import OpenAI
+
+
+OPENAI_BACKEND = "openai"
+OLLAMA_BACKEND = "ollama"
+
+
+def ollama_base_url() -> str:
+    return os.getenv("OLLAMA_BASE_URL") or "http://localhost:11434/v1"
+
+
+class _ConnectionStats:
+    """
+    Per-client counters fed by httpcore trace events, so we can see whether
+    requests ride an existing keep-alive connection or open a new one.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, request: "httpx.Request"):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "reused_requests": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of OpenAI-compatible clients keyed by (backend, base URL).
+    Every client shares a keep-alive httpx connection pool, so actions stop paying
+    TCP/TLS setup on each call.
+
+    Environment variables:
+    - OLLAMA_BASE_URL: OpenAI-compatible Ollama endpoint (default: http://localhost:11434/v1)
+    - YODAWG_LLM_MAX_CONNECTIONS: max open connections per client (default: 20)
+    - YODAWG_LLM_MAX_KEEPALIVE: max idle keep-alive connections per client (default: 10)
+    - YODAWG_LLM_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default: 60)
+    - YODAWG_LLM_CONNECT_TIMEOUT: connect timeout in seconds (default: 10)
+    - YODAWG_LLM_TIMEOUT: read/write timeout in seconds (default: 600)
+    """
+
+    def __init__(self):
+        load_dotenv()
+        self.max_connections = int(os.getenv("YODAWG_LLM_MAX_CONNECTIONS") or 20)
+        self.max_keepalive = int(os.getenv("YODAWG_LLM_MAX_KEEPALIVE") or 10)
+        self.keepalive_expiry = float(os.getenv("YODAWG_LLM_KEEPALIVE_EXPIRY") or 60)
+        self.connect_timeout = float(os.getenv("YODAWG_LLM_CONNECT_TIMEOUT") or 10)
+        self.timeout = float(os.getenv("YODAWG_LLM_TIMEOUT") or 600)
+        self._clients: Dict[Tuple[str, str], "OpenAI"] = {}
+        self._stats: Dict[Tuple[str, str], _ConnectionStats] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, backend: str, base_url: Optional[str], stats: _ConnectionStats) -> "OpenAI":
+        import httpx
+        from openai import OpenAI
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            event_hooks={"request": [stats.on_request]},
+        )
+        if backend == OLLAMA_BACKEND:
+            return OpenAI(base_url=base_url, api_key="ollama", http_client=http_client)
+        return OpenAI(base_url=base_url, http_client=http_client)
+
+    def get(self, backend: str = OPENAI_BACKEND, base_url: Optional[str] = None) -> "OpenAI":
+        """
+        Return the shared client for a backend, creating it on first use.
+        :param backend: 'openai' or 'ollama'.
+        :param base_url: Override the backend's base URL (default: OpenAI's, or OLLAMA_BASE_URL).
+        """
+        if backend == OLLAMA_BACKEND:
+            base_url = base_url or ollama_base_url()
+        key = (backend, base_url or "")
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    stats = self._stats[key] = _ConnectionStats()
+                    client = self._clients[key] = self._build(backend, base_url, stats)
+        return client
+
+    def for_model(self, model: str) -> Tuple["OpenAI", str]:
+        """
+        Resolve a model id ('gpt-4o-mini' or 'ollama:<name>') to its shared client and bare model name.
+        """
+        if str(model).startswith("ollama:"):
+            return self.get(OLLAMA_BACKEND), model.split(":", 1)[1]
+        return self.get(OPENAI_BACKEND), model
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                f"{backend}:{base_url or 'default'}": stats.snapshot()
+                for (backend, base_url), stats in self._stats.items()
+            }
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Return the process-wide LLM client registry, creating it on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
@@ -0,0 +1,12 @@
+import os
+
+
+def bool_env(name: str, default: bool) -> bool:
+    """
+    Read a boolean environment variable: 1/true/yes/on (any case) are true, anything else
+    set is false, and an unset variable gives default.
+    """
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.strip().lower() in {"1", "true", "yes", "on"}
@@ -0,0 +1,226 @@
+import io
+import os
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Optional
+
+from .config import bool_env
+from .image_store import get_image_store
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+_FORMATS = {
+    "png": ("PNG", ".png"),
+    "jpeg": ("JPEG", ".jpg"),
+    "jpg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+}
+
+_MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+# Lowest quality the target-bytes search will go to before downscaling instead
+_MIN_QUALITY = 40
+
+
+@dataclass(frozen=True)
+class EncodeSettings:
+    """
+    Output encoding for generated memes before they are uploaded.
+
+    Environment variables (used by from_env):
+    - YODAWG_OUTPUT_FORMAT: png|jpeg|webp; png is lossless, jpeg/webp opt into smaller lossy uploads (default: png)
+    - YODAWG_OUTPUT_QUALITY: 1-100 for jpeg/webp (default: 88)
+    - YODAWG_PNG_COMPRESS_LEVEL: 0-9 zlib level for png (default: 6)
+    - YODAWG_PNG_OPTIMIZE: bool, extra png optimization pass (default: false)
+    - YODAWG_OUTPUT_MAX_DIMENSION: downscale so the longest side fits, 0 disables (default: 0)
+    - YODAWG_OUTPUT_TARGET_BYTES: size budget; lowers quality, then downscales to meet it, 0 disables (default: 0)
+    """
+    format: str = "png"
+    quality: int = 88
+    compress_level: int = 6
+    optimize: bool = False
+    max_dimension: int = 0
+    target_bytes: int = 0
+
+    @classmethod
+    def from_env(cls, **overrides) -> "EncodeSettings":
+        settings = cls(
+            format=(os.getenv("YODAWG_OUTPUT_FORMAT") or "png").strip().lower(),
+            quality=int(os.getenv("YODAWG_OUTPUT_QUALITY") or 88),
+            compress_level=int(os.getenv("YODAWG_PNG_COMPRESS_LEVEL") or 6),
+            optimize=bool_env("YODAWG_PNG_OPTIMIZE", False),
+            max_dimension=int(os.getenv("YODAWG_OUTPUT_MAX_DIMENSION") or 0),
+            target_bytes=int(os.getenv("YODAWG_OUTPUT_TARGET_BYTES") or 0),
+        )
+        overrides = {k: v for k, v in overrides.items() if v is not None}
+        if "format" in overrides:
+            overrides["format"] = str(overrides["format"]).strip().lower()
+        return replace(settings, **overrides)
+
+    def describe(self) -> str:
+        parts = [self.format]
+        if self.format == "png":
+            parts.append(f"compress_level={self.compress_level}")
+            if self.optimize:
+                parts.append("optimize")
+        else:
+            parts.append(f"quality={self.quality}")
+        if self.max_dimension:
+            parts.append(f"max_dimension={self.max_dimension}")
+        if self.target_bytes:
+            parts.append(f"target_bytes={self.target_bytes}")
+        return " ".join(parts)
+
+
+@dataclass
+class EncodeResult:
+    """
+    Where and how a meme was encoded. data keeps the encoded bytes, so the meme can be
+    uploaded from memory while (or instead of) being written to path.
+    """
+    path: str
+    format: str
+    quality: Optional[int]
+    width: int
+    height: int
+    size_bytes: int
+    settings: str
+    data: Optional[bytes] = field(default=None, repr=False)
+    persisted: Optional[Future] = field(default=None, repr=False, compare=False)
+    metadata: Optional[dict] = field(default=None, repr=False, compare=False)
+
+    @property
+    def mime_type(self) -> str:
+        return _MIME_TYPES[self.format]
+
+    def upload_payload(self) -> Optional[dict]:
+        """
+        The meme as a Playwright file payload for set_files, or None without in-memory data.
+        """
+        if self.data is None:
+            return None
+        return {"name": os.path.basename(self.path), "mimeType": self.mime_type, "buffer": self.data}
+
+    def persist(self, timeout: Optional[float] = None) -> str:
+        """
+        Make sure the meme is on disk at path (waiting for an async write, or writing it now
+        when persistence is off) and return the path.
+        """
+        if self.persisted is not None:
+            self.persisted.result(timeout=timeout)
+        elif self.data is not None and not os.path.exists(self.path):
+            metadata = self.metadata or {"width": self.width, "height": self.height}
+            get_image_store().put(self.data, os.path.splitext(self.path)[1], **metadata)
+        return self.path
+
+
+def _prepare(img: "Image.Image", fmt: str) -> "Image.Image":
+    if img.mode in ("RGBA", "LA") and (fmt == "JPEG" or img.getchannel("A").getextrema() == (255, 255)):
+        # Opaque (or JPEG-bound) images drop the alpha channel: smaller and faster to encode
+        return img.convert("RGB")
+    if img.mode not in ("RGB", "RGBA", "L"):
+        return img.convert("RGBA" if fmt != "JPEG" else "RGB")
+    return img
+
+
+def _downscale(img: "Image.Image", max_dimension: int) -> "Image.Image":
+    if max_dimension and max(img.size) > max_dimension:
+        scale = max_dimension / float(max(img.size))
+        size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        from PIL import Image
+
+        return img.resize(size, Image.LANCZOS)
+    return img
+
+
+def _encode(img: "Image.Image", fmt: str, settings: EncodeSettings, quality: int) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "PNG":
+        img.save(buf, fmt, compress_level=settings.compress_level, optimize=settings.optimize)
+    elif fmt == "JPEG":
+        img.save(buf, fmt, quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(buf, fmt, quality=quality, method=4)
+    return buf.getvalue()
+
+
+def encode_to_bytes(img: "Image.Image", settings: Optional[EncodeSettings] = None):
+    """
+    Encode an image according to settings, honouring max_dimension and target_bytes.
+    :return: (data, format key, quality used or None, final image size)
+    """
+    settings = settings or EncodeSettings.from_env()
+    if settings.format not in _FORMATS:
+        raise ValueError(f"Unsupported output format: {settings.format}. Use png, jpeg or webp.")
+    fmt = _FORMATS[settings.format][0]
+    img = _downscale(_prepare(img, fmt), settings.max_dimension)
+    quality = settings.quality if fmt != "PNG" else None
+    data = _encode(img, fmt, settings, quality)
+    if settings.target_bytes and len(data) > settings.target_bytes:
+        if fmt != "PNG":
+            # Binary search the highest quality that fits the budget
+            lo, hi, best = _MIN_QUALITY, settings.quality - 1, None
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                candidate = _encode(img, fmt, settings, mid)
+                if len(candidate) <= settings.target_bytes:
+                    best, quality, lo = candidate, mid, mid + 1
+                else:
+                    hi = mid - 1
+            if best is not None:
+                data = best
+            else:
+                quality = _MIN_QUALITY
+        # Still too big: shrink dimensions until it fits (or gets silly small)
+        while len(data) > settings.target_bytes and min(img.size) > 64:
+            img = _downscale(img, int(max(img.size) * 0.85))
+            data = _encode(img, fmt, settings, quality)
+    return data, settings.format, quality, img.size
+
+
+def encode_image(
+    img: "Image.Image",
+    output_path: Optional[str],
+    settings: Optional[EncodeSettings] = None,
+    metadata: Optional[dict] = None,
+) -> EncodeResult:
+    """
+    Encode an image to disk. The extension of output_path is replaced to match the format.
+    :param img: Image to encode.
+    :param output_path: Destination path; e.g. 'meme.png' becomes 'meme.jpg' for jpeg output.
+        None stores the meme in the content-addressed image store instead, synchronously,
+        in the background or not at all depending on YODAWG_IMAGE_PERSIST; the result's
+        data can be uploaded either way.
+    :param settings: Encoding settings (default: EncodeSettings.from_env()).
+    :param metadata: Index fields for the image store (caption, model, mode).
+    """
+    settings = settings or EncodeSettings.from_env()
+    data, fmt, quality, (width, height) = encode_to_bytes(img, settings)
+    extension = _FORMATS[fmt][1]
+    persisted = None
+    if output_path:
+        path = os.path.splitext(output_path)[0] + extension
+        with open(path, "wb") as f:
+            f.write(data)
+    else:
+        store = get_image_store()
+        metadata = dict(metadata or {}, width=width, height=height)
+        path = store.path_for(data, extension)
+        if store.persist == "sync":
+            store.put(data, extension, **metadata)
+        elif store.persist == "async":
+            persisted = store.put_async(data, extension, **metadata)
+    return EncodeResult(
+        path=path,
+        format=_FORMATS[fmt][0].lower(),
+        quality=quality,
+        width=width,
+        height=height,
+        size_bytes=len(data),
+        settings=settings.describe(),
+        data=data,
+        persisted=persisted,
+        metadata=metadata if not output_path else None,
+    )
@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from PIL import ImageFont
+
+
+_HERE = os.path.dirname(__file__)
+
+# Meme font fallback chain, in order of preference.
+DEFAULT_FONT_CANDIDATES = [
+    # Bundled fonts (local development)
+    os.path.join(_HERE, "impact.ttf"),
+    os.path.join(_HERE, "Anton-Regular.ttf"),
+    # Container fonts (cloud-native - downloaded in Dockerfile)
+    "/usr/share/fonts/truetype/meme-fonts/impact.ttf",
+    "/usr/share/fonts/truetype/meme-fonts/Anton-Regular.ttf",
+    "/usr/share/fonts/truetype/meme-fonts/Oswald-Bold.ttf",
+    # Backwards compatibility - fonts directory
+    "/action-server/actions/fonts/Anton-Regular.ttf",
+    "/action-server/actions/fonts/impact.ttf",
+    "/action-server/actions/fonts/Oswald-Bold.ttf",
+    # System fonts fallback
+    "/usr/share/fonts/truetype/impact/impact.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "C:/Windows/Fonts/impact.ttf",  # Windows
+    "/Library/Fonts/Impact.ttf",  # macOS
+    "/Library/Fonts/Arial Black.ttf",  # macOS
+]
+
+
+class FontRegistry:
+    """
+    Resolves the meme font fallback chain once and keeps an LRU cache of loaded
+    fonts keyed by (path, size), so overlays never re-stat or re-parse font files.
+
+    Environment variables:
+    - YODAWG_FONT_CACHE_SIZE: max number of (path, size) fonts kept loaded (default: 64)
+    """
+
+    def __init__(self, candidates: Optional[List[str]] = None, max_entries: Optional[int] = None):
+        self.candidates = list(candidates) if candidates is not None else list(DEFAULT_FONT_CANDIDATES)
+        self.max_entries = max_entries or int(os.getenv("YODAWG_FONT_CACHE_SIZE") or 64)
+        self.hits = 0
+        self.misses = 0
+        self._chain: Optional[List[str]] = None
+        self._cache: "OrderedDict[tuple, ImageFont.ImageFont]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve_chain(self) -> List[str]:
+        """
+        Return the usable font paths from the candidate list (resolved only once).
+        """
+        if self._chain is None:
+            from PIL import ImageFont
+
+            chain = []
+            for candidate in self.candidates:
+                if candidate in chain or not os.path.exists(candidate):
+                    continue
+                try:
+                    ImageFont.truetype(candidate, 10)
+                except Exception:
+                    continue
+                chain.append(candidate)
+            self._chain = chain
+        return self._chain
+
+    def primary_path(self, font_path: Optional[str] = None) -> Optional[str]:
+        """
+        Pick the font path to render with: the explicit font_path if it loads, else
+        the first entry of the resolved chain. None means Pillow's default font.
+        """
+        if font_path:
+            try:
+                self.get(font_path, 80)
+                return font_path
+            except Exception:
+                pass
+        chain = self.resolve_chain()
+        return chain[0] if chain else None
+
+    def get(self, path: Optional[str], size: int):
+        """
+        Return a loaded font for (path, size), loading and caching it on a miss.
+        A path of None returns Pillow's default font.
+        """
+        key = (path, int(size))
+        with self._lock:
+            font = self._cache.get(key)
+            if font is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+        from PIL import ImageFont
+
+        font = ImageFont.truetype(path, int(size)) if path else ImageFont.load_default(int(size))
+        with self._lock:
+            self._cache[key] = font
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return font
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached": len(self._cache),
+                "max_entries": self.max_entries,
+                "chain": list(self._chain or []),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """
+    Return the process-wide font registry, creating it on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FontRegistry()
+    return _registry
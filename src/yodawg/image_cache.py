@@ -0,0 +1,186 @@
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays in-process only
+    fcntl = None
+
+from .caption_cache import default_cache_dir
+from .config import bool_env
+from .timing import count
+
+# Cross-process producers lock one of a fixed set of stripe files (by key prefix), so lock
+# files do not grow with the number of cached images
+_LOCK_STRIPES = 256
+
+
+def image_cache_key(model: str, image_prompt: str) -> str:
+    return hashlib.sha256(f"{model}\x1f{image_prompt}".encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """
+    Content-addressed store of generated images keyed by (model, image prompt).
+    Concurrent requests for the same key share one upstream call: threads wait on
+    the in-flight producer, and other processes wait on the key's lock stripe.
+
+    Environment variables:
+    - YODAWG_IMAGE_CACHE_ENABLED: bool (default: true)
+    - YODAWG_IMAGE_CACHE_DIR: store directory (default: <YODAWG_CACHE_DIR>/images)
+    - YODAWG_IMAGE_CACHE_MAX_BYTES: total size cap; least recently used images are evicted (default: 536870912, 512 MiB)
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.enabled = bool_env("YODAWG_IMAGE_CACHE_ENABLED", True)
+        self.directory = directory or os.getenv("YODAWG_IMAGE_CACHE_DIR") or os.path.join(default_cache_dir(), "images")
+        self.max_bytes = max_bytes or int(os.getenv("YODAWG_IMAGE_CACHE_MAX_BYTES") or 512 * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.img")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return data
+
+    def put(self, key: str, data: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".lock"):
+                # Per-key lock files left by older versions
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".img"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+
+    def _file_lock(self, key: str):
+        if fcntl is None:
+            return None
+        directory = os.path.join(self.directory, "locks")
+        os.makedirs(directory, exist_ok=True)
+        stripe = int(key[:8], 16) % _LOCK_STRIPES
+        handle = open(os.path.join(directory, f"stripe-{stripe:03d}.lock"), "a")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def get_or_create(self, key: str, producer: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Return the cached image bytes for key, calling producer at most once across
+        concurrent callers on a miss. A producer result of None is not cached.
+        """
+        if not self.enabled:
+            return producer()
+        while True:
+            data = self.get(key)
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+                count("image_cache_hits")
+                return data
+            with self._lock:
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+                self.coalesced += 1
+            waiter.wait()
+            # Loop: the leader either stored the image (hit) or failed (we try ourselves)
+        try:
+            handle = self._file_lock(key)
+            try:
+                data = self.get(key)  # another process may have produced it while we waited
+                if data is not None:
+                    with self._lock:
+                        self.hits += 1
+                    count("image_cache_hits")
+                    return data
+                with self._lock:
+                    self.misses += 1
+                count("image_cache_misses")
+                data = producer()
+                if data is not None:
+                    self.put(key, data)
+                return data
+            finally:
+                if handle is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                    handle.close()
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def stats(self) -> dict:
+        total = entries = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".img"):
+                    entries += 1
+                    total += os.path.getsize(os.path.join(self.directory, name))
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+_cache: Optional[ImageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """
+    Return the process-wide generated-image cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ImageCache()
+    return _cache
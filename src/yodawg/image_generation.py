@@ -1,138 +1,272 @@
-
-
 import base64
-import sys
+import io
 import os
 import time
-from dotenv import load_dotenv
-from openai import OpenAI
-# For static image overlay
-from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from .caption_cache import caption_cache_key, get_caption_cache
+from .caption_input import prepare_caption_input
+from .caption_stream import stream_caption
+from .clients import get_client_registry
+from .encoding import EncodeSettings, encode_image
+from .fonts import get_font_registry
+from .image_cache import get_image_cache, image_cache_key
+from .image_store import reset_image_store
+from .model_router import RouteResult, get_model_router, parse_model_list
+from .templates import DEFAULT_TEMPLATE, get_template_pool
+from .config import bool_env
+from .text_layout import get_layout_engine
+from .timing import count, span
+
+# Bump whenever build_caption_prompt (or its input preprocessing) changes so cached captions from the old prompt are not reused
+CAPTION_PROMPT_VERSION = "2"
+
+# Black outline width around white meme text, in pixels
+OUTLINE_WIDTH = 4
+
+
+def _dilate(mask, radius):
+    """
+    Square max-dilation of an L mask by radius pixels, done as two separable
+    passes of shifted maxima (much cheaper than a (2r+1)x(2r+1) MaxFilter).
+    """
+    from PIL import ImageChops
+
+    out = mask
+    for d in range(1, radius + 1):
+        out = ImageChops.lighter(out, ImageChops.offset(mask, d, 0))
+        out = ImageChops.lighter(out, ImageChops.offset(mask, -d, 0))
+    rows = out
+    for d in range(1, radius + 1):
+        out = ImageChops.lighter(out, ImageChops.offset(rows, 0, d))
+        out = ImageChops.lighter(out, ImageChops.offset(rows, 0, -d))
+    return out
+
+
+def draw_stroked_text(draw, xy, text, font, outline_width=OUTLINE_WIDTH):
+    """
+    Draw white meme text with a square black outline. The text is rasterized once
+    into a glyph mask; the outline is that mask dilated by outline_width, which
+    matches stamping the text at every offset of the (2w+1)x(2w+1) grid.
+    """
+    if not text:
+        return
+    from PIL import Image, ImageDraw
+
+    left, top, right, bottom = draw.textbbox(xy, text, font=font)
+    pad = outline_width + 1  # keeps ImageChops.offset wrap-around inside empty margin
+    origin = (left - pad, top - pad)
+    mask = Image.new("L", (right - left + 2 * pad, bottom - top + 2 * pad), 0)
+    ImageDraw.Draw(mask).text((xy[0] - origin[0], xy[1] - origin[1]), text, font=font, fill=255)
+    draw.bitmap(origin, _dilate(mask, outline_width), fill="black")
+    draw.bitmap(origin, mask, fill="white")
+
+
+def render_static_overlay(
+    caption, static_image_path, output_path=None, font_path=None, template=None, encode_settings=None, model=None
+):
+    """
+    Overlay the Yo Dawg meme caption (split by '|||') on a static image, using meme-style font.
+    :param caption: Meme caption, two lines separated by '|||'.
+    :param static_image_path: Path to the static image file (e.g., PNG of Xzibit). Ignored if template is given.
+    :param output_path: Path to save the new meme image; None stores it in the image store.
+    :param font_path: Optional path to a .ttf font file. If not provided, tries bundled font, then system fonts.
+    :param template: Optional name of a template registered in the template pool.
+    :param encode_settings: Optional EncodeSettings; the file extension follows the chosen format.
+    :param model: Model that wrote the caption, recorded in the image store index.
+    :return: EncodeResult with the final path, format and size.
+    """
+    import re
+    from PIL import ImageDraw
+
+    # Only remove <think> blocks if present
+    if '<think>' in caption:
+        cleaned_caption = re.sub(r'<think>.*?</think>', '', caption, flags=re.DOTALL)
+    else:
+        cleaned_caption = caption
+    # Remove any lines that do not start with 'YO DAWG' or are not after the split
+    if '|||' in cleaned_caption:
+        meme_lines = [p.strip() for p in cleaned_caption.split('|||', 1)]
+    else:
+        # Try to find the YO DAWG line and punchline
+        lines = [line.strip() for line in cleaned_caption.splitlines() if line.strip()]
+        top = next((l for l in lines if l.upper().startswith('YO DAWG')), lines[0] if lines else '')
+        bottom = next((l for l in lines if l != top), '')
+        meme_lines = [top, bottom]
+    top, bottom = meme_lines if len(meme_lines) == 2 else (meme_lines[0], "")
+    # Load image - a private copy of the pre-decoded template
+    pool = get_template_pool()
+    img = pool.get(template) if template else pool.get_path(static_image_path)
+    draw = ImageDraw.Draw(img)
+    # Font setup - resolved once per process by the shared font registry
+    font_path_used = get_font_registry().primary_path(font_path)
+    # Layout - wrap and size each caption to its region (cached per caption/template)
+    layout_engine = get_layout_engine()
+    max_width = img.width - 40  # 20px margin on each side
+    max_height = int(img.height * 0.3)
+    top_layout = layout_engine.layout(top, max_width, max_height, font_path=font_path_used)
+    bottom_layout = layout_engine.layout(bottom, max_width, max_height, font_path=font_path_used)
+    fonts = get_font_registry()
+    def draw_line(text, w, y, font):
+        draw_stroked_text(draw, ((img.width - w) // 2, y), text, font)
+    # Top text flows down from the top margin
+    font = fonts.get(top_layout.font_path, top_layout.font_size)
+    for i, (line, w) in enumerate(zip(top_layout.lines, top_layout.line_widths)):
+        draw_line(line, w, 40 + i * top_layout.line_height, font)
+    # Bottom text stacks up so its last line sits at the bottom margin
+    font = fonts.get(bottom_layout.font_path, bottom_layout.font_size)
+    last_y = img.height - 140
+    n = len(bottom_layout.lines)
+    for i, (line, w) in enumerate(zip(bottom_layout.lines, bottom_layout.line_widths)):
+        draw_line(line, w, last_y - (n - 1 - i) * bottom_layout.line_height, font)
+    encoded = encode_image(
+        img, output_path, encode_settings, metadata={"caption": caption, "model": model, "mode": "poor"}
+    )
+    print(f"Static meme saved to {encoded.path} ({encoded.size_bytes} bytes, {encoded.settings})")
+    # ---
+    # To use a custom font, place a .ttf file (e.g., impact.ttf or Anton-Regular.ttf) in the same directory as this script,
+    # or provide the font_path argument. If no meme-style font is found, falls back to system fonts or PIL default.
+    return encoded
+
+
+@dataclass
+class OverlayResult:
+    """
+    Outcome of one render in a batch overlay run.
+    """
+    index: int
+    caption: str
+    template: str
+    output_path: Optional[str]
+    seconds: float
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _init_overlay_worker(templates, font_path):
+    """
+    Process pool initializer: register and decode the batch's templates and load
+    the font chain once per worker, so renders only pay for drawing and encoding.
+    Workers get their own image store that writes synchronously: a forked child
+    inherits the parent's store with a writer thread that no longer runs.
+    """
+    reset_image_store(persist="sync")
+    pool = get_template_pool()
+    for name, path in templates:
+        if not pool.has(name):
+            pool.register(name, path)
+        pool.get(name)
+    get_font_registry().primary_path(font_path)
+
+
+def _render_overlay_job(index, caption, template, output_path, font_path, encode_settings):
+    start = time.perf_counter()
+    try:
+        encoded = render_static_overlay(
+            caption, None, output_path, font_path=font_path, template=template, encode_settings=encode_settings
+        )
+        # Inline batches use the caller's store, where the write may still be in the background
+        encoded.persist()
+        return OverlayResult(index, caption, template, encoded.path, time.perf_counter() - start, encoded.size_bytes)
+    except Exception as e:
+        return OverlayResult(index, caption, template, None, time.perf_counter() - start, error=str(e))
+
 
 class YoDawgImageGenerator:
-    def overlay_quote_on_static_image(self, caption, static_image_path, output_path, font_path=None):
+    def overlay_quote_on_static_image(
+        self, caption, static_image_path, output_path=None, font_path=None, template=None, encode_settings=None
+    ):
+        """
+        Overlay the Yo Dawg meme caption (split by '|||') on a static image. See render_static_overlay.
         """
-        Overlay the Yo Dawg meme caption (split by '|||') on a static image, using meme-style font.
-        :param caption: Meme caption, two lines separated by '|||'.
-        :param static_image_path: Path to the static image file (e.g., PNG of Xzibit).
-        :param output_path: Path to save the new meme image.
-        :param font_path: Optional path to a .ttf font file. If not provided, tries bundled font, then system fonts.
+        with span("overlay"):
+            return render_static_overlay(
+                caption, static_image_path, output_path, font_path=font_path, template=template,
+                encode_settings=encode_settings, model=self.model_id
+            )
+
+    @staticmethod
+    def overlay_quotes_batch(
+        captions: List[str],
+        output_dir: Optional[str] = None,
+        templates: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        font_path: Optional[str] = None,
+        encode_settings: Optional[EncodeSettings] = None,
+    ) -> Iterator[OverlayResult]:
+        """
+        Render many captions onto static templates across a process pool, yielding each
+        OverlayResult as soon as its render finishes (completion order, not input order).
+        :param captions: Meme captions, each two lines separated by '|||'.
+        :param output_dir: Directory to write the rendered images to (default: the image store).
+        :param templates: Optional template names or image paths; one for all captions, or one per caption.
+            Defaults to the pool's default template.
+        :param max_workers: Worker processes (default: YODAWG_BATCH_WORKERS or CPU count). 1 renders inline.
+        :param font_path: Optional path to a .ttf font file.
+        :param encode_settings: Optional EncodeSettings for every output (default: from environment).
         """
-        import re
-        # Only remove <think> blocks if present
-        if '<think>' in caption:
-            cleaned_caption = re.sub(r'<think>.*?</think>', '', caption, flags=re.DOTALL)
-        else:
-            cleaned_caption = caption
-        # Remove any lines that do not start with 'YO DAWG' or are not after the split
-        if '|||' in cleaned_caption:
-            meme_lines = [p.strip() for p in cleaned_caption.split('|||', 1)]
-        else:
-            # Try to find the YO DAWG line and punchline
-            lines = [line.strip() for line in cleaned_caption.splitlines() if line.strip()]
-            top = next((l for l in lines if l.upper().startswith('YO DAWG')), lines[0] if lines else '')
-            bottom = next((l for l in lines if l != top), '')
-            meme_lines = [top, bottom]
-        top, bottom = meme_lines if len(meme_lines) == 2 else (meme_lines[0], "")
-        # Load image
-        img = Image.open(static_image_path).convert("RGBA")
-        draw = ImageDraw.Draw(img)
-        # Font setup - cloud-native font fallback chain
-        font = None
-        font_size = 80
-        font_candidates = []
-        font_path_used = None
-        if font_path:
-            font_candidates.append(font_path)
-        
-        # Bundled fonts (local development)
-        bundled_font = os.path.join(os.path.dirname(__file__), "impact.ttf")
-        if os.path.exists(bundled_font):
-            font_candidates.append(bundled_font)
-        anton_font = os.path.join(os.path.dirname(__file__), "Anton-Regular.ttf")
-        if os.path.exists(anton_font):
-            font_candidates.append(anton_font)
-        
-        # Container fonts (cloud-native - downloaded in Dockerfile)
-        font_candidates.append("/usr/share/fonts/truetype/meme-fonts/impact.ttf")
-        font_candidates.append("/usr/share/fonts/truetype/meme-fonts/Anton-Regular.ttf")
-        font_candidates.append("/usr/share/fonts/truetype/meme-fonts/Oswald-Bold.ttf")
-        
-        # Backwards compatibility - check fonts directory
-        container_anton_font = "/action-server/actions/fonts/Anton-Regular.ttf"
-        if os.path.exists(container_anton_font):
-            font_candidates.append(container_anton_font)
-        container_impact_font = "/action-server/actions/fonts/impact.ttf"
-        if os.path.exists(container_impact_font):
-            font_candidates.append(container_impact_font)
-        container_oswald_font = "/action-server/actions/fonts/Oswald-Bold.ttf"
-        if os.path.exists(container_oswald_font):
-            font_candidates.append(container_oswald_font)
-        
-        # System fonts fallback
-        font_candidates.append("/usr/share/fonts/truetype/impact/impact.ttf")
-        font_candidates.append("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
-        font_candidates.append("C:/Windows/Fonts/impact.ttf")  # Windows
-        font_candidates.append("/Library/Fonts/Impact.ttf")     # macOS
-        font_candidates.append("/Library/Fonts/Arial Black.ttf") # macOS
-        for candidate in font_candidates:
-            try:
-                font = ImageFont.truetype(candidate, font_size)
-                font_path_used = candidate
-                break
-            except Exception:
-                continue
-        if font is None:
-            font = ImageFont.load_default()
-            font_path_used = None
-        # Text settings
-        def draw_text(text, y, font, img, draw):
-            max_width = img.width - 40  # 20px margin on each side
-            font_size_local = font.size if hasattr(font, 'size') else 80
-            w = None
-            while font_size_local > 10:
-                bbox = draw.textbbox((0, 0), text, font=font)
-                w = bbox[2] - bbox[0]
-                if w <= max_width:
-                    break
-                font_size_local -= 4
-                if font_path_used:
-                    try:
-                        font = ImageFont.truetype(font_path_used, font_size_local)
-                    except Exception:
-                        font = ImageFont.load_default()
-                else:
-                    font = ImageFont.load_default()
-            if w is None:
-                bbox = draw.textbbox((0, 0), text, font=font)
-                w = bbox[2] - bbox[0]
-            x = (img.width - w) // 2
-            outline_range = 4
-            for ox in range(-outline_range, outline_range+1):
-                for oy in range(-outline_range, outline_range+1):
-                    draw.text((x+ox, y+oy), text, font=font, fill="black")
-            draw.text((x, y), text, font=font, fill="white")
-        # Top text
-        draw_text(top, 40, font, img, draw)
-        # Bottom text
-        draw_text(bottom, img.height - 140, font, img, draw)
-        img.save(output_path)
-        print(f"Static meme saved to {output_path}")
-        # ---
-        # To use a custom font, place a .ttf file (e.g., impact.ttf or Anton-Regular.ttf) in the same directory as this script,
-        # or provide the font_path argument. If no meme-style font is found, falls back to system fonts or PIL default.
+        if not captions:
+            return
+        pool = get_template_pool()
+        templates = list(templates or [DEFAULT_TEMPLATE])
+        if len(templates) == 1:
+            templates = templates * len(captions)
+        if len(templates) != len(captions):
+            raise ValueError("Provide either one template for all captions or one template per caption.")
+        # Resolve names and paths up front so workers can register them under any start method
+        resolved = []
+        for template in templates:
+            if not pool.has(template):
+                if not os.path.exists(template):
+                    raise ValueError(f"Unknown meme template: {template}")
+                pool.register(template, template)
+            resolved.append(template)
+        worker_templates = sorted({(name, pool.path(name)) for name in resolved})
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        batch_id = int(time.time() * 1000)
+        encode_settings = encode_settings or EncodeSettings.from_env()
+        jobs = [
+            (
+                i, caption, template,
+                os.path.join(output_dir, f"yo_dawg_static_{batch_id}_{i}.png") if output_dir else None,
+                font_path, encode_settings,
+            )
+            for i, (caption, template) in enumerate(zip(captions, resolved))
+        ]
+        workers = max_workers or int(os.getenv("YODAWG_BATCH_WORKERS") or 0) or os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+        if workers == 1:
+            for job in jobs:
+                yield _render_overlay_job(*job)
+            return
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_overlay_worker, initargs=(worker_templates, font_path)
+        ) as executor:
+            futures = [executor.submit(_render_overlay_job, *job) for job in jobs]
+            for future in as_completed(futures):
+                yield future.result()
+
     def __init__(self, model: str):
-        load_dotenv()
-        if not model:
+        """
+        :param model: An OpenAI model id or 'ollama:<name>', or an ordered, comma-separated list of
+            them (e.g. 'ollama:phi4,gpt-4o-mini') for routed, hedged caption generation.
+        """
+        self.model_ids = parse_model_list(model or "")
+        if not self.model_ids:
             raise ValueError("Model is required; no default is set. Provide an OpenAI model id or 'ollama:<name>'.")
-        # Support Ollama via OpenAI API compatibility
-        if str(model).startswith("ollama:"):
-            # Example: model="ollama:llama2"
-            self.model = model.split(":", 1)[1]
-            self.client = OpenAI(base_url="http://localhost:11434/v1", api_key="ollama")
-        else:
-            self.model = model
-            self.client = OpenAI()
+        # Full model spec (incl. any 'ollama:' prefix and fallbacks) keys caches
+        self.model_id = ",".join(self.model_ids)
+        # Images come from the first OpenAI model in the list (Ollama has no image generation)
+        image_model = next((m for m in self.model_ids if not m.startswith("ollama:")), self.model_ids[0])
+        # Shared, keep-alive client per backend (Ollama via OpenAI API compatibility)
+        self.client, self.model = get_client_registry().for_model(image_model)
+        self.last_caption_metrics = {}
+        self.last_route = None
+        self.last_input = None
 
     # ─────────────────────────────────────────
     # 1. Funnier, zero‑parrot caption prompt
@@ -162,9 +296,10 @@ class YoDawgImageGenerator:
             "Return exactly two lines separated by '|||'."
         )
 
-    def get_chat_completion(self, prompt):
-        return self.client.chat.completions.create(
-            model=self.model,
+    def get_chat_completion(self, prompt, model_id=None):
+        client, model = get_client_registry().for_model(model_id) if model_id else (self.client, self.model)
+        return client.chat.completions.create(
+            model=model,
             messages=[{"role": "user", "content": prompt}]
         )
 
@@ -234,10 +369,75 @@ class YoDawgImageGenerator:
             return line[:max_len] + ("…" if len(line) > max_len else "")
         return f"{shorten(top)}|||{shorten(bottom)}"
 
-    def generate_yo_dawg_quote(self, yo_dawg_content):
-        prompt = self.build_caption_prompt(yo_dawg_content)
-        resp = self.get_chat_completion(prompt)
+    def generate_yo_dawg_quote(self, yo_dawg_content, use_cache=True, force_refresh=False, stream=None, custom_context=None):
+        """
+        Generate a two-line caption, serving repeats from the persistent caption cache.
+        The content is normalized and trimmed to the caption token budget first (see
+        caption_input.prepare_caption_input); self.last_input keeps the token counts and
+        self.last_caption_metrics the timing of the last call.
+        :param yo_dawg_content: Content to caption.
+        :param use_cache: Read and write the caption cache (default: True).
+        :param force_refresh: Skip the cache lookup but still store the fresh caption.
+        :param stream: Stream the completion and stop at the first complete caption
+            (default: YODAWG_CAPTION_STREAMING, false).
+        :param custom_context: Optional custom context appended to the content; never trimmed.
+        """
+        with span("caption"):
+            start = time.perf_counter()
+            with span("preprocess"):
+                self.last_input = prepare_caption_input(yo_dawg_content, custom_context=custom_context)
+            count("caption_input_tokens", self.last_input.original_tokens)
+            count("caption_sent_tokens", self.last_input.sent_tokens)
+            # Cached by the cleaned text, so posts that differ only in noise share a caption
+            yo_dawg_content = self.last_input.text
+            cache = get_caption_cache() if use_cache else None
+            key = caption_cache_key(yo_dawg_content, self.model_id, CAPTION_PROMPT_VERSION) if cache else None
+            if cache and not force_refresh:
+                cached = cache.get_entry(key)
+                if cached:
+                    caption, model = cached
+                    count("caption_cache_hits")
+                    seconds = time.perf_counter() - start
+                    self.last_caption_metrics = {"cache_hit": True, "time_to_caption": round(seconds, 4)}
+                    # Entries written before the winner was stored hold the whole model list
+                    self.last_route = RouteResult(model, seconds, cached=True) if "," not in model else None
+                    return caption
+                count("caption_cache_misses")
+            if stream is None:
+                stream = bool_env("YODAWG_CAPTION_STREAMING", False)
+            caption = self._generate_yo_dawg_quote(yo_dawg_content, stream=stream)
+            if cache:
+                cache.put(key, self.last_route.model if self.last_route else self.model_id, caption)
+            return caption
+
+    def _caption_from(self, model_id, prompt, stream=False):
+        """
+        One caption attempt against a single model: (caption, metrics).
+        """
+        if stream:
+            client, model = get_client_registry().for_model(model_id)
+            return stream_caption(client, model, prompt)
+        start = time.perf_counter()
+        resp = self.get_chat_completion(prompt, model_id)
         caption = self.extract_caption_from_response(resp)
+        return caption, {"time_to_caption": round(time.perf_counter() - start, 4)}
+
+    def _generate_yo_dawg_quote(self, yo_dawg_content, stream=False):
+        prompt = self.build_caption_prompt(yo_dawg_content)
+        (caption, metrics), route = get_model_router().route(
+            self.model_ids,
+            lambda model_id: self._caption_from(model_id, prompt, stream=stream),
+            valid=lambda result: "|||" in result[0],
+        )
+        self.last_route = route
+        if route.hedged:
+            count("caption_hedges")
+        if route.model != self.model_ids[0]:
+            count("caption_fallbacks")
+        # Wall time of the whole route, including any hedge or fallback
+        metrics = dict(metrics, time_to_caption=round(route.seconds, 4), model=route.model, route=route.describe())
+        self.last_caption_metrics = {"cache_hit": False, "streamed": bool(stream), **metrics}
+        print(f"Caption generated in {metrics['time_to_caption']}s ({self.last_caption_metrics})")
         # Hard cap: 80 chars per line (OpenAI docs & tests show DALLE handles this cleanly)
         try:
             top, bottom = [p.strip() for p in caption.split("|||", 1)]
@@ -247,10 +447,33 @@ class YoDawgImageGenerator:
             caption = self.truncate_and_rewrap(caption, max_len=80)
         return caption
 
-    def generate_image(self, yo_dawg_caption, output_path):
-        image_prompt = self.build_image_prompt(yo_dawg_caption)
+    def _generate_image_bytes(self, image_prompt):
         image_base64 = self.generate_image_base64(image_prompt)
-        if image_base64:
-            self.save_image(image_base64, output_path)
-        else:
+        return base64.b64decode(image_base64) if image_base64 else None
+
+    def generate_image(self, yo_dawg_caption, output_path=None, encode_settings=None, use_cache=True):
+        """
+        Generate the meme image and write it through the output encoder (to output_path, or
+        into the image store when None). Images are cached by (image model, image prompt), and
+        concurrent requests for the same image share a single upstream call.
+        :return: EncodeResult, or None if the model returned no image.
+        """
+        image_prompt = self.build_image_prompt(yo_dawg_caption)
+        with span("image"):
+            if use_cache:
+                key = image_cache_key(self.model, image_prompt)
+                image_bytes = get_image_cache().get_or_create(key, lambda: self._generate_image_bytes(image_prompt))
+            else:
+                image_bytes = self._generate_image_bytes(image_prompt)
+        if not image_bytes:
             print("No image generated.")
+            return None
+        from PIL import Image
+
+        with span("encode"), Image.open(io.BytesIO(image_bytes)) as img:
+            encoded = encode_image(
+                img, output_path, encode_settings,
+                metadata={"caption": yo_dawg_caption, "model": self.model_id, "mode": "rich"},
+            )
+        print(f"Image saved to {encoded.path} ({encoded.size_bytes} bytes, {encoded.settings})")
+        return encoded
@@ -0,0 +1,319 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# Memes used (stored or deduplicated) this recently are never collected, so a comment
+# flow always finds the image it just stored, even while another request runs GC.
+_GC_GRACE_SECONDS = 600
+
+_INDEX_NAME = "index.sqlite3"
+
+PERSIST_MODES = ("sync", "async", "off")
+
+# Files the store writes: <key>.<ext>, and <key>.<ext>.<pid>.<thread>.tmp while writing
+_STORE_FILE = re.compile(r"^[0-9a-f]{32}\.\w+(?:\.\d+\.\d+\.tmp)?$")
+
+_COLUMNS = "key, path, caption, model, mode, format, width, height, size_bytes, created_at, last_used_at, uses"
+
+
+def _key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+@dataclass
+class StoredImage:
+    key: str
+    path: str
+    caption: Optional[str]
+    model: Optional[str]
+    mode: Optional[str]
+    format: str
+    width: int
+    height: int
+    size_bytes: int
+    created_at: float
+    last_used_at: float
+    uses: int
+
+    def describe(self) -> str:
+        created = datetime.fromtimestamp(self.created_at).isoformat(timespec="seconds")
+        caption = (self.caption or "").replace("|||", " / ")
+        if len(caption) > 60:
+            caption = caption[:57] + "..."
+        return (
+            f"{self.path} [{self.mode or '-'}, {self.model or '-'}, {self.format} {self.width}x{self.height}, "
+            f"{self.size_bytes} bytes, created {created}, used {self.uses}x] {caption}"
+        )
+
+
+class ImageStore:
+    """
+    Content-addressed store for finished memes. Each image is written atomically as
+    <sha256 of its bytes>.<ext>, so identical renders share one file and concurrent
+    requests can never overwrite each other's memes. A SQLite index next to the images
+    keeps caption, model, mode, size and times; past the quota the least recently used
+    memes are removed.
+
+    Memes are uploaded from memory, so writing them here is off the critical path: in
+    async mode (the default) put_async hands the bytes to a background writer and the
+    path is known up front from the content hash.
+
+    Environment variables:
+    - YODAWG_IMAGE_STORE_DIR: directory for memes and the index (default: yo-dawg-images)
+    - YODAWG_IMAGE_STORE_MAX_BYTES: total size quota (default: 536870912, 512 MiB)
+    - YODAWG_IMAGE_STORE_MAX_ENTRIES: meme count quota (default: 2000)
+    - YODAWG_IMAGE_PERSIST: sync|async|off, how new memes reach the disk (default: async)
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        self.directory = directory or os.getenv("YODAWG_IMAGE_STORE_DIR") or "yo-dawg-images"
+        self.max_bytes = max_bytes or int(os.getenv("YODAWG_IMAGE_STORE_MAX_BYTES") or 512 * 1024 * 1024)
+        self.max_entries = max_entries or int(os.getenv("YODAWG_IMAGE_STORE_MAX_ENTRIES") or 2000)
+        self.stored = 0
+        self.deduplicated = 0
+        self.collected = 0
+        self.bytes_written = 0
+        self.persist = (os.getenv("YODAWG_IMAGE_PERSIST") or "async").strip().lower()
+        if self.persist not in PERSIST_MODES:
+            print(f"Unknown YODAWG_IMAGE_PERSIST={self.persist}, using async.")
+            self.persist = "async"
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._pending: set = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, _INDEX_NAME), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " key TEXT PRIMARY KEY, path TEXT NOT NULL, caption TEXT, model TEXT, mode TEXT,"
+                " format TEXT NOT NULL, width INTEGER NOT NULL, height INTEGER NOT NULL,"
+                " size_bytes INTEGER NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL,"
+                " uses INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS images_last_used ON images(last_used_at)")
+            self._conn = conn
+        return self._conn
+
+    def path_for(self, data: bytes, extension: str) -> str:
+        """
+        Where put() stores these bytes.
+        """
+        return os.path.join(self.directory, f"{_key(data)}{extension}")
+
+    def put(
+        self,
+        data: bytes,
+        extension: str,
+        caption: Optional[str] = None,
+        model: Optional[str] = None,
+        mode: Optional[str] = None,
+        width: int = 0,
+        height: int = 0,
+    ) -> Tuple[StoredImage, bool]:
+        """
+        Store encoded image bytes under their content hash.
+        :param extension: File extension including the dot, e.g. '.jpg'.
+        :return: (stored image, True if new or False if an identical meme was already stored).
+        """
+        key = _key(data)
+        path = os.path.join(self.directory, f"{key}{extension}")
+        image_format = extension.lstrip(".").lower().replace("jpg", "jpeg")
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # Other processes (batch workers, action server workers) share the index: take the
+            # write lock up front so lookup, file write and insert are one step for all of them
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT key FROM images WHERE key = ?", (key,)).fetchone()
+                if row is None or not os.path.exists(path):
+                    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, path)
+                    self.bytes_written += len(data)
+                conn.execute(
+                    f"INSERT INTO images ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)"
+                    " ON CONFLICT(key) DO UPDATE SET last_used_at = excluded.last_used_at, uses = uses + 1",
+                    (key, path, caption, model, mode, image_format, width, height, len(data), now, now),
+                )
+                if row is None:
+                    self.stored += 1
+                else:
+                    self.deduplicated += 1
+                self._collect(conn, now, self.max_bytes, self.max_entries)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            image = StoredImage(*conn.execute(f"SELECT {_COLUMNS} FROM images WHERE key = ?", (key,)).fetchone())
+        return image, row is None
+
+    def put_async(self, data: bytes, extension: str, **metadata) -> Future:
+        """
+        Store the bytes on a background writer thread (see put); the future resolves to put()'s result.
+        """
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yodawg-image-store")
+            future = self._writer.submit(self.put, data, extension, **metadata)
+            self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Wait for memes queued by put_async to be written.
+        """
+        for future in list(self._pending):
+            future.result(timeout=timeout)
+
+    def _remove(self, conn: sqlite3.Connection, key: str, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        conn.execute("DELETE FROM images WHERE key = ?", (key,))
+        self.collected += 1
+
+    def _collect(
+        self, conn: sqlite3.Connection, now: float, max_bytes: int, max_entries: int, max_age: float = 0
+    ) -> Tuple[int, int]:
+        """
+        Remove least recently used memes until the index fits the quotas (and the age limit).
+        Returns (memes removed, bytes freed).
+        """
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM images").fetchone()
+        removed = freed = 0
+        rows = conn.execute(
+            "SELECT key, path, size_bytes, last_used_at FROM images WHERE last_used_at < ? ORDER BY last_used_at ASC",
+            (now - _GC_GRACE_SECONDS,),
+        ).fetchall()
+        for key, path, size, last_used in rows:
+            expired = max_age and now - last_used > max_age
+            if not expired and entries <= max_entries and total <= max_bytes:
+                break
+            self._remove(conn, key, path)
+            entries -= 1
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def list_images(self, limit: int = 20, mode: Optional[str] = None) -> List[StoredImage]:
+        """
+        Most recently used memes first, optionally only one mode ('poor' or 'rich').
+        """
+        query = f"SELECT {_COLUMNS} FROM images"
+        params: tuple = ()
+        if mode:
+            query += " WHERE mode = ?"
+            params = (mode,)
+        query += " ORDER BY last_used_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._connect().execute(query, params + (int(limit),)).fetchall()
+        return [StoredImage(*row) for row in rows]
+
+    def prune(
+        self,
+        max_age_seconds: float = 0,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        remove_untracked: bool = False,
+    ) -> dict:
+        """
+        Collect memes now: older than max_age_seconds (by last use) or beyond the given quotas
+        (default: the store's own). remove_untracked also deletes files in the directory the index
+        does not know. Only files named like the store's own (<hash>.<ext>) are touched, so
+        dotfiles such as .gitkeep and anything else kept in the directory survive.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            removed, freed = self._collect(
+                conn, now, max_bytes or self.max_bytes, max_entries or self.max_entries, max_age=max_age_seconds
+            )
+            # Index entries whose file is gone (removed by hand) are dropped as well
+            for key, path in conn.execute("SELECT key, path FROM images").fetchall():
+                if not os.path.exists(path):
+                    conn.execute("DELETE FROM images WHERE key = ?", (key,))
+            conn.commit()
+            untracked = untracked_bytes = 0
+            if remove_untracked:
+                known = {os.path.basename(row[0]) for row in conn.execute("SELECT path FROM images")}
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    if name in known or not _STORE_FILE.match(name) or not os.path.isfile(path):
+                        continue
+                    if name.endswith(".tmp") and now - os.path.getmtime(path) < _GC_GRACE_SECONDS:
+                        continue  # a write in progress
+                    untracked_bytes += os.path.getsize(path)
+                    os.remove(path)
+                    untracked += 1
+        return {
+            "removed": removed,
+            "bytes_freed": freed,
+            "untracked_removed": untracked,
+            "untracked_bytes_freed": untracked_bytes,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM images"
+            ).fetchone()
+        return {
+            "directory": self.directory,
+            "entries": entries,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "collected": self.collected,
+            "bytes_written": self.bytes_written,
+            "persist": self.persist,
+            "pending_writes": len(self._pending),
+        }
+
+
+_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """
+    Return the process-wide meme image store, creating it on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ImageStore()
+    return _store
+
+
+def reset_image_store(persist: Optional[str] = None) -> ImageStore:
+    """
+    Replace the process-wide store with a fresh one, with its own SQLite connection and
+    writer thread. Forked workers call this so they never use the parent's connection or
+    its (in the child, dead) background writer.
+    :param persist: Optional override of YODAWG_IMAGE_PERSIST for the new store.
+    """
+    global _store, _store_lock
+    _store_lock = threading.Lock()
+    _store = ImageStore()
+    if persist:
+        _store.persist = persist
+    return _store
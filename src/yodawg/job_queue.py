@@ -0,0 +1,482 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import IO, Callable, Dict, List, Optional
+
+from .browser_session import BrowserSession
+from .caption_cache import default_cache_dir
+from .post_content import canonical_post_url
+from .telemetry import get_telemetry
+
+# Job states. A job moves fetch -> generate -> post; fetch is skipped when the post text
+# is already cached. 'submitting' marks the point after which a post is never retried
+# automatically: a crash there ends in 'post_unknown' rather than risking a double comment.
+FETCH_PENDING = "fetch_pending"
+FETCHING = "fetching"
+GENERATE_PENDING = "generate_pending"
+GENERATING = "generating"
+POST_PENDING = "post_pending"
+POSTING = "posting"
+SUBMITTING = "submitting"
+DONE = "done"
+FAILED = "failed"
+POST_UNKNOWN = "post_unknown"
+
+_STAGE_OF = {FETCHING: "fetch", GENERATING: "generate", POSTING: "post", SUBMITTING: "post"}
+_PENDING_OF = {FETCHING: FETCH_PENDING, GENERATING: GENERATE_PENDING, POSTING: POST_PENDING}
+FINAL_STATES = (DONE, FAILED, POST_UNKNOWN)
+
+_COLUMNS = (
+    "id", "idempotency_key", "post_url", "mode", "model", "custom_context", "output_format",
+    "state", "attempts", "next_attempt_at", "lease_until", "lease_owner", "post_content", "caption",
+    "image_path", "result", "last_error", "timings", "created_at", "updated_at",
+)
+
+
+def _try_lock(path: str) -> Optional[IO]:
+    """
+    Take an exclusive, non-blocking lock on path (created if missing) that the OS drops when
+    the process exits. Returns the open handle, which must stay open to hold the lock, or None
+    if another holder has it.
+    """
+    handle = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+@dataclass
+class Job:
+    id: str
+    idempotency_key: str
+    post_url: str
+    mode: str
+    model: str
+    custom_context: Optional[str]
+    output_format: Optional[str]
+    state: str
+    attempts: int
+    next_attempt_at: float
+    lease_until: float
+    lease_owner: Optional[str]
+    post_content: Optional[str]
+    caption: Optional[str]
+    image_path: Optional[str]
+    result: Optional[str]
+    last_error: Optional[str]
+    timings: Optional[str]
+    created_at: float
+    updated_at: float
+
+    def timings_dict(self) -> Dict[str, float]:
+        return json.loads(self.timings) if self.timings else {}
+
+    def describe(self) -> str:
+        line = f"{self.id} {self.state} {self.post_url} (mode={self.mode}, attempts={self.attempts})"
+        if self.result:
+            line += f" {self.result}"
+        if self.last_error and self.state != DONE:
+            line += f" last_error={self.last_error}"
+        timings = self.timings_dict()
+        if timings:
+            line += " Timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+        return line
+
+
+class JobQueue:
+    """
+    Durable SQLite job queue that splits commenting into a browser stage (fetching post
+    text, posting comments) and a generation stage (caption and image), each served by
+    its own worker pool. Jobs carry an idempotency key per post (the canonical post URL),
+    so a post is never commented twice; failed stages retry with exponential backoff.
+
+    Playwright's sync API is thread-bound, so every browser worker owns its own session
+    with its own persistent profile (browser_context_queue_<n>), logged in on first use.
+    Several processes can serve one database: a worker holds a lock file on its profile
+    (browser_context_queue_<n>.lock) and takes the next free one if another process has it,
+    and claimed jobs carry the claiming process's lease, so a worker whose lease ran out
+    and whose job was claimed elsewhere cannot overwrite it.
+
+    Environment variables:
+    - YODAWG_QUEUE_PATH: database file (default: <YODAWG_CACHE_DIR>/jobs.sqlite3)
+    - YODAWG_QUEUE_GENERATE_WORKERS: generation worker threads (default: 2)
+    - YODAWG_QUEUE_POST_WORKERS: browser worker threads, one browser each (default: 1)
+    - YODAWG_QUEUE_MAX_ATTEMPTS: attempts per stage before the job fails (default: 3)
+    - YODAWG_QUEUE_BACKOFF_SECONDS: base retry delay, doubled per attempt with jitter (default: 10)
+    - YODAWG_QUEUE_LEASE_SECONDS: a claimed job is considered abandoned after this (default: 900)
+    - YODAWG_QUEUE_POLL_SECONDS: idle worker poll interval (default: 2)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("YODAWG_QUEUE_PATH") or os.path.join(default_cache_dir(), "jobs.sqlite3")
+        self.generate_workers = int(os.getenv("YODAWG_QUEUE_GENERATE_WORKERS") or 2)
+        self.post_workers = int(os.getenv("YODAWG_QUEUE_POST_WORKERS") or 1)
+        self.max_attempts = int(os.getenv("YODAWG_QUEUE_MAX_ATTEMPTS") or 3)
+        self.backoff = float(os.getenv("YODAWG_QUEUE_BACKOFF_SECONDS") or 10)
+        self.lease = float(os.getenv("YODAWG_QUEUE_LEASE_SECONDS") or 900)
+        self.poll = float(os.getenv("YODAWG_QUEUE_POLL_SECONDS") or 2)
+        self.fetch_handler: Optional[Callable] = None
+        self.generate_handler: Optional[Callable] = None
+        self.post_handler: Optional[Callable] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        # Lease owner written on claimed jobs: unique per process (and per queue object)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._autostart_lock: Optional[IO] = None
+
+    # ───────────── storage ─────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, idempotency_key TEXT NOT NULL UNIQUE, post_url TEXT NOT NULL,"
+                " mode TEXT NOT NULL, model TEXT NOT NULL, custom_context TEXT, output_format TEXT,"
+                " state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL DEFAULT 0, lease_until REAL NOT NULL DEFAULT 0, lease_owner TEXT,"
+                " post_content TEXT, caption TEXT, image_path TEXT, result TEXT, last_error TEXT,"
+                " timings TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            if "lease_owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, next_attempt_at)")
+            self._conn = conn
+        return self._conn
+
+    def _row(self, row) -> Optional[Job]:
+        return Job(*row) if row else None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row(row)
+
+    def list_jobs(self, states: Optional[List[str]] = None, limit: int = 20) -> List[Job]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        args: list = []
+        if states:
+            query += f" WHERE state IN ({', '.join('?' for _ in states)})"
+            args.extend(states)
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._connect().execute(query, args).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _update_claimed(self, job: Job, **fields) -> bool:
+        """
+        Update a job this process claimed, only while it still holds the lease. Returns False
+        (and changes nothing) if the lease ran out and another worker claimed the job since.
+        """
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND lease_owner = ?", (*fields.values(), job.id, self.owner)
+            )
+        if not cursor.rowcount:
+            print(f"Job {job.id} was claimed by another worker after its lease ran out; dropping this result.")
+        return bool(cursor.rowcount)
+
+    # ───────────── producers ─────────────
+
+    def enqueue(
+        self,
+        post_url: str,
+        mode: str,
+        model: str,
+        custom_context: Optional[str] = None,
+        output_format: Optional[str] = None,
+        post_content: Optional[str] = None,
+    ):
+        """
+        Add a comment job unless the post already has one. A post whose earlier job
+        failed without commenting gets that job reset; a done or possibly-posted job is returned as is.
+        :return: (job, created) where created is False when an existing job was returned.
+        """
+        key = canonical_post_url(post_url)
+        now = time.time()
+        state = GENERATE_PENDING if post_content else FETCH_PENDING
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE idempotency_key = ?", (key,)
+                ).fetchone()
+                existing = self._row(row)
+                if existing and existing.state != FAILED:
+                    conn.execute("COMMIT")
+                    return existing, False
+                if existing:
+                    # Failed before anything was submitted: safe to run again with the new parameters
+                    conn.execute(
+                        "UPDATE jobs SET post_url = ?, mode = ?, model = ?, custom_context = ?, output_format = ?,"
+                        " state = ?, attempts = 0, next_attempt_at = 0, lease_until = 0, lease_owner = NULL, post_content = ?,"
+                        " caption = NULL, image_path = NULL, result = NULL, last_error = NULL, timings = NULL,"
+                        " updated_at = ? WHERE id = ?",
+                        (post_url, mode, model, custom_context, output_format, state, post_content, now, existing.id),
+                    )
+                    job_id = existing.id
+                else:
+                    job_id = uuid.uuid4().hex[:12]
+                    conn.execute(
+                        "INSERT INTO jobs (id, idempotency_key, post_url, mode, model, custom_context, output_format,"
+                        " state, post_content, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, key, post_url, mode, model, custom_context, output_format, state, post_content, now, now),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._notify()
+        return self.get(job_id), True
+
+    # ───────────── workers ─────────────
+
+    def _claim(self, transitions: Dict[str, str]) -> Optional[Job]:
+        """
+        Atomically move the oldest due job in one of the pending states to its running state
+        (transitions maps pending -> running). Jobs whose lease expired (their worker died) go
+        back to pending first; abandoned submits become post_unknown.
+        """
+        pending = list(transitions)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, last_error = 'worker stopped while submitting', updated_at = ?"
+                    " WHERE state = ? AND lease_until < ?",
+                    (POST_UNKNOWN, now, SUBMITTING, now),
+                )
+                for stale, back in _PENDING_OF.items():
+                    conn.execute(
+                        "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ? AND lease_until < ?",
+                        (back, now, stale, now),
+                    )
+                placeholders = ", ".join("?" for _ in pending)
+                row = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE state IN ({placeholders})"
+                    " AND next_attempt_at <= ? ORDER BY next_attempt_at, created_at LIMIT 1",
+                    (*pending, now),
+                ).fetchone()
+                job = self._row(row)
+                if job:
+                    running_state = transitions[job.state]
+                    conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_until = ?, lease_owner = ?,"
+                        " updated_at = ? WHERE id = ?",
+                        (running_state, now + self.lease, self.owner, now, job.id),
+                    )
+                    job.state = running_state
+                    job.attempts += 1
+                    job.lease_until = now + self.lease
+                    job.lease_owner = self.owner
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _retry_or_fail(self, job: Job, error: Exception, pending_state: str):
+        message = f"{type(error).__name__}: {error}"
+        if job.attempts >= self.max_attempts:
+            get_telemetry().incr("job_failures", action=f"queue_{_STAGE_OF.get(job.state, job.state)}")
+            print(f"Job {job.id} failed in {_STAGE_OF.get(job.state, job.state)} after {job.attempts} attempts: {message}")
+            self._update_claimed(job, state=FAILED, last_error=message, lease_until=0)
+            return
+        delay = self.backoff * (2 ** (job.attempts - 1)) * random.uniform(0.8, 1.2)
+        get_telemetry().incr("job_retries", action=f"queue_{_STAGE_OF.get(job.state, job.state)}")
+        print(f"Job {job.id} {_STAGE_OF.get(job.state, job.state)} attempt {job.attempts} failed, retrying in {delay:.1f}s: {message}")
+        self._update_claimed(
+            job, state=pending_state, last_error=message, lease_until=0, next_attempt_at=time.time() + delay
+        )
+
+    def _advance(self, job: Job, state: str, timings: Dict[str, float], **fields):
+        merged = job.timings_dict()
+        for name, seconds in timings.items():
+            if name != "total":
+                merged[name] = round(merged.get(name, 0.0) + seconds, 3)
+        # Attempts count per stage
+        if self._update_claimed(
+            job, state=state, attempts=0, lease_until=0, next_attempt_at=0, timings=json.dumps(merged), **fields
+        ):
+            self._notify()
+
+    def mark_submitting(self, job: Job):
+        """
+        Called by the post handler right before it submits; from here on the job is never retried.
+        Raises if the job's lease was lost, so the comment is not submitted twice.
+        """
+        if not self._update_claimed(job, state=SUBMITTING):
+            raise RuntimeError(f"Lease on job {job.id} was lost before submitting.")
+
+    def _generate_loop(self):
+        while not self._stop.is_set():
+            job = self._claim({GENERATE_PENDING: GENERATING})
+            if job is None:
+                self._idle()
+                continue
+            try:
+                caption, image_path, timings = self.generate_handler(job)
+                self._advance(job, POST_PENDING, timings, caption=caption, image_path=image_path, last_error=None)
+            except Exception as e:
+                self._retry_or_fail(job, e, GENERATE_PENDING)
+
+    def _lock_profile(self, index: int):
+        """
+        The first browser_context_queue_<n> profile, from n = index, that no other worker holds,
+        with the open lock file that reserves it for this worker.
+        """
+        for slot in range(index, index + 64):
+            directory = os.path.join(os.getcwd(), f"browser_context_queue_{slot}")
+            handle = _try_lock(f"{directory}.lock")
+            if handle is not None:
+                if slot != index:
+                    print(f"Browser profile {index} is in use by another worker; using browser_context_queue_{slot}.")
+                return directory, handle
+        raise RuntimeError("No free browser_context_queue_<n> profile; too many queue workers running.")
+
+    def _browser_loop(self, index: int):
+        directory, profile_lock = self._lock_profile(index)
+        session = BrowserSession(context_directory=directory)
+        try:
+            while not self._stop.is_set():
+                # Posting finished memes first keeps paid-for images from piling up
+                job = self._claim({POST_PENDING: POSTING, FETCH_PENDING: FETCHING})
+                if job is None:
+                    self._idle()
+                    continue
+                if job.state == FETCHING:
+                    try:
+                        post_content, timings = self.fetch_handler(session, job)
+                        self._advance(job, GENERATE_PENDING, timings, post_content=post_content, last_error=None)
+                    except Exception as e:
+                        self._retry_or_fail(job, e, FETCH_PENDING)
+                    continue
+                try:
+                    result, timings = self.post_handler(session, job, lambda: self.mark_submitting(job))
+                    self._advance(job, DONE, timings, result=result, last_error=None)
+                except Exception as e:
+                    current = self.get(job.id)
+                    if current and current.state == SUBMITTING and current.lease_owner == self.owner:
+                        print(f"Job {job.id} failed after submitting; not retrying: {e}")
+                        self._update_claimed(job, state=POST_UNKNOWN, last_error=f"{type(e).__name__}: {e}", lease_until=0)
+                    else:
+                        self._retry_or_fail(job, e, POST_PENDING)
+        finally:
+            session.stop()
+            profile_lock.close()
+
+    def _idle(self):
+        with self._wake:
+            self._wake.wait(self.poll)
+
+    def _notify(self):
+        with self._wake:
+            self._wake.notify_all()
+
+    def start(self):
+        """
+        Start the worker pools (once per process). Handlers must be set first.
+        """
+        if not (self.fetch_handler and self.generate_handler and self.post_handler):
+            raise RuntimeError("JobQueue handlers must be configured before starting workers.")
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.generate_workers):
+                self._threads.append(threading.Thread(target=self._generate_loop, name=f"yodawg-generate-{i}", daemon=True))
+            for i in range(self.post_workers):
+                self._threads.append(threading.Thread(target=self._browser_loop, args=(i,), name=f"yodawg-browser-{i}", daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def claim_autostart(self) -> bool:
+        """
+        Whether this process should start the workers on its own: true for only one process
+        at a time per database, the one holding <path>.autostart.lock.
+        """
+        with self._lock:
+            if self._autostart_lock is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._autostart_lock = _try_lock(f"{self.path}.autostart.lock")
+            return self._autostart_lock is not None
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stop.clear()
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "running": self.running,
+            "generate_workers": self.generate_workers,
+            "post_workers": self.post_workers,
+            **{f"jobs_{state}": count for state, count in sorted(self.counts().items())},
+        }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Return the process-wide job queue, creating it on first use.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
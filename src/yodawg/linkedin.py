@@ -0,0 +1,232 @@
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from .request_blocking import get_request_blocker
+from .timing import StepTimer, count
+
+EDITOR_NAME = "Text editor for creating"
+EDITOR_FALLBACK_SELECTOR = "[contenteditable='true']"
+PHOTO_BUTTON_SELECTOR = "button[aria-label*='Add a photo'], button[aria-label*='photo']"
+PREVIEW_SELECTOR = "img[alt*='preview'], img[alt*='Image'], [data-test-media-urn], img[class*='comments-media']"
+SUBMIT_SELECTOR = "button.comments-comment-box__submit-button, button[class*='comments-comment-box__submit-button']"
+COMMENT_ITEM_SELECTOR = "article.comments-comment-entity, article.comments-comment-item, .comments-comment-item"
+# LinkedIn creates comments with a POST to a voyager endpoint whose path names comments
+DEFAULT_COMMENT_CREATE_PATTERN = r"/voyager/api/.*comment"
+
+# True once the composer's comment list grew past the count seen before submit,
+# or a comment containing our text (first line) is rendered.
+_NEW_COMMENT_JS = """
+([selector, before, snippet]) => {
+    const items = document.querySelectorAll(selector);
+    if (items.length > before) return true;
+    if (!snippet) return false;
+    return Array.from(items).some(el => (el.innerText || '').includes(snippet));
+}
+"""
+
+
+@dataclass(frozen=True)
+class FlowTimeouts:
+    """
+    Upper bounds (milliseconds) for each waited-on step of the LinkedIn comment flow.
+
+    Environment variables:
+    - YODAWG_NAVIGATION_TIMEOUT: post page reaching DOMContentLoaded (default: 30000)
+    - YODAWG_LOGIN_TIMEOUT: login redirect after submitting credentials (default: 30000)
+    - YODAWG_COMPOSER_TIMEOUT: comment editor becoming visible (default: 10000)
+    - YODAWG_UPLOAD_TIMEOUT: image preview appearing after upload (default: 15000)
+    - YODAWG_COMMENT_CONFIRM_TIMEOUT: comment-create response and the new comment in the DOM (default: 15000)
+    """
+
+    navigation: float = 30000
+    login: float = 30000
+    composer: float = 10000
+    upload: float = 15000
+    confirm: float = 15000
+
+    @classmethod
+    def from_env(cls) -> "FlowTimeouts":
+        return cls(
+            navigation=float(os.getenv("YODAWG_NAVIGATION_TIMEOUT") or cls.navigation),
+            login=float(os.getenv("YODAWG_LOGIN_TIMEOUT") or cls.login),
+            composer=float(os.getenv("YODAWG_COMPOSER_TIMEOUT") or cls.composer),
+            upload=float(os.getenv("YODAWG_UPLOAD_TIMEOUT") or cls.upload),
+            confirm=float(os.getenv("YODAWG_COMMENT_CONFIRM_TIMEOUT") or cls.confirm),
+        )
+
+
+def _comment_create_matcher():
+    pattern = re.compile(os.getenv("YODAWG_COMMENT_CREATE_URL_PATTERN") or DEFAULT_COMMENT_CREATE_PATTERN, re.I)
+
+    def matches(response) -> bool:
+        return response.request.method == "POST" and bool(pattern.search(response.url))
+
+    return matches
+
+
+def open_post(page, post_url: str, timeouts: FlowTimeouts):
+    """
+    Navigate to a post, returning as soon as the DOM is parsed rather than after every asset has loaded.
+    """
+    record = get_request_blocker().start_navigation(page, post_url)
+    start = time.perf_counter()
+    try:
+        page.goto(post_url, wait_until="domcontentloaded", timeout=timeouts.navigation)
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 3)
+
+
+def open_composer(page, timeouts: FlowTimeouts):
+    """
+    Wait for the comment editor to be visible, focus it, and return (editor, container) where
+    container is the surrounding composer (or the page if it cannot be found).
+    """
+    editor = page.get_by_role("textbox", name=EDITOR_NAME).first
+    try:
+        editor.wait_for(state="visible", timeout=timeouts.composer)
+    except Exception:
+        # Fallback: the first visible contenteditable region
+        editor = page.locator(EDITOR_FALLBACK_SELECTOR).first
+        editor.wait_for(state="visible", timeout=timeouts.composer)
+    editor.click()
+
+    # Find the nearest composer container to scope subsequent actions
+    try:
+        container = editor.locator(
+            "xpath=ancestor::*[contains(@class,'comments-comment-box') or contains(@class,'comments-comment-item')]"
+        ).first
+        if container.count() == 0:
+            container = page
+    except Exception:
+        container = page
+    return editor, container
+
+
+def _describe_image(image: Union[str, dict]) -> str:
+    if isinstance(image, dict):
+        return f"{image['name']} (in memory, {len(image['buffer'])} bytes)"
+    return image
+
+
+def upload_image(page, container, image: Union[str, dict], timeouts: FlowTimeouts) -> bool:
+    """
+    Attach an image through the composer's photo button and wait for its preview.
+    :param image: Image file path, or an in-memory file payload ({"name", "mimeType", "buffer"})
+        that set_files uploads without touching the disk.
+    Returns True once the preview is visible.
+    """
+    try:
+        with page.expect_file_chooser(timeout=timeouts.upload) as fc_info:
+            container.locator(PHOTO_BUTTON_SELECTOR).first.click()
+        fc_info.value.set_files(image)
+        page.wait_for_selector(PREVIEW_SELECTOR, timeout=timeouts.upload)
+        print("Image uploaded and preview is visible.")
+        count("images_uploaded")
+        count("bytes_uploaded", len(image["buffer"]) if isinstance(image, dict) else os.path.getsize(image))
+        return True
+    except Exception as e:
+        print(f"Could not upload image: {str(e)}")
+        return False
+
+
+def fill_comment(page, comment_text: str):
+    try:
+        page.get_by_role("textbox", name=EDITOR_NAME).first.fill(comment_text)
+    except Exception:
+        page.locator(EDITOR_FALLBACK_SELECTOR).first.fill(comment_text)
+
+
+def _click_submit(page, container, editor, timeouts: FlowTimeouts):
+    try:
+        # Prefer submit within the same composer container
+        submit_btn = container.locator(SUBMIT_SELECTOR).first
+        submit_btn.wait_for(state="visible", timeout=min(timeouts.composer, 5000))
+        submit_btn.click()
+    except Exception:
+        # Fallback to Ctrl+Enter in the editor
+        try:
+            editor.press("Control+Enter")
+        except Exception:
+            # Last resort: click any visible submit button on the page
+            page.locator(SUBMIT_SELECTOR).first.click()
+
+
+def submit_comment(page, container, editor, comment_text: str, timeouts: FlowTimeouts) -> str:
+    """
+    Submit the comment and wait for LinkedIn to confirm it: the comment-create response
+    and then the new comment in the DOM, each bounded by the confirm timeout.
+    :return: 'confirmed', 'response-only', 'dom-only' or 'unconfirmed'.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    before = page.locator(COMMENT_ITEM_SELECTOR).count()
+    response_ok = False
+    try:
+        with page.expect_response(_comment_create_matcher(), timeout=timeouts.confirm) as response_info:
+            _click_submit(page, container, editor, timeouts)
+        response_ok = response_info.value.ok
+        if not response_ok:
+            print(f"Comment-create request returned HTTP {response_info.value.status}.")
+    except PlaywrightTimeoutError:
+        print("No comment-create response seen before the timeout.")
+
+    snippet = (comment_text or "").strip().splitlines()[0][:60] if (comment_text or "").strip() else ""
+    try:
+        page.wait_for_function(
+            _NEW_COMMENT_JS,
+            arg=[COMMENT_ITEM_SELECTOR, before, snippet],
+            timeout=timeouts.confirm if not response_ok else min(timeouts.confirm, 5000),
+        )
+        in_dom = True
+    except Exception:
+        in_dom = False
+
+    if response_ok and in_dom:
+        return "confirmed"
+    if response_ok:
+        return "response-only"
+    if in_dom:
+        return "dom-only"
+    return "unconfirmed"
+
+
+def post_comment(
+    page,
+    comment_text: str,
+    image: Union[str, dict, None],
+    timer: StepTimer,
+    timeouts: Optional[FlowTimeouts] = None,
+    before_submit: Optional[Callable[[], None]] = None,
+) -> str:
+    """
+    Write and submit a comment (optionally with an image) on the already-open post page,
+    recording composer/upload/fill/submit timings on timer.
+    :param image: Image file path or in-memory file payload (see upload_image), or None.
+    :param before_submit: Called right before the submit click (e.g. to record that a retry is no longer safe).
+    :return: The submit confirmation status (see submit_comment).
+    """
+    timeouts = timeouts or FlowTimeouts.from_env()
+    with timer.step("composer"):
+        editor, container = open_composer(page, timeouts)
+
+    if isinstance(image, dict) or (image and os.path.exists(image)):
+        print(f"Uploading image: {_describe_image(image)}")
+        with timer.step("upload"):
+            upload_image(page, container, image, timeouts)
+    else:
+        print(f"Image not found or path empty: {image}")
+
+    with timer.step("fill"):
+        fill_comment(page, comment_text)
+
+    print("Submitting comment...")
+    if before_submit:
+        before_submit()
+    with timer.step("submit"):
+        status = submit_comment(page, container, editor, comment_text, timeouts)
+    timer.count(f"comments_{status.replace('-', '_')}")
+    print(f"Comment submit status: {status}")
+    return status
@@ -0,0 +1,292 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .config import bool_env
+from .timing import count
+
+
+def parse_model_list(model: str) -> List[str]:
+    """
+    Split a model spec such as 'ollama:phi4,gpt-4o-mini' into model ids, keeping order and dropping repeats.
+    """
+    models: List[str] = []
+    for part in str(model).split(","):
+        part = part.strip()
+        if part and part not in models:
+            models.append(part)
+    return models
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class _BackendStats:
+    """
+    Rolling window of recent outcomes for one model: latency of successful calls and an error flag per call.
+    """
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.hedges = 0
+
+    def record(self, seconds: float, ok: bool):
+        self.requests += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(seconds)
+        else:
+            self.errors += 1
+
+    def p95(self, min_samples: int) -> Optional[float]:
+        if len(self.latencies) < min_samples:
+            return None
+        return _percentile(list(self.latencies), 95)
+
+    def error_rate(self) -> float:
+        return round(self.outcomes.count(False) / len(self.outcomes), 3) if self.outcomes else 0.0
+
+    def snapshot(self, min_samples: int) -> dict:
+        p95 = self.p95(min_samples)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate(),
+            "p50_ms": round(_percentile(list(self.latencies), 50) * 1000, 1) if self.latencies else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "wins": self.wins,
+            "hedges_started": self.hedges,
+        }
+
+
+@dataclass
+class RouteResult:
+    """
+    Which model answered a routed call, after how long, and what else was tried.
+    attempts holds (model, seconds, outcome) with outcome 'won', 'invalid', 'error' or 'abandoned'.
+    cached marks a result served from a cache, where model is the one that originally answered.
+    """
+    model: str
+    seconds: float
+    hedged: bool = False
+    fallback: bool = False
+    attempts: List[Tuple[str, float, str]] = field(default_factory=list)
+    cached: bool = False
+
+    def describe(self) -> str:
+        if self.cached:
+            return f"{self.model} (cached)"
+        text = f"{self.model} in {self.seconds:.2f}s"
+        others = [f"{model} {outcome} {seconds:.2f}s" for model, seconds, outcome in self.attempts if model != self.model]
+        if self.hedged or self.fallback:
+            text += " (" + ("hedged" if self.hedged else "fallback") + (": " + ", ".join(others) if others else "") + ")"
+        return text
+
+
+class ModelRouter:
+    """
+    Routes a call over an ordered list of models. The first healthy model gets the call;
+    if it has not answered by its observed p95 latency, the next model is started as a
+    hedge, and an error or invalid answer starts the next model right away. The first
+    valid answer wins; slower attempts finish in the background and only feed the stats.
+    Models whose recent error rate is too high are tried last.
+
+    Environment variables:
+    - YODAWG_HEDGE_ENABLED: bool, start hedged requests at the p95 (default: true)
+    - YODAWG_HEDGE_DEFAULT_MS: hedge delay until a model has enough samples (default: 5000)
+    - YODAWG_HEDGE_MIN_MS: never hedge earlier than this (default: 250)
+    - YODAWG_HEDGE_MIN_SAMPLES: successful calls needed before the p95 is trusted (default: 5)
+    - YODAWG_ROUTER_WINDOW: calls per model kept for latency and error rates (default: 50)
+    - YODAWG_ROUTER_MAX_ERROR_RATE: error rate above which a model is tried last (default: 0.5)
+    """
+
+    def __init__(self):
+        self.hedge_enabled = bool_env("YODAWG_HEDGE_ENABLED", True)
+        self.hedge_default = float(os.getenv("YODAWG_HEDGE_DEFAULT_MS") or 5000) / 1000.0
+        self.hedge_min = float(os.getenv("YODAWG_HEDGE_MIN_MS") or 250) / 1000.0
+        self.min_samples = int(os.getenv("YODAWG_HEDGE_MIN_SAMPLES") or 5)
+        self.window = int(os.getenv("YODAWG_ROUTER_WINDOW") or 50)
+        self.max_error_rate = float(os.getenv("YODAWG_ROUTER_MAX_ERROR_RATE") or 0.5)
+        self._stats: Dict[str, _BackendStats] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="yodawg-router")
+
+    def _backend(self, model: str) -> _BackendStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = _BackendStats(self.window)
+        return stats
+
+    def order(self, models: List[str]) -> List[str]:
+        """
+        The models in the given order, with any above the error-rate limit moved to the end.
+        """
+        with self._lock:
+            unhealthy = {m for m in models if self._backend(m).error_rate() > self.max_error_rate}
+        return [m for m in models if m not in unhealthy] + [m for m in models if m in unhealthy]
+
+    def hedge_delay(self, model: str) -> float:
+        with self._lock:
+            p95 = self._backend(model).p95(self.min_samples)
+        return max(self.hedge_min, p95 if p95 is not None else self.hedge_default)
+
+    def route(
+        self,
+        models: List[str],
+        call: Callable[[str], str],
+        valid: Callable[[str], bool],
+    ) -> Tuple[str, RouteResult]:
+        """
+        Run call(model) over models until one returns a result that passes valid().
+        If none does, the first result that came back is returned; if every model failed,
+        the first error is raised.
+        """
+        if len(models) <= 1 or not self.hedge_enabled:
+            return self._route_inline(models, call, valid)
+        start = time.perf_counter()
+        pending = self.order(models)
+        running: Dict[Future, Tuple[str, float]] = {}
+        attempts: List[Tuple[str, float, str]] = []
+        fallback_result: Optional[Tuple[str, str]] = None
+        first_error: Optional[BaseException] = None
+        hedged = fallback = False
+
+        def launch():
+            model = pending.pop(0)
+            started = time.perf_counter()
+
+            def run():
+                try:
+                    result = call(model)
+                except BaseException:
+                    self._record(model, time.perf_counter() - started, ok=False)
+                    raise
+                self._record(model, time.perf_counter() - started, ok=valid(result))
+                return result
+
+            # Run in a copy of the caller's context so spans and counters reach the action's timer
+            running[self._executor.submit(contextvars.copy_context().run, run)] = (model, started)
+            return model
+
+        launch()
+        while running:
+            # Only hedge on the newest attempt's p95; earlier ones already had their chance
+            newest_model, newest_start = list(running.values())[-1]
+            timeout = None
+            if pending and self.hedge_enabled:
+                timeout = max(0.0, self.hedge_delay(newest_model) - (time.perf_counter() - newest_start))
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                with self._lock:
+                    self._backend(launch()).hedges += 1
+                continue
+            for future in done:
+                model, started = running.pop(future)
+                seconds = time.perf_counter() - started
+                try:
+                    result = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    attempts.append((model, seconds, "error"))
+                    count("router_model_errors")
+                    if pending:
+                        fallback = True
+                        launch()
+                    continue
+                if valid(result):
+                    attempts.append((model, seconds, "won"))
+                    attempts.extend((m, time.perf_counter() - s, "abandoned") for m, s in running.values())
+                    with self._lock:
+                        self._backend(model).wins += 1
+                    return result, RouteResult(
+                        model, time.perf_counter() - start, hedged=hedged, fallback=fallback, attempts=attempts
+                    )
+                attempts.append((model, seconds, "invalid"))
+                fallback_result = fallback_result or (model, result)
+                if pending:
+                    fallback = True
+                    launch()
+
+        if fallback_result is not None:
+            model, result = fallback_result
+            return result, RouteResult(model, time.perf_counter() - start, hedged=hedged, fallback=fallback, attempts=attempts)
+        raise first_error
+
+    def _route_inline(
+        self,
+        models: List[str],
+        call: Callable[[str], str],
+        valid: Callable[[str], bool],
+    ) -> Tuple[str, RouteResult]:
+        """
+        route() without hedging: the models are tried one after another on the calling thread.
+        """
+        start = time.perf_counter()
+        attempts: List[Tuple[str, float, str]] = []
+        fallback_result: Optional[Tuple[str, str]] = None
+        first_error: Optional[BaseException] = None
+        for model in self.order(models):
+            started = time.perf_counter()
+            try:
+                result = call(model)
+            except Exception as e:
+                seconds = time.perf_counter() - started
+                self._record(model, seconds, ok=False)
+                first_error = first_error or e
+                attempts.append((model, seconds, "error"))
+                count("router_model_errors")
+                continue
+            seconds = time.perf_counter() - started
+            ok = valid(result)
+            self._record(model, seconds, ok=ok)
+            if ok:
+                attempts.append((model, seconds, "won"))
+                with self._lock:
+                    self._backend(model).wins += 1
+                return result, RouteResult(
+                    model, time.perf_counter() - start, fallback=len(attempts) > 1, attempts=attempts
+                )
+            attempts.append((model, seconds, "invalid"))
+            fallback_result = fallback_result or (model, result)
+
+        if fallback_result is not None:
+            model, result = fallback_result
+            return result, RouteResult(model, time.perf_counter() - start, fallback=len(attempts) > 1, attempts=attempts)
+        raise first_error
+
+    def _record(self, model: str, seconds: float, ok: bool):
+        with self._lock:
+            self._backend(model).record(seconds, ok)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {model: stats.snapshot(self.min_samples) for model, stats in self._stats.items()}
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Return the process-wide model router, creating it on first use.
+    """
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
@@ -1,8 +1,50 @@
 
-from pydantic import Field
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field, PrivateAttr
 from sema4ai.actions import Response
 
 
+class TimedResponse(Response):
+    timings: Optional[dict[str, float]] = Field(None, description="Seconds per top-level step of the action, plus the total.")
+    counters: Optional[dict[str, float]] = Field(None, description="Counters recorded during the action, e.g. bytes_uploaded.")
+
+
 class YoDawgResponse(Response):
     caption: str = Field(..., description="The generated Yo Dawg meme caption.")
-    image_filename: str = Field(..., description="The filename of the generated meme image.")
\ No newline at end of file
+    image_filename: str = Field(..., description="The filename of the generated meme image.")
+    image_format: Optional[str] = Field(None, description="Encoded image format (png, jpeg or webp).")
+    image_size_bytes: Optional[int] = Field(None, description="Size of the encoded image file in bytes.")
+    image_width: Optional[int] = Field(None, description="Width of the encoded image in pixels.")
+    image_height: Optional[int] = Field(None, description="Height of the encoded image in pixels.")
+    encode_settings: Optional[str] = Field(None, description="Encoder settings used for the image.")
+    caption_model: Optional[str] = Field(None, description="Model that wrote the caption (the route winner).")
+    caption_route: Optional[str] = Field(None, description="Route taken for the caption: winner, latency, hedges and fallbacks.")
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens of the content before preprocessing.")
+    sent_tokens: Optional[int] = Field(None, description="Estimated tokens of the content sent in the caption prompt.")
+    # The encoded meme in memory (EncodeResult), not part of the action output
+    _encoded: object = PrivateAttr(default=None)
+
+    def image_upload(self) -> Union[dict, str, None]:
+        """
+        What to hand the comment composer: the in-memory file payload when available, else the image path.
+        """
+        payload = self._encoded.upload_payload() if self._encoded is not None else None
+        return payload or self.image_filename or None
+
+    def persist_image(self) -> str:
+        """
+        Wait until the meme is on disk at image_filename (it may still be written in the background) and return it.
+        """
+        return self._encoded.persist() if self._encoded is not None else self.image_filename
+
+
+class BulkCommentPost(BaseModel):
+    post_url: str = Field(..., description="The URL of the LinkedIn post to comment on.")
+    mode: str = Field("poor", description="'poor' overlays the caption on a static template, 'rich' generates a new image.")
+    model: Optional[str] = Field(None, description="Model for this post (default: the action's model).")
+    custom_context: Optional[str] = Field(None, description="Custom context appended to the post content.")
+
+
+class BulkCommentRequest(BaseModel):
+    posts: list[BulkCommentPost] = Field(..., description="Posts to comment on, each with its own mode, optional model and custom context.")
@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .clients import get_client_registry, ollama_base_url
+from .model_router import parse_model_list
+
+
+def ollama_native_url() -> str:
+    """
+    Root of Ollama's native API (OLLAMA_BASE_URL without the OpenAI-compatible /v1 suffix).
+    """
+    base = ollama_base_url().rstrip("/")
+    return base[: -len("/v1")] if base.endswith("/v1") else base
+
+
+def parse_active_hours(spec: str) -> Optional[Tuple[int, int]]:
+    """
+    '8-20' -> (8, 20), local hours with the end exclusive; '22-6' wraps past midnight. Empty means always.
+    """
+    if not spec or not spec.strip():
+        return None
+    start, _, end = spec.strip().partition("-")
+    return int(start) % 24, int(end or 24) % 24
+
+
+def _in_active_hours(hours: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    if hours is None:
+        return True
+    hour = (now or datetime.now()).hour
+    start, end = hours
+    if start == end:
+        return True
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+class OllamaWarmer:
+    """
+    Preloads ollama:<name> caption models so the first caption after idle does not pay for
+    loading the model into memory, keeps them resident with a keep-alive, and re-pings them
+    on a timer during active hours so Ollama does not evict them between requests.
+
+    Models are loaded through Ollama's native /api/generate with an empty prompt, which
+    loads without generating and is the only way to pass keep_alive; servers that only
+    expose the OpenAI-compatible API get a one-token chat completion instead.
+
+    Environment variables:
+    - YODAWG_OLLAMA_WARM_MODELS: comma-separated models to warm, with or without 'ollama:' (default: none)
+    - YODAWG_OLLAMA_WARM_ON_START: bool, warm them and start pinging when the action server starts (default: false)
+    - YODAWG_OLLAMA_KEEP_ALIVE: how long Ollama keeps a warmed model loaded, e.g. '30m' or '-1' (default: 30m)
+    - YODAWG_OLLAMA_PING_SECONDS: re-warm interval while pinging, 0 disables pinging (default: 240)
+    - YODAWG_OLLAMA_ACTIVE_HOURS: local hours to ping in, e.g. '8-20' (default: always)
+    - YODAWG_OLLAMA_WARM_TIMEOUT: seconds to wait for a model to load (default: 300)
+    """
+
+    def __init__(self):
+        self.models = [self._name(m) for m in parse_model_list(os.getenv("YODAWG_OLLAMA_WARM_MODELS") or "")]
+        self.keep_alive = os.getenv("YODAWG_OLLAMA_KEEP_ALIVE") or "30m"
+        self.ping_seconds = float(os.getenv("YODAWG_OLLAMA_PING_SECONDS") or 240)
+        self.active_hours = parse_active_hours(os.getenv("YODAWG_OLLAMA_ACTIVE_HOURS") or "")
+        self.timeout = float(os.getenv("YODAWG_OLLAMA_WARM_TIMEOUT") or 300)
+        self.warmups = 0
+        self.pings = 0
+        self.failures = 0
+        self._last: Dict[str, dict] = {}
+        self._keep_alives: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._pinger: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _name(model: str) -> str:
+        return model.split(":", 1)[1] if model.startswith("ollama:") else model
+
+    def _load(self, name: str, keep_alive: str):
+        import httpx
+
+        try:
+            response = httpx.post(
+                f"{ollama_native_url()}/api/generate",
+                json={"model": name, "prompt": "", "keep_alive": keep_alive, "stream": False},
+                timeout=self.timeout,
+            )
+        except httpx.HTTPError:
+            response = None
+        if response is not None and response.status_code != 404:
+            response.raise_for_status()
+            return "native"
+        # No native API (e.g. behind an OpenAI-only proxy): a one-token completion still loads the model
+        client, model = get_client_registry().for_model(f"ollama:{name}")
+        client.chat.completions.create(model=model, messages=[{"role": "user", "content": "hi"}], max_tokens=1)
+        return "openai"
+
+    def warm(self, models: Optional[List[str]] = None, keep_alive: Optional[str] = None, ping: bool = False) -> Dict[str, dict]:
+        """
+        Load each model (default: the configured ones) and record how long it took. Models
+        warmed here join the ping rotation, which keeps using the keep_alive given here.
+        :return: Per model: ok, seconds, api used or error.
+        """
+        names = [self._name(m) for m in (models or self.models)]
+        with self._lock:
+            self.models.extend(name for name in names if name not in self.models)
+            if keep_alive:
+                self._keep_alives.update((name, keep_alive) for name in names)
+        results = {}
+        for name in names:
+            start = time.perf_counter()
+            try:
+                api = self._load(name, self._keep_alives.get(name, self.keep_alive))
+                result = {"ok": True, "seconds": round(time.perf_counter() - start, 3), "api": api}
+            except Exception as e:
+                result = {"ok": False, "seconds": round(time.perf_counter() - start, 3), "error": f"{type(e).__name__}: {e}"}
+                print(f"Ollama warm-up of {name} failed: {result['error']}")
+            result["at"] = datetime.now().isoformat(timespec="seconds")
+            with self._lock:
+                self.pings += ping
+                self.warmups += not ping
+                self.failures += not result["ok"]
+                self._last[name] = result
+            results[name] = result
+        return results
+
+    def loaded(self) -> Dict[str, dict]:
+        """
+        Models Ollama currently holds in memory (native /api/ps): name -> expires_at, size, size_vram.
+        Empty if the native API is unreachable.
+        """
+        import httpx
+
+        try:
+            response = httpx.get(f"{ollama_native_url()}/api/ps", timeout=5)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return {}
+        return {
+            m.get("name", m.get("model", "?")): {k: m.get(k) for k in ("expires_at", "size", "size_vram")}
+            for m in response.json().get("models", [])
+        }
+
+    def start_pinging(self) -> bool:
+        """
+        Re-warm the configured models every ping_seconds during active hours, on a daemon thread.
+        Returns False if pinging is disabled or there is nothing to ping.
+        """
+        if self.ping_seconds <= 0 or not self.models:
+            return False
+        with self._lock:
+            if self._pinger is not None and self._pinger.is_alive():
+                return True
+            self._stop.clear()
+            self._pinger = threading.Thread(target=self._ping_loop, name="yodawg-ollama-keepalive", daemon=True)
+            self._pinger.start()
+        return True
+
+    def stop_pinging(self):
+        self._stop.set()
+
+    def _ping_loop(self):
+        while not self._stop.wait(self.ping_seconds):
+            if _in_active_hours(self.active_hours):
+                self.warm(ping=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pinging = self._pinger is not None and self._pinger.is_alive()
+            return {
+                "models": ",".join(self.models) or "-",
+                "keep_alive": self.keep_alive,
+                "pinging": pinging,
+                "ping_seconds": self.ping_seconds,
+                "active_hours": "-".join(map(str, self.active_hours)) if self.active_hours else "always",
+                "warmups": self.warmups,
+                "pings": self.pings,
+                "failures": self.failures,
+            }
+
+    def last_warmups(self) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._last)
+
+
+_warmer: Optional[OllamaWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_ollama_warmer() -> OllamaWarmer:
+    """
+    Return the process-wide Ollama warmer, creating it on first use.
+    """
+    global _warmer
+    if _warmer is None:
+        with _warmer_lock:
+            if _warmer is None:
+                _warmer = OllamaWarmer()
+    return _warmer
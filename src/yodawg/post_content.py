@@ -0,0 +1,365 @@
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .caption_cache import default_cache_dir
+from .config import bool_env
+from .sqlite_cache import SQLiteTTLCache
+from .timing import count
+
+FALLBACK_CONTENT = "this post"
+
+# Known locations of the post text, most specific first. Signed-in feed pages use the
+# update-components/feed-shared classes; public post pages use the attributed-text ones.
+POST_CONTENT_SELECTORS = [
+    ".update-components-text",
+    "[data-test-id='main-feed-activity-card'] .feed-shared-text",
+    ".feed-shared-text",
+    ".feed-shared-update-v2__description",
+    "[data-test-id='main-feed-activity-card__commentary']",
+    ".attributed-text-segment-list__content",
+]
+
+# Checks every selector in one pass and returns [selector, text] for the first with text.
+_EXTRACT_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            const text = (el.innerText || el.textContent || '').trim();
+            if (text) return [selector, text];
+        }
+    }
+    return null;
+}
+"""
+
+
+@dataclass(frozen=True)
+class ExtractionResult:
+    text: str
+    strategy: Optional[str]
+    seconds: float
+
+    @property
+    def matched(self) -> bool:
+        return self.strategy is not None
+
+
+# ─────────────────────────────────────────
+# Offline matching against saved HTML snapshots
+# ─────────────────────────────────────────
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_BLOCK_TAGS = {"p", "div", "li", "ul", "ol", "section", "article", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote"}
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["_Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set((attrs.get("class") or "").split())
+        self.children: List = []
+        self.parent = parent
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("#document", {}, None)
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = _Node(tag, {k: v or "" for k, v in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._current = node
+
+    def handle_endtag(self, tag):
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+
+_COMPOUND = re.compile(r"([a-zA-Z][\w-]*)|\.([\w-]+)|\[([\w-]+)(?:=['\"]?([^'\"\]]*)['\"]?)?\]")
+
+
+def _parse_compound(part: str) -> List[Tuple[str, str, Optional[str]]]:
+    tests = []
+    for tag, cls, attr, value in _COMPOUND.findall(part):
+        if tag:
+            tests.append(("tag", tag.lower(), None))
+        elif cls:
+            tests.append(("class", cls, None))
+        else:
+            tests.append(("attr", attr, value if value != "" else None))
+    return tests
+
+
+def _matches(node: _Node, tests) -> bool:
+    for kind, name, value in tests:
+        if kind == "tag" and node.tag != name:
+            return False
+        if kind == "class" and name not in node.classes:
+            return False
+        if kind == "attr" and (name not in node.attrs or (value is not None and node.attrs[name] != value)):
+            return False
+    return True
+
+
+def _iter_elements(node: _Node):
+    for child in node.children:
+        if isinstance(child, _Node):
+            yield child
+            yield from _iter_elements(child)
+
+
+def _select(root: _Node, selector: str) -> List[_Node]:
+    """
+    Minimal CSS matching for the selectors above: tag/.class/[attr='value'] compounds
+    joined by descendant combinators.
+    """
+    chain = [_parse_compound(part) for part in selector.split()]
+    found = []
+    for node in _iter_elements(root):
+        if not _matches(node, chain[-1]):
+            continue
+        ancestor, remaining = node.parent, chain[:-1]
+        while remaining and ancestor is not None:
+            if _matches(ancestor, remaining[-1]):
+                remaining = remaining[:-1]
+            ancestor = ancestor.parent
+        if not remaining:
+            found.append(node)
+    return found
+
+
+def _inner_text(node: _Node) -> str:
+    parts: List[str] = []
+
+    def walk(n):
+        for child in n.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.tag in ("script", "style"):
+                continue
+            elif child.tag == "br":
+                parts.append("\n")
+            else:
+                block = child.tag in _BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                walk(child)
+                if block:
+                    parts.append("\n")
+
+    walk(node)
+    lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def parse_snapshot(html: str) -> _Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _extract_from_tree(root: _Node, selectors: List[str]) -> Optional[Tuple[str, str]]:
+    for selector in selectors:
+        for node in _select(root, selector):
+            text = _inner_text(node)
+            if text:
+                return selector, text
+    return None
+
+
+class PostContentExtractor:
+    """
+    Extracts a post's text in a single in-page evaluation that tries every known
+    selector at once, instead of one locator (and one timeout) per selector.
+    Selectors that matched recently are tried first, and the matching strategy and
+    latency of every extraction are recorded.
+
+    Environment variables:
+    - YODAWG_EXTRACT_TIMEOUT: ms to wait for any known selector to render text (default: 10000)
+    """
+
+    def __init__(self, selectors: Optional[List[str]] = None, decay: float = 0.8):
+        self.selectors = list(selectors or POST_CONTENT_SELECTORS)
+        self.timeout = float(os.getenv("YODAWG_EXTRACT_TIMEOUT") or 10000)
+        self.decay = decay
+        self.scores: Dict[str, float] = {s: 0.0 for s in self.selectors}
+        self.wins: Dict[str, int] = {}
+        self.misses = 0
+        self.last: Optional[ExtractionResult] = None
+        self._lock = threading.Lock()
+
+    def ordered_selectors(self) -> List[str]:
+        """
+        Selectors by recency-weighted wins, ties keeping the built-in order.
+        """
+        with self._lock:
+            return sorted(self.selectors, key=lambda s: -self.scores.get(s, 0.0))
+
+    def _record(self, match: Optional[Tuple[str, str]], start: float) -> ExtractionResult:
+        seconds = time.perf_counter() - start
+        with self._lock:
+            for selector in self.scores:
+                self.scores[selector] *= self.decay
+            if match:
+                self.scores[match[0]] = self.scores.get(match[0], 0.0) + 1.0
+                self.wins[match[0]] = self.wins.get(match[0], 0) + 1
+            else:
+                self.misses += 1
+        if match:
+            result = ExtractionResult(text=match[1], strategy=match[0], seconds=seconds)
+        else:
+            print("Warning: no post content selector matched; falling back to generic content.")
+            result = ExtractionResult(text=FALLBACK_CONTENT, strategy=None, seconds=seconds)
+        self.last = result
+        return result
+
+    def extract(self, page, timeout: Optional[float] = None) -> ExtractionResult:
+        """
+        Extract from a live page, polling in-page until any selector has text or the timeout passes.
+        """
+        start = time.perf_counter()
+        match = None
+        try:
+            handle = page.wait_for_function(
+                _EXTRACT_JS, arg=self.ordered_selectors(), timeout=timeout or self.timeout
+            )
+            match = handle.json_value()
+        except Exception as e:
+            print(f"Post content extraction failed: {(str(e).splitlines() or [type(e).__name__])[0]}")
+        return self._record(tuple(match) if match else None, start)
+
+    def extract_html(self, html: str) -> ExtractionResult:
+        """
+        Extract from a saved HTML snapshot of a post page, without a browser.
+        """
+        start = time.perf_counter()
+        return self._record(_extract_from_tree(parse_snapshot(html), self.ordered_selectors()), start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "wins": dict(self.wins),
+                "misses": self.misses,
+                "order": sorted(self.selectors, key=lambda s: -self.scores.get(s, 0.0)),
+                "last_strategy": self.last.strategy if self.last else None,
+                "last_seconds": round(self.last.seconds, 4) if self.last else None,
+            }
+
+
+_extractor: Optional[PostContentExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_post_content_extractor() -> PostContentExtractor:
+    """
+    Return the process-wide post content extractor, creating it on first use.
+    """
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = PostContentExtractor()
+    return _extractor
+
+
+# ─────────────────────────────────────────
+# Post content cache
+# ─────────────────────────────────────────
+
+_ACTIVITY_ID = re.compile(r"(activity|ugcPost|share)[:-](\d{15,25})")
+
+
+def canonical_post_url(url: str) -> str:
+    """
+    Canonical cache key for a LinkedIn post URL. Feed (/feed/update/urn:li:activity:<id>) and
+    public (/posts/<slug>-activity-<id>-xxxx) URLs of one post map to the same key; otherwise
+    query strings (trk, utm_*, rcm...), fragments and trailing slashes are dropped, and the
+    scheme and host are lowercased (the path keeps its case).
+    """
+    url = (url or "").strip()
+    match = _ACTIVITY_ID.search(url)
+    if match:
+        return f"urn:li:{match.group(1)}:{match.group(2)}"
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host == "linkedin.com":
+        host = "www.linkedin.com"
+    return urlunsplit(("https", host, parts.path.rstrip("/"), "", ""))
+
+
+class PostContentCache(SQLiteTTLCache):
+    """
+    Persistent SQLite cache of scraped post text keyed by canonical post URL, so
+    repeated captions of the same post (previews, comments, retries) skip the browser.
+
+    Environment variables:
+    - YODAWG_POST_CACHE_ENABLED: bool (default: true)
+    - YODAWG_POST_CACHE_PATH: database file (default: <YODAWG_CACHE_DIR>/post_content.sqlite3)
+    - YODAWG_POST_CACHE_TTL: entry lifetime in seconds; posts can be edited (default: 21600, 6 hours)
+    - YODAWG_POST_CACHE_MAX_ENTRIES: least recently used entries are evicted past this (default: 2000)
+    """
+
+    table = "posts"
+    columns = ("url TEXT NOT NULL", "content TEXT NOT NULL", "strategy TEXT")
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        super().__init__(
+            path or os.getenv("YODAWG_POST_CACHE_PATH") or os.path.join(default_cache_dir(), "post_content.sqlite3"),
+            ttl if ttl is not None else int(os.getenv("YODAWG_POST_CACHE_TTL") or 6 * 3600),
+            max_entries or int(os.getenv("YODAWG_POST_CACHE_MAX_ENTRIES") or 2000),
+            enabled=bool_env("YODAWG_POST_CACHE_ENABLED", True),
+        )
+
+    def get(self, post_url: str) -> Optional[str]:
+        """
+        Return the cached post text for a URL, or None on a miss or an expired entry.
+        """
+        if not self.enabled or not post_url:
+            return None
+        row = self._lookup(canonical_post_url(post_url), "content")
+        count("post_cache_hits" if row else "post_cache_misses")
+        return row[0] if row else None
+
+    def put(self, post_url: str, content: str, strategy: Optional[str] = None):
+        if not self.enabled or not post_url or not content:
+            return
+        self._store(canonical_post_url(post_url), url=post_url, content=content, strategy=strategy)
+
+    def invalidate(self, post_url: str):
+        if not self.enabled:
+            return
+        self._delete(canonical_post_url(post_url))
+
+
+_cache: Optional[PostContentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_post_content_cache() -> PostContentCache:
+    """
+    Return the process-wide post content cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PostContentCache()
+    return _cache
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: up to `burst` actions back to back, refilled at
+    `rate_per_minute`. A rate of 0 disables limiting. State lives in memory, so the
+    limit holds per process, not across several action server processes.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if self.rate_per_minute > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_minute / 60.0)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available. Returns 0.0 on success, otherwise the
+        number of seconds until the next token (nothing is taken).
+        """
+        if self.rate_per_minute <= 0:
+            with self._lock:
+                self.acquired += 1
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.acquired += 1
+                return 0.0
+            return (1 - self.tokens) * 60.0 / self.rate_per_minute
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available. Returns the seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                if waited:
+                    with self._lock:
+                        self.waited_seconds += waited
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate_per_minute": self.rate_per_minute,
+                "burst": self.capacity,
+                "tokens": round(self.tokens, 2),
+                "acquired": self.acquired,
+                "waited_seconds": round(self.waited_seconds, 2),
+            }
+
+
+_post_limiter: Optional[TokenBucket] = None
+_post_limiter_lock = threading.Lock()
+
+
+def get_post_rate_limiter() -> TokenBucket:
+    """
+    Return the process-wide limiter that paces bulk and queued comments (and single
+    comments when YODAWG_POST_RATE_LIMIT_SINGLE is set). Each process has its own bucket,
+    so N processes may post up to N times the rate between them.
+
+    Environment variables:
+    - YODAWG_POST_RATE_PER_MINUTE: comments per minute per process, 0 disables (default: 4)
+    - YODAWG_POST_BURST: comments allowed back to back (default: 1)
+    - YODAWG_POST_RATE_LIMIT_SINGLE: bool, also pace single-comment actions (default: false)
+    """
+    global _post_limiter
+    if _post_limiter is None:
+        with _post_limiter_lock:
+            if _post_limiter is None:
+                _post_limiter = TokenBucket(
+                    rate_per_minute=float(os.getenv("YODAWG_POST_RATE_PER_MINUTE") or 4),
+                    burst=int(os.getenv("YODAWG_POST_BURST") or 1),
+                )
+    return _post_limiter
@@ -0,0 +1,252 @@
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Resource types and URL patterns we never need on a post page: the post text and the
+# comment composer work without them. Images stay allowed in the safe profile because
+# the upload preview is detected through a visible <img>.
+BLOCK_PROFILES = {
+    "off": {"types": [], "patterns": []},
+    "safe": {
+        "types": ["media", "font"],
+        "patterns": [
+            r"doubleclick\.net",
+            r"google-analytics\.com",
+            r"googletagmanager\.com",
+            r"px\.ads\.linkedin\.com",
+            r"snap\.licdn\.com/li\.lms-analytics",
+            r"/li/track",
+            r"/sensorCollect",
+            r"/tscp-serving/",
+            r"dms\.licdn\.com/playlist/",
+        ],
+    },
+    "aggressive": {
+        "types": ["media", "font", "image", "imageset", "texttrack", "manifest", "other"],
+        "patterns": [],  # filled from "safe" below
+    },
+}
+BLOCK_PROFILES["aggressive"]["patterns"] = list(BLOCK_PROFILES["safe"]["patterns"])
+
+# Typical transfer sizes used to estimate what a blocked request would have cost,
+# until real responses of that type have been seen.
+_DEFAULT_TYPE_BYTES = {
+    "media": 512 * 1024,
+    "image": 48 * 1024,
+    "imageset": 48 * 1024,
+    "font": 40 * 1024,
+    "script": 30 * 1024,
+    "xhr": 4 * 1024,
+    "fetch": 4 * 1024,
+    "other": 8 * 1024,
+}
+
+
+def _split_env(name: str) -> Optional[List[str]]:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class RequestBlocker:
+    """
+    Route-interception layer for the browser context: aborts requests by resource type
+    or URL pattern, and records per navigation how many requests and (estimated) bytes
+    were blocked and how long the navigation took, so profiles can be compared.
+
+    Environment variables:
+    - YODAWG_BLOCK_PROFILE: off, safe or aggressive (default: safe)
+    - YODAWG_BLOCK_RESOURCE_TYPES: comma-separated resource types, replaces the profile's
+    - YODAWG_BLOCK_URL_PATTERNS: comma-separated regexes, added to the profile's
+    """
+
+    def __init__(self, profile: Optional[str] = None, history: int = 50):
+        self.profile = (profile or os.getenv("YODAWG_BLOCK_PROFILE") or "safe").lower()
+        if self.profile not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown block profile: {self.profile}. Use one of {', '.join(BLOCK_PROFILES)}.")
+        preset = BLOCK_PROFILES[self.profile]
+        types = _split_env("YODAWG_BLOCK_RESOURCE_TYPES")
+        self.resource_types = set(types if types is not None else preset["types"])
+        self.patterns = [re.compile(p) for p in preset["patterns"] + (_split_env("YODAWG_BLOCK_URL_PATTERNS") or [])]
+        self.blocked = 0
+        self.allowed = 0
+        self.navigations = deque(maxlen=history)
+        self._type_bytes: Dict[str, List[int]] = {}
+        self._active: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.patterns)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if url.startswith(("data:", "blob:")):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return any(p.search(url) for p in self.patterns)
+
+    def _estimate_bytes(self, resource_type: str) -> int:
+        seen = self._type_bytes.get(resource_type)
+        if seen:
+            return int(sum(seen) / len(seen))
+        return _DEFAULT_TYPE_BYTES.get(resource_type, _DEFAULT_TYPE_BYTES["other"])
+
+    def _current(self, request) -> Optional[dict]:
+        try:
+            return self._active.get(id(request.frame.page))
+        except Exception:  # service worker requests have no page
+            return None
+
+    def _handle_route(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        if self.should_block(resource_type, request.url):
+            with self._lock:
+                self.blocked += 1
+                current = self._current(request)
+                if current is not None:
+                    current["blocked"] += 1
+                    current["bytes_blocked_estimate"] += self._estimate_bytes(resource_type)
+            route.abort("blockedbyclient")
+            return
+        with self._lock:
+            self.allowed += 1
+        route.continue_()
+
+    def _handle_response(self, response):
+        try:
+            size = int(response.headers.get("content-length") or 0)
+            resource_type = response.request.resource_type
+        except Exception:
+            return
+        with self._lock:
+            if size:
+                seen = self._type_bytes.setdefault(resource_type, [])
+                seen.append(size)
+                del seen[:-50]
+            current = self._current(response.request)
+            if current is not None:
+                current["requests"] += 1
+                current["bytes_loaded"] += size
+
+    def start_navigation(self, page, url: str) -> dict:
+        """
+        Open a navigation record for page; requests the page makes are attributed to it until
+        the page navigates again or is released (finish_navigation), so late-loading media counts.
+        """
+        self.finish_navigation(page)
+        record = {
+            "url": url,
+            "profile": self.profile,
+            "seconds": 0.0,
+            "requests": 0,
+            "blocked": 0,
+            "bytes_loaded": 0,
+            "bytes_blocked_estimate": 0,
+        }
+        with self._lock:
+            self._active[id(page)] = record
+        return record
+
+    def finish_navigation(self, page):
+        with self._lock:
+            record = self._active.pop(id(page), None)
+            if record is None:
+                return
+            # Transfer time of the blocked bytes at the throughput this navigation achieved; an upper
+            # bound on wall-clock savings since requests load in parallel (see avg_seconds_saved_vs_off)
+            loaded = record["bytes_loaded"]
+            record["transfer_seconds_saved_estimate"] = (
+                round(record["seconds"] * record["bytes_blocked_estimate"] / loaded, 3) if loaded else 0.0
+            )
+            self.navigations.append(record)
+
+    def stats(self) -> dict:
+        with self._lock:
+            navigations = list(self.navigations)
+        by_profile: Dict[str, List[dict]] = {}
+        for record in navigations:
+            by_profile.setdefault(record["profile"], []).append(record)
+
+        def avg(records, key):
+            return round(sum(r[key] for r in records) / len(records), 3) if records else 0
+
+        mine = by_profile.get(self.profile, [])
+        baseline = by_profile.get("off", [])
+        result = {
+            "profile": self.profile,
+            "blocked_requests": self.blocked,
+            "allowed_requests": self.allowed,
+            "navigations": len(mine),
+            "avg_navigation_seconds": avg(mine, "seconds"),
+            "avg_bytes_loaded": int(avg(mine, "bytes_loaded")),
+            "avg_bytes_blocked_estimate": int(avg(mine, "bytes_blocked_estimate")),
+            "avg_transfer_seconds_saved_estimate": avg(mine, "transfer_seconds_saved_estimate"),
+        }
+        if baseline and mine and self.profile != "off":
+            # Measured rather than estimated, once navigations with profile 'off' exist in this process
+            result["avg_seconds_saved_vs_off"] = round(avg(baseline, "seconds") - avg(mine, "seconds"), 3)
+        if navigations:
+            result["last_navigation"] = navigations[-1]
+        return result
+
+
+_blocker: Optional[RequestBlocker] = None
+_blocker_lock = threading.Lock()
+
+
+def get_request_blocker() -> RequestBlocker:
+    """
+    Return the process-wide request blocker, creating it on first use.
+    """
+    global _blocker
+    if _blocker is None:
+        with _blocker_lock:
+            if _blocker is None:
+                _blocker = RequestBlocker()
+    return _blocker
+
+
+def set_block_profile(profile: str) -> RequestBlocker:
+    """
+    Replace the process-wide blocker with one using the given profile. A routed context picks
+    it up on its next request; switching between 'off' and a blocking profile needs a fresh
+    context (see install_request_blocking). Navigation history is kept so profiles can be compared.
+    """
+    global _blocker
+    with _blocker_lock:
+        previous = _blocker
+        _blocker = RequestBlocker(profile=profile)
+        if previous is not None:
+            _blocker.navigations.extend(previous.navigations)
+    return _blocker
+
+
+def _route(route):
+    get_request_blocker()._handle_route(route)
+
+
+def _on_response(response):
+    get_request_blocker()._handle_response(response)
+
+
+def finish_navigation(page):
+    """
+    Page release hook: close the page's open navigation record.
+    """
+    get_request_blocker().finish_navigation(page)
+
+
+def install_request_blocking(context):
+    """
+    Context hook: route the requests of a freshly launched context through the current
+    blocker. Route interception disables the browser's HTTP cache, so nothing is routed
+    when the profile blocks nothing; responses are still measured for the stats.
+    """
+    if get_request_blocker().enabled:
+        context.route("**/*", _route)
+    context.on("response", _on_response)
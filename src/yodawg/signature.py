@@ -2,12 +2,7 @@ import os
 from datetime import datetime
 from typing import Optional
 
-
-def _bool_env(name: str, default: bool) -> bool:
-    v = os.getenv(name)
-    if v is None:
-        return default
-    return v.strip().lower() in {"1", "true", "yes", "on"}
+from .config import bool_env
 
 
 def _pick_model_emoji(model: Optional[str]) -> str:
@@ -54,16 +49,16 @@ def build_signature(mode: Optional[str] = None, model: Optional[str] = None) ->
     Placeholders available in SIGNATURE_TEMPLATE:
     {mode} {model} {brand} {url} {timestamp} {date} {time} {emoji_brand} {emoji_model} {hashtags}
     """
-    if not _bool_env("SIGNATURE_ENABLED", True):
+    if not bool_env("SIGNATURE_ENABLED", True):
         return ""
 
     style = (os.getenv("SIGNATURE_STYLE") or "classic").strip().lower()
     brand = os.getenv("SIGNATURE_BRAND") or "Yo Dawg Action Server"
     url = os.getenv("SIGNATURE_URL") or ""
     hashtags = os.getenv("SIGNATURE_HASHTAGS") or ""
-    prefix_nl = _bool_env("SIGNATURE_PREFIX_NEWLINE", True)
+    prefix_nl = bool_env("SIGNATURE_PREFIX_NEWLINE", True)
     max_len = int(os.getenv("SIGNATURE_MAX_LENGTH") or 280)
-    #include_sema4 = _bool_env("SIGNATURE_INCLUDE_SEMA4", True)
+    #include_sema4 = bool_env("SIGNATURE_INCLUDE_SEMA4", True)
     #sema4_label = os.getenv("SIGNATURE_SEMA4_LABEL")
 
     emoji_brand = "🐶"
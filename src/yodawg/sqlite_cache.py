@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Sequence
+
+
+def open_sqlite(path: str, *schema: str) -> sqlite3.Connection:
+    """
+    Open a WAL-mode SQLite database shared by threads (and worker processes), creating its
+    directory and running the given CREATE ... IF NOT EXISTS statements.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in schema:
+        conn.execute(statement)
+    return conn
+
+
+class SQLiteTTLCache:
+    """
+    Base for the persistent key/value caches: one table keyed by key with created_at and
+    last_used_at columns next to the value columns. Entries expire ttl seconds after they
+    were stored (0 keeps them forever) and the least recently used are evicted past
+    max_entries. Subclasses name the table and its value columns.
+    """
+
+    table = ""
+    # Value column definitions, e.g. ("model TEXT NOT NULL", "caption TEXT NOT NULL")
+    columns: Sequence[str] = ()
+
+    def __init__(self, path: str, ttl: int, max_entries: int, enabled: bool = True):
+        self.enabled = enabled
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = open_sqlite(
+                self.path,
+                f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, "
+                + "".join(f"{column}, " for column in self.columns)
+                + "created_at REAL NOT NULL, last_used_at REAL NOT NULL)",
+                f"CREATE INDEX IF NOT EXISTS {self.table}_last_used ON {self.table}(last_used_at)",
+            )
+        return self._conn
+
+    def _lookup(self, key: str, fields: str) -> Optional[tuple]:
+        """
+        The given comma-separated value fields for key, or None on a miss or an expired entry
+        (which is deleted). Counts the hit or miss and marks a hit as recently used.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(f"SELECT created_at, {fields} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[0] > self.ttl):
+                if row is not None:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    conn.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            conn.execute(f"UPDATE {self.table} SET last_used_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[1:]
+
+    def _store(self, key: str, **values):
+        """
+        Store values (column name to value) under key, then drop expired and overflowing entries.
+        """
+        now = time.time()
+        names = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, {names}, created_at, last_used_at)"
+                f" VALUES (?, {placeholders}, ?, ?)",
+                (key, *values.values(), now, now),
+            )
+            if self.ttl:
+                self.evictions += conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,)
+                ).rowcount
+            overflow = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.evictions += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN"
+                    f" (SELECT key FROM {self.table} ORDER BY last_used_at ASC LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+            conn.commit()
+
+    def _delete(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                entries = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
@@ -0,0 +1,290 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .caption_cache import default_cache_dir
+from .config import bool_env
+
+# Histogram buckets in seconds, from a cache-hit caption up to a slow rich-mode image
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_HISTOGRAMS = {
+    "yodawg_action_seconds": "Wall-clock duration of action requests.",
+    "yodawg_step_seconds": "Wall-clock duration of action steps; nested spans are named 'parent.child'.",
+}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _metric_name(counter: str) -> str:
+    name = "".join(c if c.isalnum() else "_" for c in counter.lower())
+    return f"yodawg_{name}_total"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(round(value, 6))
+
+
+class Telemetry:
+    """
+    Exports finished action timers: one JSON line per request in the trace file, and
+    histograms and counters in a Prometheus text file that nginx serves at /metrics.
+    The aggregates are kept in SQLite, so every action-server worker process adds to
+    the same totals and the text file always covers all of them.
+
+    Recording only buffers in memory; a background thread writes the buffered trace
+    lines and aggregates to disk every few seconds (and at exit), so exporting adds no
+    disk I/O to the requests it measures.
+
+    Environment variables:
+    - YODAWG_TELEMETRY_ENABLED: bool (default: true)
+    - YODAWG_TRACE_PATH: JSONL trace file (default: <YODAWG_CACHE_DIR>/trace.jsonl)
+    - YODAWG_TRACE_MAX_BYTES: the trace is rotated to <path>.1 past this size (default: 50 MB)
+    - YODAWG_METRICS_PATH: Prometheus text file (default: <YODAWG_CACHE_DIR>/metrics.prom)
+    - YODAWG_METRICS_DB: aggregate database (default: <YODAWG_CACHE_DIR>/metrics.sqlite3)
+    - YODAWG_METRICS_FLUSH_SECONDS: how often buffered telemetry is written, 0 writes right away (default: 5)
+    """
+
+    def __init__(
+        self,
+        trace_path: Optional[str] = None,
+        metrics_path: Optional[str] = None,
+        db_path: Optional[str] = None,
+    ):
+        cache_dir = default_cache_dir()
+        self.enabled = bool_env("YODAWG_TELEMETRY_ENABLED", True)
+        self.trace_path = trace_path or os.getenv("YODAWG_TRACE_PATH") or os.path.join(cache_dir, "trace.jsonl")
+        self.trace_max_bytes = int(os.getenv("YODAWG_TRACE_MAX_BYTES") or 50 * 1024 * 1024)
+        self.metrics_path = metrics_path or os.getenv("YODAWG_METRICS_PATH") or os.path.join(cache_dir, "metrics.prom")
+        self.db_path = db_path or os.getenv("YODAWG_METRICS_DB") or os.path.join(cache_dir, "metrics.sqlite3")
+        self.flush_seconds = float(os.getenv("YODAWG_METRICS_FLUSH_SECONDS") or 5)
+        self.requests = 0
+        self.errors = 0
+        self.flushes = 0
+        self._records: List[dict] = []
+        self._samples: Dict[Tuple[str, str, str], float] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        # _lock guards the in-memory buffers; _io_lock serializes the disk writes
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " metric TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL, value REAL NOT NULL,"
+                " PRIMARY KEY (metric, labels, le))"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _observe(samples: List[Tuple[str, str, str, float]], metric: str, labels: str, seconds: float):
+        for bound in SECONDS_BUCKETS:
+            # Zero increments too, so every label set exposes the full bucket ladder
+            samples.append((f"{metric}_bucket", labels, repr(float(bound)), 1 if seconds <= bound else 0))
+        samples.append((f"{metric}_bucket", labels, "+Inf", 1))
+        samples.append((f"{metric}_sum", labels, "", seconds))
+        samples.append((f"{metric}_count", labels, "", 1))
+
+    def _add(self, samples: List[Tuple[str, str, str, float]]):
+        conn = self._connect()
+        conn.executemany(
+            "INSERT INTO samples (metric, labels, le, value) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (metric, labels, le) DO UPDATE SET value = value + excluded.value",
+            samples,
+        )
+        conn.commit()
+
+    def _buffer(self, samples: List[Tuple[str, str, str, float]], record: Optional[dict] = None):
+        with self._lock:
+            if record is not None:
+                self._records.append(record)
+            for metric, labels, le, value in samples:
+                key = (metric, labels, le)
+                self._samples[key] = self._samples.get(key, 0) + value
+            if self._flusher is None:
+                atexit.register(self.flush)
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="yodawg-telemetry", daemon=True)
+                self._flusher.start()
+        if self.flush_seconds <= 0:
+            self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_seconds if self.flush_seconds > 0 else None)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Could not write telemetry: {str(e)}")
+
+    def flush(self):
+        """
+        Write buffered trace lines and aggregates to disk and rewrite the metrics file.
+        """
+        with self._io_lock:
+            with self._lock:
+                records, self._records = self._records, []
+                samples, self._samples = self._samples, {}
+            if not records and not samples:
+                return
+            if records:
+                self._write_trace(records)
+            self._add([(*key, value) for key, value in samples.items()])
+            self._write_metrics()
+            self.flushes += 1
+
+    def record_request(self, timer, error: Optional[BaseException] = None):
+        """
+        Export a finished StepTimer: append its trace record and fold it into the metrics.
+        """
+        if not self.enabled:
+            return
+        seconds = timer.total
+        status = "error" if error is not None else "ok"
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "trace_id": timer.trace_id,
+            "action": timer.action,
+            "status": status,
+            "seconds": round(seconds, 4),
+            "spans": list(timer.spans),
+            "counters": dict(timer.counters),
+            "pid": os.getpid(),
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+
+        samples: List[Tuple[str, str, str, float]] = []
+        self._observe(samples, "yodawg_action_seconds", _labels(action=timer.action, status=status), seconds)
+        for name, step_seconds in timer.steps.items():
+            self._observe(samples, "yodawg_step_seconds", _labels(action=timer.action, step=name), step_seconds)
+        for name, value in timer.counters.items():
+            samples.append((_metric_name(name), _labels(action=timer.action), "", value))
+
+        self._buffer(samples, record)
+        with self._lock:
+            self.requests += 1
+            if error is not None:
+                self.errors += 1
+
+    def incr(self, name: str, value: float = 1, action: str = ""):
+        """
+        Add to a counter outside of any request (e.g. job queue retries).
+        """
+        if not self.enabled:
+            return
+        self._buffer([(_metric_name(name), _labels(action=action), "", value)])
+
+    def _write_trace(self, records: List[dict]):
+        directory = os.path.dirname(self.trace_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            if os.path.getsize(self.trace_path) > self.trace_max_bytes:
+                os.replace(self.trace_path, self.trace_path + ".1")
+        except OSError:
+            pass
+        with open(self.trace_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+
+    def render(self) -> str:
+        """
+        All aggregated metrics in the Prometheus text exposition format, including anything still buffered.
+        """
+        self.flush()
+        with self._io_lock:
+            return self._render()
+
+    def _render(self) -> str:
+        rows = self._connect().execute("SELECT metric, labels, le, value FROM samples").fetchall()
+        families: Dict[str, list] = {}
+        for metric, labels, le, value in rows:
+            family = metric
+            for suffix in ("_bucket", "_sum", "_count"):
+                if metric.endswith(suffix) and metric[: -len(suffix)] in _HISTOGRAMS:
+                    family = metric[: -len(suffix)]
+            families.setdefault(family, []).append((metric, labels, le, value))
+
+        order = {"_bucket": 0, "_sum": 1, "_count": 2}
+        lines = []
+        for family in sorted(families):
+            if family in _HISTOGRAMS:
+                lines.append(f"# HELP {family} {_HISTOGRAMS[family]}")
+                lines.append(f"# TYPE {family} histogram")
+            else:
+                lines.append(f"# HELP {family} Total recorded by actions.")
+                lines.append(f"# TYPE {family} counter")
+
+            def sort_key(row):
+                metric, labels, le, _ = row
+                return labels, order.get(metric[len(family):], 0), float("inf") if le == "+Inf" else float(le or 0)
+
+            for metric, labels, le, value in sorted(families[family], key=sort_key):
+                all_labels = ",".join(part for part in (labels, f'le="{le}"' if le else "") if part)
+                lines.append(f"{metric}{{{all_labels}}} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _write_metrics(self):
+        directory = os.path.dirname(self.metrics_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.metrics_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._render())
+        os.replace(tmp_path, self.metrics_path)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "trace_path": self.trace_path,
+            "metrics_path": self.metrics_path,
+            "requests_recorded": self.requests,
+            "errors_recorded": self.errors,
+            "flush_seconds": self.flush_seconds,
+            "flushes": self.flushes,
+        }
+
+    def clear(self):
+        with self._io_lock:
+            with self._lock:
+                self._records, self._samples = [], {}
+            conn = self._connect()
+            conn.execute("DELETE FROM samples")
+            conn.commit()
+            self._write_metrics()
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """
+    Return the process-wide telemetry exporter, creating it on first use.
+    """
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry()
+    return _telemetry
@@ -0,0 +1,152 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+_PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Name of the classic Xzibit template used by the poor man's mode
+DEFAULT_TEMPLATE = "xzibit"
+
+DEFAULT_TEMPLATES = {
+    DEFAULT_TEMPLATE: os.path.join("templates", "GtGTtP_WIAAHKqP.jpg"),
+}
+
+
+def _resolve_path(path: str) -> str:
+    """
+    Resolve a template path relative to the working directory, falling back to the package root.
+    """
+    if os.path.isabs(path) or os.path.exists(path):
+        return os.path.abspath(path)
+    return os.path.join(_PACKAGE_ROOT, path)
+
+
+class TemplatePool:
+    """
+    Pool of pre-decoded meme templates. Each template is JPEG/PNG-decoded and
+    converted to RGBA once; renders get a private copy of the pristine pixels, so
+    the pool's images are never drawn on.
+
+    Environment variables:
+    - YODAWG_TEMPLATES: extra templates as "name=path,name2=path2"
+    - YODAWG_TEMPLATE_POOL_MAX_BYTES: cap on decoded pixel memory (default: 67108864, 64 MiB).
+      Least recently used templates are dropped past the cap and re-decoded on demand.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or int(os.getenv("YODAWG_TEMPLATE_POOL_MAX_BYTES") or 64 * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._paths: Dict[str, str] = {}
+        self._images: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        for name, path in DEFAULT_TEMPLATES.items():
+            self.register(name, path)
+        for entry in (os.getenv("YODAWG_TEMPLATES") or "").split(","):
+            if "=" in entry:
+                name, path = entry.split("=", 1)
+                self.register(name.strip(), path.strip())
+
+    def register(self, name: str, path: str):
+        """
+        Register (or re-point) a template name to an image file. Decoding happens on warm() or first use.
+        """
+        with self._lock:
+            self._paths[name] = _resolve_path(path)
+            self._drop(name)
+
+    def names(self):
+        return sorted(self._paths)
+
+    def has(self, name: str) -> bool:
+        return name in self._paths
+
+    def path(self, name: str) -> str:
+        if name not in self._paths:
+            raise KeyError(f"Unknown template: {name}")
+        return self._paths[name]
+
+    def _drop(self, name: str):
+        img = self._images.pop(name, None)
+        if img is not None:
+            self._bytes -= len(img.getbands()) * img.width * img.height
+
+    def _load(self, name: str) -> "Image.Image":
+        with self._lock:
+            img = self._images.get(name)
+            if img is not None:
+                self._images.move_to_end(name)
+                self.hits += 1
+                return img
+            self.misses += 1
+            path = self.path(name)
+        from PIL import Image
+
+        with Image.open(path) as src:
+            img = src.convert("RGBA")
+        size = len(img.getbands()) * img.width * img.height
+        with self._lock:
+            if size <= self.max_bytes:
+                self._drop(name)
+                self._images[name] = img
+                self._bytes += size
+                while self._bytes > self.max_bytes and len(self._images) > 1:
+                    self._drop(next(iter(self._images)))
+        return img
+
+    def get(self, name: str) -> "Image.Image":
+        """
+        Return a fresh RGBA copy of a registered template, safe to draw on.
+        """
+        return self._load(name).copy()
+
+    def get_path(self, path: str) -> "Image.Image":
+        """
+        Return a fresh RGBA copy of the template at path, registering it under its path on first use.
+        """
+        name = _resolve_path(path)
+        if name not in self._paths:
+            self.register(name, name)
+        return self.get(name)
+
+    def warm(self):
+        """
+        Decode every registered template up front (skipping ones that fail to load).
+        """
+        for name in self.names():
+            try:
+                self._load(name)
+            except Exception as e:
+                print(f"Could not preload template '{name}': {str(e)}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "loaded": list(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_pool: Optional[TemplatePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_template_pool() -> TemplatePool:
+    """
+    Return the process-wide template pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TemplatePool()
+    return _pool
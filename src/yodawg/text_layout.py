@@ -0,0 +1,195 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .fonts import FontRegistry, get_font_registry
+
+
+# Advance widths are measured once at this size and scaled linearly for others.
+_REFERENCE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class TextLayout:
+    """
+    Line breaks and font size chosen for one caption region.
+    """
+    lines: Tuple[str, ...]
+    font_size: int
+    font_path: Optional[str]
+    line_height: int
+    line_widths: Tuple[int, ...]
+
+    @property
+    def height(self) -> int:
+        return self.line_height * len(self.lines)
+
+
+class TextLayoutEngine:
+    """
+    Fit-to-box caption layout: greedy word wrapping plus a binary search for the
+    largest font size whose wrapped lines fit the region. Candidate sizes are
+    checked against cached per-glyph advance widths; the font is only loaded and
+    measured for the winning size. Finished layouts are cached so re-rendering
+    the same caption on the same template skips layout entirely.
+
+    Environment variables:
+    - YODAWG_LAYOUT_CACHE_SIZE: max number of finished layouts kept (default: 256)
+    """
+
+    def __init__(self, fonts: Optional[FontRegistry] = None, max_entries: Optional[int] = None):
+        self.fonts = fonts or get_font_registry()
+        self.max_entries = max_entries or int(os.getenv("YODAWG_LAYOUT_CACHE_SIZE") or 256)
+        self.hits = 0
+        self.misses = 0
+        self._advances: Dict[Optional[str], Dict[str, float]] = {}
+        self._layouts: "OrderedDict[tuple, TextLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _advance(self, font_path: Optional[str], char: str) -> float:
+        advances = self._advances.setdefault(font_path, {})
+        width = advances.get(char)
+        if width is None:
+            font = self.fonts.get(font_path, _REFERENCE_SIZE)
+            width = advances[char] = font.getlength(char)
+        return width
+
+    def _estimate_width(self, font_path: Optional[str], text: str, size: int) -> float:
+        return sum(self._advance(font_path, c) for c in text) * size / _REFERENCE_SIZE
+
+    def _wrap(self, font_path: Optional[str], words: List[str], size: int, max_width: int, measure=None) -> Optional[List[str]]:
+        """
+        Greedily wrap words into lines no wider than max_width at the given size.
+        Returns None if a single word cannot fit on a line by itself.
+        """
+        measure = measure or (lambda text: self._estimate_width(font_path, text, size))
+        lines: List[str] = []
+        current = ""
+        for word in words:
+            candidate = f"{current} {word}" if current else word
+            if measure(candidate) <= max_width:
+                current = candidate
+                continue
+            if not current or measure(word) > max_width:
+                return None
+            lines.append(current)
+            current = word
+        if current:
+            lines.append(current)
+        return lines
+
+    @staticmethod
+    def _line_height(size: int, line_spacing: float) -> int:
+        return int(round(size * line_spacing))
+
+    def _fits(self, lines: Optional[List[str]], size: int, max_height: int, max_lines: int, line_spacing: float) -> bool:
+        if lines is None or len(lines) > max_lines:
+            return False
+        return len(lines) * self._line_height(size, line_spacing) <= max_height
+
+    def layout(
+        self,
+        text: str,
+        max_width: int,
+        max_height: int,
+        font_path: Optional[str] = None,
+        max_size: int = 80,
+        min_size: int = 12,
+        max_lines: int = 2,
+        line_spacing: float = 1.15,
+    ) -> TextLayout:
+        """
+        Choose line breaks and the largest font size that fits text in a max_width x max_height box.
+        :param text: Caption text for one region.
+        :param max_width: Region width in pixels.
+        :param max_height: Region height in pixels.
+        :param font_path: Font to lay out with (None means the registry's primary font).
+        :param max_size: Largest font size to try.
+        :param min_size: Smallest font size; used even if the text still overflows.
+        :param max_lines: Maximum number of wrapped lines.
+        :param line_spacing: Line height as a multiple of the font size.
+        """
+        font_path = font_path or self.fonts.primary_path()
+        key = (text, font_path, max_width, max_height, max_size, min_size, max_lines, line_spacing)
+        with self._lock:
+            cached = self._layouts.get(key)
+            if cached is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        words = text.split()
+        lo, hi = min_size, max_size
+        best_size, best_lines = min_size, None
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            lines = self._wrap(font_path, words, mid, max_width)
+            if self._fits(lines, mid, max_height, max_lines, line_spacing):
+                best_size, best_lines = mid, lines
+                lo = mid + 1
+            else:
+                hi = mid - 1
+
+        # Advance widths ignore kerning and hinting, so confirm the winner with the
+        # real font and step down until it truly fits.
+        size = best_size
+        while True:
+            font = self.fonts.get(font_path, size)
+            lines = self._wrap(font_path, words, size, max_width, measure=font.getlength)
+            if self._fits(lines, size, max_height, max_lines, line_spacing) or size <= min_size:
+                break
+            size -= 1
+        if lines is None:
+            lines = best_lines or [text]
+
+        widths = []
+        for line in lines:
+            bbox = font.getbbox(line)
+            widths.append(bbox[2] - bbox[0])
+        result = TextLayout(
+            lines=tuple(lines),
+            font_size=size,
+            font_path=font_path,
+            line_height=self._line_height(size, line_spacing),
+            line_widths=tuple(widths),
+        )
+        with self._lock:
+            self._layouts[key] = result
+            while len(self._layouts) > self.max_entries:
+                self._layouts.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached": len(self._layouts),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._layouts.clear()
+            self._advances.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_engine: Optional[TextLayoutEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_layout_engine() -> TextLayoutEngine:
+    """
+    Return the process-wide text layout engine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TextLayoutEngine()
+    return _engine
@@ -0,0 +1,134 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# The timer and step path code is currently running under, so nested helpers (caption
+# generation, image encoding, ...) can add spans and counters without a timer argument.
+_active: ContextVar[Optional[Tuple["StepTimer", str]]] = ContextVar("yodawg_active_step", default=None)
+
+
+class StepTimer:
+    """
+    Records wall-clock time per named step of an action, in the order the steps ran.
+    A step that runs more than once accumulates. Steps opened inside a step are recorded
+    as nested spans ('generate.caption'); counters (cache hits, bytes uploaded, ...) are
+    kept alongside.
+
+    A timer created with an action name is exported when finished: one line in the JSONL
+    trace and aggregated metrics (see telemetry.py).
+    """
+
+    def __init__(self, action: Optional[str] = None):
+        self.action = action
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.steps: Dict[str, float] = {}
+        self.spans: List[dict] = []
+        self.counters: Dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._finished = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name: str):
+        active = _active.get()
+        path = f"{active[1]}.{name}" if active and active[0] is self and active[1] else name
+        token = _active.set((self, path))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _active.reset(token)
+            self.record(path, time.perf_counter() - start, start=start)
+
+    def record(self, name: str, seconds: float, start: Optional[float] = None):
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self._lock:
+            self.steps[name] = self.steps.get(name, 0.0) + seconds
+            self.spans.append({"name": name, "start": round(start - self._start, 4), "seconds": round(seconds, 4)})
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def request(self):
+        """
+        Run an action body under this timer: nested spans and counters attach to it, and it
+        is finished (exported) with status ok or error when the block exits.
+        """
+        token = _active.set((self, ""))
+        try:
+            yield self
+        except BaseException as e:
+            self.finish(error=e)
+            raise
+        else:
+            self.finish()
+        finally:
+            _active.reset(token)
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        Export this timer once (no-op without an action name). Export failures never fail the action.
+        """
+        with self._lock:
+            if self._finished or not self.action:
+                return
+            self._finished = True
+        try:
+            from .telemetry import get_telemetry
+
+            get_telemetry().record_request(self, error=error)
+        except Exception as e:
+            print(f"Could not export timings for {self.action}: {str(e)}")
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Top-level steps and the total, in seconds.
+        """
+        result = {name: round(seconds, 3) for name, seconds in self.steps.items() if "." not in name}
+        result["total"] = round(self.total, 3)
+        return result
+
+    def summary(self) -> str:
+        """
+        One-line breakdown, e.g. 'navigate=0.81s, submit=0.42s, total=1.30s; bytes_uploaded=48213'.
+        """
+        line = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.as_dict().items())
+        if self.counters:
+            line += "; " + ", ".join(f"{name}={_format_count(value)}" for name, value in sorted(self.counters.items()))
+        return line
+
+
+def _format_count(value: float):
+    return int(value) if value == int(value) else round(value, 3)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a block as a nested step of the running action, if there is one.
+    """
+    active = _active.get()
+    if active is None:
+        yield
+    else:
+        with active[0].step(name):
+            yield
+
+
+def count(name: str, value: float = 1):
+    """
+    Add to a counter of the running action, if there is one.
+    """
+    active = _active.get()
+    if active is not None:
+        active[0].count(name, value)
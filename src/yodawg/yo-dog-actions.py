@@ -1,22 +1,35 @@
-from time import sleep
-
-
-from sema4ai.actions import action, Response, ActionError
 import os
-from .image_generation import YoDawgImageGenerator
-from .models import YoDawgResponse
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
 from typing import Optional
-from .signature import build_signature
-
 
-from robocorp import browser
+import dotenv
 from sema4ai.actions import action, Response, ActionError
-import os
+
+# Heavy dependencies (openai, httpx, Pillow, Playwright) load on first use inside these
+# modules, so importing the action package stays cheap; see benchmarks/import_budget.py.
 from .image_generation import YoDawgImageGenerator
-from .models import YoDawgResponse
-import time
-import dotenv
-from typing import Optional
+from .models import BulkCommentPost, BulkCommentRequest, TimedResponse, YoDawgResponse
+from .config import bool_env
+from .signature import build_signature
+from .fonts import get_font_registry
+from .templates import DEFAULT_TEMPLATE, get_template_pool
+from .encoding import EncodeSettings
+from .caption_cache import get_caption_cache
+from .clients import get_client_registry
+from .model_router import get_model_router, parse_model_list
+from .ollama_warmup import get_ollama_warmer, ollama_native_url
+from .browser_session import get_browser_session
+from .linkedin import FlowTimeouts, open_post, post_comment
+from .timing import StepTimer
+from .telemetry import get_telemetry
+from .rate_limit import get_post_rate_limiter
+from .post_content import get_post_content_cache, get_post_content_extractor
+from .job_queue import get_job_queue
+from .image_store import get_image_store
+from .request_blocking import finish_navigation, get_request_blocker, install_request_blocking, set_block_profile
 
 dotenv.load_dotenv()
 
@@ -25,6 +38,79 @@ LINKEDIN_USERNAME = os.getenv("LINKEDIN_USERNAME")
 LINKEDIN_PASSWORD = os.getenv("LINKEDIN_PASSWORD")
 
 
+def _warm_render_assets():
+    """
+    Resolve the meme font fallback chain and decode the meme templates ahead of the first render.
+    """
+    get_font_registry().resolve_chain()
+    get_template_pool().warm()
+
+
+# Both are otherwise loaded on first render. YODAWG_PRELOAD_ASSETS=true warms them in the
+# background at startup, so the first meme is fast without slowing the import down.
+if bool_env("YODAWG_PRELOAD_ASSETS", False):
+    threading.Thread(target=_warm_render_assets, name="yodawg-preload", daemon=True).start()
+
+
+def _warm_ollama_models():
+    """
+    Load the configured Ollama models and keep pinging them (YODAWG_OLLAMA_* settings).
+    """
+    warmer = get_ollama_warmer()
+    warmer.warm()
+    warmer.start_pinging()
+
+
+# Loading a model into Ollama takes far longer than a caption, so pay for it at startup
+if bool_env("YODAWG_OLLAMA_WARM_ON_START", False) and get_ollama_warmer().models:
+    threading.Thread(target=_warm_ollama_models, name="yodawg-ollama-warmup", daemon=True).start()
+
+
+def _encode_settings(output_format: Optional[str] = None) -> EncodeSettings:
+    """
+    Build the output encoder settings from the environment, with an optional per-call format override.
+    """
+    settings = EncodeSettings.from_env(format=output_format or None)
+    if settings.format not in {"png", "jpeg", "jpg", "webp"}:
+        raise ActionError(f"Unsupported output_format: {settings.format}. Use png, jpeg or webp.")
+    return settings
+
+
+def _yo_dawg_response(caption: str, image_path: str, encoded=None, generator=None) -> YoDawgResponse:
+    routing = {}
+    if generator is not None and generator.last_route:
+        routing.update(caption_model=generator.last_route.model, caption_route=generator.last_route.describe())
+    if generator is not None and generator.last_input:
+        routing.update(input_tokens=generator.last_input.original_tokens, sent_tokens=generator.last_input.sent_tokens)
+    if encoded is None:
+        return YoDawgResponse(caption=caption, image_filename=image_path, **routing)
+    response = YoDawgResponse(
+        caption=caption,
+        image_filename=encoded.path,
+        image_format=encoded.format,
+        image_size_bytes=encoded.size_bytes,
+        image_width=encoded.width,
+        image_height=encoded.height,
+        encode_settings=encoded.settings,
+        **routing,
+    )
+    response._encoded = encoded
+    return response
+
+
+def _timed_response(result: str, timer: StepTimer) -> TimedResponse:
+    """
+    Response carrying the timer's step timings and counters as structured fields next to the result text.
+    """
+    return TimedResponse(result=result, timings=timer.as_dict(), counters=dict(timer.counters) or None)
+
+
+def _caption_note(generator: YoDawgImageGenerator) -> str:
+    note = f"; {generator.last_input.describe()}" if generator.last_input else ""
+    if generator.last_route:
+        note += f"; caption route: {generator.last_route.describe()}"
+    return note
+
 
 # ─────────────────────────────────────────
 # New action: Overlay Yo Dawg quote on a static image
@@ -33,56 +119,69 @@ LINKEDIN_PASSWORD = os.getenv("LINKEDIN_PASSWORD")
 
 
 @action
-def set_browser_context(headless_mode: bool = True) -> Response:
+def set_browser_context(headless_mode: bool = True, block_profile: Optional[str] = None) -> Response:
     """
-    Logs into LinkedIn, pauses for a specified number of seconds, and returns a Response indicating login success.
+    Logs into LinkedIn in the shared warm browser session, which later comment actions reuse.
     :param headless_mode: Whether to run the browser in headless mode (default: True).
+    :param block_profile: Optional request blocking profile for post pages: off, safe or aggressive
+        (default: keep the current one, initially YODAWG_BLOCK_PROFILE or safe).
     """
-    configure_browser(headless_mode=headless_mode)
-    page = browser.goto("https://www.linkedin.com/login")
     # Fill in username and password using environment variables
     if LINKEDIN_USERNAME is None or LINKEDIN_PASSWORD is None:
-        page.close()
         raise ActionError("LinkedIn credentials are not set in environment variables.")
-    page.get_by_role("textbox", name="Email or phone").fill(LINKEDIN_USERNAME)
-    page.get_by_role("textbox", name="Password").fill(LINKEDIN_PASSWORD)
-    page.get_by_role("button", name="Sign in", exact=True).click()
-    time.sleep(5)  # Wait for login to complete
-
-    page.close()
-    return Response(result=f"LinkedIn login successful.")
+    timer = StepTimer(action="set_browser_context")
+    with timer.request():
+        session = configure_browser(headless_mode=headless_mode, block_profile=block_profile)
+        with timer.step("login"):
+            logged_in = session.login(LINKEDIN_USERNAME, LINKEDIN_PASSWORD, timeout=FlowTimeouts.from_env().login)
+        if not logged_in:
+            raise ActionError("LinkedIn login did not complete (still on the login page).")
+        return _timed_response(f"LinkedIn login successful. Timings: {timer.summary()}", timer)
     
 
 def _overlay_yo_dawg_quote_on_static_image(
     yo_dawg_content: str,
-    static_image_path: str,
+    static_image_path: Optional[str] = None,
     output_path: Optional[str] = None,
-    model: str = None
+    model: str = None,
+    template: str = DEFAULT_TEMPLATE,
+    encode_settings: Optional[EncodeSettings] = None,
+    use_cache: bool = True,
+    force_refresh: bool = False,
+    custom_context: Optional[str] = None
 ) -> YoDawgResponse:
     """
     Overlay a generated Yo Dawg meme caption on a static image.
     :param yo_dawg_content: Content to generate the meme caption from.
-    :param static_image_path: Path to the static image file.
-    :param output_path: Path to save the new meme image (optional, auto-generated if not provided).
+    :param static_image_path: Path to the static image file (optional, overrides template).
+    :param output_path: Path to save the new meme image (optional, stored in the image store if not provided).
     :param model: Model name for caption generation (required).
+    :param template: Name of a pooled template to draw on when no static_image_path is given.
+    :param encode_settings: Output encoder settings (default: from environment).
+    :param use_cache: Serve/store the caption through the persistent caption cache.
+    :param force_refresh: Regenerate the caption even on a cache hit.
+    :param custom_context: Optional custom context appended to the content (kept whole when the content is trimmed).
     """
     if not yo_dawg_content:
         raise ActionError("No content provided for meme caption generation.")
-    if not static_image_path or not os.path.exists(static_image_path):
-        raise ActionError(f"Static image not found: {static_image_path}")
+    if static_image_path:
+        if not os.path.exists(static_image_path):
+            raise ActionError(f"Static image not found: {static_image_path}")
+    elif not get_template_pool().has(template):
+        raise ActionError(f"Unknown meme template: {template}")
     if not model:
         raise ActionError("Parameter 'model' is required and must be provided.")
     generator = YoDawgImageGenerator(model=model)
-    yo_caption = generator.generate_yo_dawg_quote(yo_dawg_content)
+    yo_caption = generator.generate_yo_dawg_quote(
+        yo_dawg_content, use_cache=use_cache, force_refresh=force_refresh, custom_context=custom_context
+    )
     if not yo_caption:
         raise ActionError("Failed to generate Yo Dawg caption.")
-    if not output_path:
-        images_dir = "yo-dawg-images"
-        if not os.path.exists(images_dir):
-            os.makedirs(images_dir)
-        output_path = os.path.join(images_dir, f"yo_dawg_static_{int(time.time())}.png")
-    generator.overlay_quote_on_static_image(yo_caption, static_image_path, output_path)
-    yo_dawg_response = YoDawgResponse(caption=yo_caption, image_filename=output_path)
+    encoded = generator.overlay_quote_on_static_image(
+        yo_caption, static_image_path, output_path,
+        template=None if static_image_path else template, encode_settings=encode_settings
+    )
+    yo_dawg_response = _yo_dawg_response(yo_caption, encoded.path, encoded, generator=generator)
     return yo_dawg_response
 
 # ─────────────────────────────────────────
@@ -92,21 +191,277 @@ def _overlay_yo_dawg_quote_on_static_image(
 def generate_yo_dawg_quote_only(
     yo_dawg_content: str,
     model: str,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False,
+    stream_caption: bool = False,
 ) -> Response:
     """
     Generate only the Yo Dawg meme caption from the provided content, using the specified model.
     :param yo_dawg_content: The content to transform into a Yo Dawg meme caption.
-    :param model: Model name to use for generation. Required.
+    :param model: Model name to use for generation, or an ordered comma-separated list
+        (e.g. 'ollama:phi4,gpt-4o-mini') to route and hedge across. Required.
+    :param use_caption_cache: Reuse a cached caption for the same content and model (default: True).
+    :param refresh_caption: Ignore any cached caption and generate a new one (default: False).
+    :param stream_caption: Stream the completion and stop as soon as both meme lines are in
+        (default: False, or YODAWG_CAPTION_STREAMING).
     """
     if not yo_dawg_content:
         raise ActionError("No content provided for meme caption generation.")
     if not model:
         raise ActionError("Parameter 'model' is required and must be provided.")
-    generator = YoDawgImageGenerator(model=model)
-    yo_caption = generator.generate_yo_dawg_quote(yo_dawg_content)
-    if not yo_caption:
-        raise ActionError("Failed to generate Yo Dawg caption.")
-    return Response(result=yo_caption)
+    timer = StepTimer(action="generate_yo_dawg_quote_only")
+    with timer.request():
+        generator = YoDawgImageGenerator(model=model)
+        with timer.step("generate"):
+            yo_caption = generator.generate_yo_dawg_quote(
+                yo_dawg_content, use_cache=use_caption_cache, force_refresh=refresh_caption, stream=stream_caption or None
+            )
+        if not yo_caption:
+            raise ActionError("Failed to generate Yo Dawg caption.")
+        return _timed_response(f"{yo_caption}\n(Timings: {timer.summary()}{_caption_note(generator)})", timer)
+
+
+@action
+def generate_yo_dawg_quote_from_post(
+    post_url: str,
+    model: str,
+    custom_context: Optional[str] = None,
+    head_mode: bool = True,
+    use_post_cache: bool = True,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False,
+    stream_caption: bool = False,
+) -> Response:
+    """
+    Preview the Yo Dawg caption for a LinkedIn post without commenting. The post text comes
+    from the post content cache when available, so repeat previews never open the browser.
+    :param post_url: The URL of the LinkedIn post.
+    :param model: Model name to use for generation. Required.
+    :param custom_context: Optional custom context appended to the post content.
+    :param head_mode: Whether to run the browser in headless mode if the post must be loaded (default: True).
+    :param use_post_cache: Reuse cached post text for the same post (default: True).
+    :param use_caption_cache: Reuse a cached caption for the same content and model (default: True).
+    :param refresh_caption: Ignore any cached caption and generate a new one (default: False).
+    :param stream_caption: Stream the completion and stop as soon as both meme lines are in (default: False).
+    """
+    if not post_url:
+        raise ActionError("Parameter 'post_url' is required and must be provided.")
+    if not model:
+        raise ActionError("Parameter 'model' is required and must be provided.")
+    timer = StepTimer(action="generate_yo_dawg_quote_from_post")
+    with timer.request():
+        post_content = get_post_content_cache().get(post_url) if use_post_cache else None
+        source = "cache"
+        if post_content is None:
+            source = "browser"
+            session = configure_browser(headless_mode=head_mode)
+            timeouts = FlowTimeouts.from_env()
+            with session.page() as page:
+                with timer.step("navigate"):
+                    open_post(page, post_url, timeouts)
+                with timer.step("extract"):
+                    post_content = get_linkedin_post_content(page, post_url=post_url)
+        generator = YoDawgImageGenerator(model=model)
+        with timer.step("generate"):
+            yo_caption = generator.generate_yo_dawg_quote(
+                post_content, use_cache=use_caption_cache, force_refresh=refresh_caption, stream=stream_caption or None,
+                custom_context=custom_context
+            )
+        if not yo_caption:
+            raise ActionError("Failed to generate Yo Dawg caption.")
+        return _timed_response(f"{yo_caption}\n(post content from {source}; {timer.summary()}{_caption_note(generator)})", timer)
+
+
+@action
+def caption_cache_stats() -> Response:
+    """
+    Report persistent caption and post content cache statistics (entries, hits, misses, evictions, hit rate).
+    """
+    stats = get_caption_cache().stats()
+    posts = get_post_content_cache().stats()
+    return Response(result="\n".join([
+        "captions: " + ", ".join(f"{k}={v}" for k, v in stats.items()),
+        "post content: " + ", ".join(f"{k}={v}" for k, v in posts.items()),
+    ]))
+
+
+@action
+def llm_client_stats() -> Response:
+    """
+    Report connection reuse for the shared LLM clients (requests, new connections, TLS handshakes, reuse rate)
+    and the caption router's rolling view of each model (latency percentiles, error rate, wins, hedges).
+    """
+    stats = get_client_registry().stats()
+    if not stats:
+        return Response(result="No LLM clients created yet.")
+    routes = get_model_router().stats()
+    return Response(result="\n".join(
+        [f"{name}: " + ", ".join(f"{k}={v}" for k, v in values.items()) for name, values in stats.items()]
+        + [f"route {model}: " + ", ".join(f"{k}={v}" for k, v in values.items()) for model, values in routes.items()]
+    ))
+
+
+@action
+def browser_session_stats() -> Response:
+    """
+    Report the warm browser session state (liveness, page checkouts, failures, relaunches, logins, idle pages)
+    and which post content selectors have been matching, plus request blocking savings per navigation.
+    """
+    stats = get_browser_session().stats()
+    extraction = get_post_content_extractor().stats()
+    blocking = get_request_blocker().stats()
+    return Response(result="\n".join([
+        "session: " + ", ".join(f"{k}={v}" for k, v in stats.items()),
+        "post content: " + ", ".join(f"{k}={v}" for k, v in extraction.items()),
+        "request blocking: " + ", ".join(f"{k}={v}" for k, v in blocking.items()),
+    ]))
+
+
+@action
+def yo_dawg_metrics() -> Response:
+    """
+    Return the aggregated action metrics (per-action and per-step latency histograms, cache hits,
+    retries, bytes uploaded) in the Prometheus text format, as nginx serves them at /metrics.
+    Per-request spans are in the JSONL trace file.
+    """
+    telemetry = get_telemetry()
+    if not telemetry.enabled:
+        return Response(result="Telemetry is disabled (YODAWG_TELEMETRY_ENABLED=false).")
+    stats = ", ".join(f"{k}={v}" for k, v in telemetry.stats().items())
+    return Response(result=f"# {stats}\n{telemetry.render()}")
+
+
+@action
+def warm_ollama_models(models: Optional[str] = None, keep_alive: Optional[str] = None, keep_pinging: bool = True) -> Response:
+    """
+    Load Ollama caption models into memory ahead of use, so the next caption skips the cold load.
+    :param models: Comma-separated models, with or without 'ollama:' (default: YODAWG_OLLAMA_WARM_MODELS).
+        Entries without the 'ollama:' prefix in a mixed list (e.g. 'ollama:phi4,gpt-4o-mini') are skipped.
+    :param keep_alive: How long Ollama keeps them loaded, e.g. '30m', '2h' or '-1' for forever
+        (default: YODAWG_OLLAMA_KEEP_ALIVE or 30m).
+    :param keep_pinging: Re-warm them every YODAWG_OLLAMA_PING_SECONDS during YODAWG_OLLAMA_ACTIVE_HOURS (default: True).
+    """
+    warmer = get_ollama_warmer()
+    names = parse_model_list(models or "")
+    if any(name.startswith("ollama:") for name in names):
+        names = [name for name in names if name.startswith("ollama:")]
+    if not names and not warmer.models:
+        raise ActionError("No Ollama models given and YODAWG_OLLAMA_WARM_MODELS is not set.")
+    timer = StepTimer(action="warm_ollama_models")
+    with timer.request():
+        with timer.step("warm"):
+            results = warmer.warm(names or None, keep_alive=keep_alive)
+        pinging = warmer.start_pinging() if keep_pinging else False
+        lines = [
+            f"{name}: " + (f"loaded in {r['seconds']}s via {r['api']} API" if r["ok"] else f"failed after {r['seconds']}s: {r['error']}")
+            for name, r in results.items()
+        ]
+        lines.append(f"keep_alive={keep_alive or warmer.keep_alive}, pinging={pinging}. Timings: {timer.summary()}")
+        if not any(r["ok"] for r in results.values()):
+            raise ActionError("\n".join(lines))
+        return _timed_response("\n".join(lines), timer)
+
+
+@action
+def ollama_model_status() -> Response:
+    """
+    Report which Ollama models are loaded (and until when), the last warm-up latency per model, and the keep-alive pinger state.
+    """
+    warmer = get_ollama_warmer()
+    loaded = warmer.loaded()
+    lines = ["warmer: " + ", ".join(f"{k}={v}" for k, v in warmer.stats().items())]
+    for name, info in loaded.items():
+        lines.append(f"loaded {name}: " + ", ".join(f"{k}={v}" for k, v in info.items()))
+    for name, result in warmer.last_warmups().items():
+        state = "loaded" if name in loaded or f"{name}:latest" in loaded else "not loaded"
+        lines.append(f"last warm-up {name} ({state}): " + ", ".join(f"{k}={v}" for k, v in result.items()))
+    if not loaded:
+        lines.append(f"No models loaded (or Ollama's native API at {ollama_native_url()} is unreachable).")
+    return Response(result="\n".join(lines))
+
+
+@action
+def list_yo_dawg_images(limit: int = 20, mode: Optional[str] = None) -> Response:
+    """
+    List memes in the image store, most recently used first, with caption, model, mode and size.
+    :param limit: Maximum number of memes to list (default: 20).
+    :param mode: Only list memes of one mode: poor (template overlay) or rich (generated image).
+    """
+    if mode and mode not in ("poor", "rich"):
+        raise ActionError(f"Unsupported mode: {mode}. Use poor or rich.")
+    store = get_image_store()
+    images = store.list_images(limit=limit, mode=mode)
+    stats = ", ".join(f"{k}={v}" for k, v in store.stats().items())
+    if not images:
+        return Response(result=f"No memes stored. ({stats})")
+    return Response(result="\n".join([image.describe() for image in images] + [f"({stats})"]))
+
+
+@action
+def prune_yo_dawg_images(
+    max_age_hours: float = 0,
+    max_bytes: int = 0,
+    max_entries: int = 0,
+    remove_untracked: bool = False,
+) -> Response:
+    """
+    Remove memes from the image store now rather than waiting for the quota to be reached.
+    Memes used in the last ten minutes are always kept.
+    :param max_age_hours: Remove memes not used for this many hours (default: 0, no age limit).
+    :param max_bytes: Shrink the store to this size, least recently used first (default: 0, the store quota).
+    :param max_entries: Shrink the store to this many memes (default: 0, the store quota).
+    :param remove_untracked: Also delete store files (<hash>.<ext>) the index does not know,
+        e.g. left behind by a crashed write (default: False).
+    """
+    result = get_image_store().prune(
+        max_age_seconds=max_age_hours * 3600,
+        max_bytes=max_bytes or None,
+        max_entries=max_entries or None,
+        remove_untracked=remove_untracked,
+    )
+    stats = ", ".join(f"{k}={v}" for k, v in get_image_store().stats().items())
+    return Response(result=", ".join(f"{k}={v}" for k, v in result.items()) + f"\n({stats})")
+
+
+@action
+def batch_overlay_yo_dawg_captions(
+    captions: list[str],
+    templates: Optional[list[str]] = None,
+    max_workers: int = 0,
+    output_format: Optional[str] = None,
+) -> Response:
+    """
+    Render many ready-made Yo Dawg captions onto static meme templates in parallel.
+    :param captions: Meme captions, each two lines separated by '|||'.
+    :param templates: Optional template names (or image paths); one for all captions, or one per caption.
+    :param max_workers: Number of worker processes (0 uses YODAWG_BATCH_WORKERS or the CPU count).
+    :param output_format: Optional output format override: png, jpeg or webp (default: YODAWG_OUTPUT_FORMAT).
+    """
+    if not captions:
+        raise ActionError("No captions provided for batch rendering.")
+    lines = []
+    failures = 0
+    timer = StepTimer(action="batch_overlay_yo_dawg_captions")
+    with timer.request():
+        try:
+            with timer.step("render"):
+                for result in YoDawgImageGenerator.overlay_quotes_batch(
+                    captions, templates=templates, max_workers=max_workers or None,
+                    encode_settings=_encode_settings(output_format)
+                ):
+                    if result.error:
+                        failures += 1
+                        line = f"[{result.index}] failed: {result.error}"
+                    else:
+                        timer.count("images_rendered")
+                        timer.count("bytes_rendered", result.size_bytes)
+                        line = f"[{result.index}] {result.output_path} ({result.size_bytes} bytes, {result.seconds:.2f}s)"
+                    print(line)
+                    lines.append(line)
+        except ValueError as e:
+            raise ActionError(str(e))
+        summary = f"Rendered {len(captions) - failures}/{len(captions)} captions. Timings: {timer.summary()}"
+        return _timed_response("\n".join([summary] + lines), timer)
 
 
 @action
@@ -115,7 +470,11 @@ def rich_mans_yo_dawg_comment(
     post_url: Optional[str] = None,
     custom_context: Optional[str] = None,
     append_custom_context: bool = False,
-    head_mode: bool = True
+    head_mode: bool = True,
+    output_format: Optional[str] = None,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False,
+    use_image_cache: bool = True
 ) -> Response:
     """
     Generate and post a Yo Dawg meme comment on LinkedIn by creating a new image.
@@ -127,19 +486,31 @@ def rich_mans_yo_dawg_comment(
     :param post_url: The URL of the LinkedIn post to comment on.
     :param custom_context: Optional custom context string for meme generation.
     :param append_custom_context: If True, append custom context to LinkedIn post content.
-    :param model: Model name for meme caption/image generation (required).
+    :param model: Model name for meme caption/image generation (required). A comma-separated list routes
+        and hedges the caption across models; the image comes from the first OpenAI model in it.
     :param head_mode: Whether to run the browser in headless mode (default: True). Set to False to see the browser UI during execution.
+    :param output_format: Optional image format override before upload: png, jpeg or webp (default: YODAWG_OUTPUT_FORMAT).
+    :param use_caption_cache: Reuse a cached caption for the same content and model (default: True).
+    :param refresh_caption: Ignore any cached caption and generate a new one (default: False).
+    :param use_image_cache: Reuse a cached image for the same caption and model (default: True).
     """
     if not model:
         raise ActionError("Parameter 'model' is required and must be provided.")
-    return _comment_on_linkedin(
-        post_url=post_url,
-        custom_context=custom_context,
-        append_custom_context=append_custom_context,
-        use_rich_man_mode=True,
-        model=model,
-        head_mode=head_mode
-    )
+    timer = StepTimer(action="rich_mans_yo_dawg_comment")
+    with timer.request():
+        return _comment_on_linkedin(
+            post_url=post_url,
+            custom_context=custom_context,
+            append_custom_context=append_custom_context,
+            use_rich_man_mode=True,
+            model=model,
+            head_mode=head_mode,
+            output_format=output_format,
+            use_caption_cache=use_caption_cache,
+            refresh_caption=refresh_caption,
+            use_image_cache=use_image_cache,
+            timer=timer
+        )
 
 
 
@@ -150,7 +521,10 @@ def poor_mans_yo_dawg_comment(
     custom_context: Optional[str] = None,
     append_custom_context: bool = False,
     image_path: Optional[str] = None,
-    head_mode: bool = True
+    head_mode: bool = True,
+    output_format: Optional[str] = None,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False
 ) -> Response:
     """
     Generate and post a Yo Dawg meme comment on LinkedIn by overlaying text on a static image.
@@ -162,22 +536,188 @@ def poor_mans_yo_dawg_comment(
     :param post_url: The URL of the LinkedIn post to comment on.
     :param custom_context: Optional custom context string for meme generation.
     :param append_custom_context: If True, append custom context to LinkedIn post content.
-    :param model: Model name for meme caption generation (supports OpenAI and Ollama). Required.
+    :param model: Model name for meme caption generation (supports OpenAI and Ollama), or an ordered
+        comma-separated list to route and hedge across. Required.
     :param image_path: Optional path to an existing image to post directly, bypassing meme generation.
-    (Uses static image path hardcoded in generator logic.)
+    (Otherwise draws on the pooled default meme template.)
     :param head_mode: Whether to run the browser in headless mode (default: True). Set to False to see the browser UI during execution.
+    :param output_format: Optional image format override before upload: png, jpeg or webp (default: YODAWG_OUTPUT_FORMAT).
+    :param use_caption_cache: Reuse a cached caption for the same content and model (default: True).
+    :param refresh_caption: Ignore any cached caption and generate a new one (default: False).
     """
     if not model:
         raise ActionError("Parameter 'model' is required and must be provided.")
-    return _comment_on_linkedin(
-        post_url=post_url,
-        custom_context=custom_context,
-        append_custom_context=append_custom_context,
-        use_rich_man_mode=False,
-        model=model,
-        image_path=image_path,
-        head_mode=head_mode
+    timer = StepTimer(action="poor_mans_yo_dawg_comment")
+    with timer.request():
+        return _comment_on_linkedin(
+            post_url=post_url,
+            custom_context=custom_context,
+            append_custom_context=append_custom_context,
+            use_rich_man_mode=False,
+            model=model,
+            image_path=image_path,
+            head_mode=head_mode,
+            output_format=output_format,
+            use_caption_cache=use_caption_cache,
+            refresh_caption=refresh_caption,
+            timer=timer
+        )
+
+
+@action
+def bulk_yo_dawg_comment(
+    request: BulkCommentRequest,
+    model: Optional[str] = None,
+    max_tabs: int = 0,
+    head_mode: bool = True,
+    output_format: Optional[str] = None,
+    use_caption_cache: bool = True,
+    use_image_cache: bool = True
+) -> Response:
+    """
+    Comment Yo Dawg memes on many LinkedIn posts. Several tabs of the authenticated session
+    load and scrape posts while captions and images are generated in the background, and
+    posting is paced by the per-process comment rate limit (YODAWG_POST_RATE_PER_MINUTE).
+    :param request: The posts to comment on, each with its own mode ('poor' or 'rich'), optional model and custom context.
+    :param model: Default model for posts that do not name one.
+    :param max_tabs: Posts in flight at once (0 uses YODAWG_BULK_TABS, default 3).
+    :param head_mode: Whether to run the browser in headless mode (default: True).
+    :param output_format: Optional image format override before upload: png, jpeg or webp (default: YODAWG_OUTPUT_FORMAT).
+    :param use_caption_cache: Reuse cached captions for the same content and model (default: True).
+    :param use_image_cache: Reuse cached images for the same caption and model (default: True).
+    """
+    posts = request.posts
+    if not posts:
+        raise ActionError("No posts provided for bulk commenting.")
+    for post in posts:
+        if post.mode not in ("poor", "rich"):
+            raise ActionError(f"Unsupported mode '{post.mode}' for {post.post_url}. Use 'poor' or 'rich'.")
+        if not (post.model or model):
+            raise ActionError(f"No model given for {post.post_url} and no default model set.")
+    max_tabs = max(1, max_tabs or int(os.getenv("YODAWG_BULK_TABS") or 3))
+    lines = _bulk_comment_on_linkedin(
+        posts, model, max_tabs, head_mode, _encode_settings(output_format), use_caption_cache, use_image_cache
     )
+    failures = sum(1 for line in lines if " failed: " in line)
+    summary = f"Commented on {len(posts) - failures}/{len(posts)} posts."
+    return Response(result="\n".join([summary] + lines))
+
+
+@action
+def enqueue_yo_dawg_comments(
+    request: BulkCommentRequest,
+    model: Optional[str] = None,
+    output_format: Optional[str] = None
+) -> Response:
+    """
+    Queue Yo Dawg comments for background processing and return immediately. Jobs survive
+    restarts, each post is commented at most once, and the generate and post stages retry
+    independently. Use yo_dawg_job_status to follow them.
+    :param request: The posts to comment on, each with its own mode ('poor' or 'rich'), optional model and custom context.
+    :param model: Default model for posts that do not name one.
+    :param output_format: Optional image format override before upload: png, jpeg or webp (default: YODAWG_OUTPUT_FORMAT).
+    """
+    posts = request.posts
+    if not posts:
+        raise ActionError("No posts provided to enqueue.")
+    _encode_settings(output_format)  # validate before queueing
+    queue = _job_queue()
+    lines = []
+    for post in posts:
+        if post.mode not in ("poor", "rich"):
+            raise ActionError(f"Unsupported mode '{post.mode}' for {post.post_url}. Use 'poor' or 'rich'.")
+        if not (post.model or model):
+            raise ActionError(f"No model given for {post.post_url} and no default model set.")
+        job, created = queue.enqueue(
+            post.post_url, post.mode, post.model or model, custom_context=post.custom_context,
+            output_format=output_format, post_content=get_post_content_cache().get(post.post_url)
+        )
+        lines.append(f"{job.id} {'queued' if created else 'already ' + job.state} {post.post_url}")
+    return Response(result="\n".join(lines))
+
+
+@action
+def yo_dawg_job_status(job_ids: Optional[list[str]] = None, limit: int = 20) -> Response:
+    """
+    Report queued comment jobs: counts per state, then the given jobs (or the most recently updated ones).
+    :param job_ids: Optional job ids to report on.
+    :param limit: How many recent jobs to list when no job_ids are given (default: 20).
+    """
+    queue = _job_queue()
+    if job_ids:
+        jobs = [queue.get(job_id) for job_id in job_ids]
+        lines = [job.describe() if job else f"{job_id} not found" for job_id, job in zip(job_ids, jobs)]
+    else:
+        lines = [job.describe() for job in queue.list_jobs(limit=limit)]
+    summary = ", ".join(f"{k}={v}" for k, v in queue.stats().items())
+    return Response(result="\n".join([summary] + lines))
+
+
+def _job_queue():
+    """
+    The process-wide job queue with this module's stage handlers, workers started.
+    """
+    queue = get_job_queue()
+    if not queue.running:
+        queue.fetch_handler = _queue_fetch
+        queue.generate_handler = _queue_generate
+        queue.post_handler = _queue_post
+        queue.start()
+    return queue
+
+
+def _prepare_queue_session(session):
+    session.add_context_hook(install_request_blocking)
+    session.add_release_hook(finish_navigation)
+
+
+def _queue_fetch(session, job):
+    timer = StepTimer(action="queue_fetch")
+    with timer.request():
+        timeouts = FlowTimeouts.from_env()
+        _prepare_queue_session(session)
+        with session.page() as page:
+            with timer.step("navigate"):
+                open_post(page, job.post_url, timeouts)
+            with timer.step("auth_check"):
+                session.ensure_authenticated(page, LINKEDIN_USERNAME, LINKEDIN_PASSWORD, timeout=timeouts.login)
+            with timer.step("extract"):
+                result = get_post_content_extractor().extract(page)
+        if not result.matched:
+            raise RuntimeError("No post content found on the page.")
+        get_post_content_cache().put(job.post_url, result.text, result.strategy)
+        return result.text, timer.as_dict()
+
+
+def _queue_generate(job):
+    timer = StepTimer(action="queue_generate")
+    with timer.request():
+        with timer.step("generate"):
+            response = _generate_meme(
+                job.post_content, job.mode == "rich", job.model, _encode_settings(job.output_format),
+                custom_context=job.custom_context
+            )
+        # The post stage reads the meme from disk (possibly in another worker), so finish writing it now
+        return response.caption, response.persist_image(), timer.as_dict()
+
+
+def _queue_post(session, job, before_submit):
+    if not job.image_path or not os.path.exists(job.image_path):
+        raise RuntimeError(f"Generated image is missing: {job.image_path}")
+    timer = StepTimer(action="queue_post")
+    with timer.request():
+        timeouts = FlowTimeouts.from_env()
+        _prepare_queue_session(session)
+        with session.page() as page:
+            with timer.step("navigate"):
+                open_post(page, job.post_url, timeouts)
+            with timer.step("auth_check"):
+                session.ensure_authenticated(page, LINKEDIN_USERNAME, LINKEDIN_PASSWORD, timeout=timeouts.login)
+            with timer.step("rate_limit"):
+                get_post_rate_limiter().acquire()
+            comment_text = build_signature(mode=job.mode, model=job.model)
+            status = post_comment(page, comment_text, job.image_path, timer, timeouts, before_submit=before_submit)
+        return f"commented ({status}) with image: {job.image_path}", timer.as_dict()
 
 
 def _comment_on_linkedin(
@@ -187,13 +727,22 @@ def _comment_on_linkedin(
     use_rich_man_mode: bool,
     model: Optional[str] = None,
     image_path: Optional[str] = None,
-    head_mode: bool = True
+    head_mode: bool = True,
+    output_format: Optional[str] = None,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False,
+    use_image_cache: bool = True,
+    use_post_cache: bool = True,
+    timer: Optional[StepTimer] = None
 ) -> Response:
     """
     Internal function to handle commenting logic for both rich and poor man's versions.
+    Steps are recorded on timer (a fresh StepTimer if not given).
     """
     page = None  # Initialize page to None
     meme_context: Optional[str] = None
+    yo_dawg_response: Optional[YoDawgResponse] = None
+    encode_settings = _encode_settings(output_format)
 
     # Logic for handling inputs
     if image_path:
@@ -214,147 +763,315 @@ def _comment_on_linkedin(
         else:
             raise ActionError("You must provide either post_url, custom_context, or both with append_custom_context=True.")
 
-    # Browser and page handling
+    timer = timer or StepTimer()
+    timeouts = FlowTimeouts.from_env()
+
+    # Known post: build the meme before touching the browser, so the page is held only to post
+    if post_url and not image_path and use_post_cache:
+        post_content = get_post_content_cache().get(post_url)
+        if post_content is not None:
+            print("Using cached post content.")
+            with timer.step("generate"):
+                yo_dawg_response = _generate_meme(
+                    post_content, use_rich_man_mode, model, encode_settings,
+                    use_caption_cache=use_caption_cache, refresh_caption=refresh_caption, use_image_cache=use_image_cache,
+                    custom_context=custom_context if append_custom_context else None
+                )
+            image_path = yo_dawg_response.image_filename
+
+    # Browser and page handling - a pooled page from the warm, authenticated session
+    session = None
     if post_url:
-        configure_browser(headless_mode=head_mode)
-        page = browser.goto(post_url)
+        session = configure_browser(headless_mode=head_mode)
+        page = session.acquire_page()
+        try:
+            with timer.step("navigate"):
+                open_post(page, post_url, timeouts)
+            with timer.step("auth_check"):
+                authenticated = session.ensure_authenticated(
+                    page, LINKEDIN_USERNAME, LINKEDIN_PASSWORD, timeout=timeouts.login
+                )
+            if not authenticated:
+                print("Warning: LinkedIn session does not look authenticated; continuing anyway.")
+        except Exception:
+            session.release_page(page, failed=True)
+            raise
 
+    try:
+        return _generate_and_post(
+            page=page,
+            post_url=post_url,
+            custom_context=custom_context,
+            append_custom_context=append_custom_context,
+            use_rich_man_mode=use_rich_man_mode,
+            meme_context=meme_context,
+            model=model,
+            image_path=image_path,
+            encode_settings=encode_settings,
+            use_caption_cache=use_caption_cache,
+            refresh_caption=refresh_caption,
+            use_image_cache=use_image_cache,
+            timer=timer,
+            timeouts=timeouts,
+            yo_dawg_response=yo_dawg_response
+        )
+    except Exception:
+        if session and page:
+            session.release_page(page, failed=True)
+            page = None
+        raise
+    finally:
+        if session and page:
+            session.release_page(page)
+
+
+def _generate_and_post(
+    page,
+    post_url: Optional[str],
+    custom_context: Optional[str],
+    append_custom_context: bool,
+    use_rich_man_mode: bool,
+    meme_context: Optional[str],
+    model: Optional[str],
+    image_path: Optional[str],
+    encode_settings: EncodeSettings,
+    use_caption_cache: bool,
+    refresh_caption: bool,
+    use_image_cache: bool,
+    timer: StepTimer,
+    timeouts: FlowTimeouts,
+    yo_dawg_response: Optional[YoDawgResponse] = None
+) -> Response:
+    """
+    Generate the meme (unless image_path is given) and post it on the already-open post page,
+    recording each step on timer.
+    """
     # Meme generation if no image_path is provided
     if not image_path:
         if post_url and page:
-            post_content = get_linkedin_post_content(page)
-            if append_custom_context and custom_context:
-                meme_context = f"{post_content}\n\n{custom_context}"
-            else:
-                meme_context = post_content
+            with timer.step("extract"):
+                post_content = get_linkedin_post_content(page, post_url=post_url)
+            meme_context = post_content
         
         if not meme_context:
             raise ActionError("No context available for meme generation.")
 
-        # Generate meme based on mode
-        if use_rich_man_mode:
-            if not model:
-                raise ActionError("Parameter 'model' is required for rich man mode.")
-            yo_dawg_response = yo_dawg_generator(meme_context, model)
-        else:
-            # Hardcode static image path for poor man's mode
-            static_image_path = "templates/GtGTtP_WIAAHKqP.jpg"
-            if not model:
-                raise ActionError("Parameter 'model' is required for poor man mode.")
-            yo_dawg_response = _overlay_yo_dawg_quote_on_static_image(meme_context, static_image_path, model=model)
+        # Generate meme based on mode; appended custom context is kept whole when the post is trimmed
+        with timer.step("generate"):
+            yo_dawg_response = _generate_meme(
+                meme_context, use_rich_man_mode, model, encode_settings,
+                use_caption_cache=use_caption_cache, refresh_caption=refresh_caption, use_image_cache=use_image_cache,
+                custom_context=custom_context if post_url and append_custom_context else None
+            )
         
         image_path = yo_dawg_response.image_filename
 
     # Build signature (always executed, independent of image generation branch)
     mode_str = "rich" if use_rich_man_mode else "poor"
-    comment_text = build_signature(mode=mode_str, model=model)
+    # With a model list, sign with the model that actually wrote the caption
+    signature_model = (yo_dawg_response.caption_model if yo_dawg_response else None) or model
+    comment_text = build_signature(mode=mode_str, model=signature_model)
     
     if post_url and page:
-        # Click on the comment box (disambiguate element to avoid strict-mode errors)
-        try:
-            editor = page.get_by_role("textbox", name="Text editor for creating").first
-            editor.click()
-        except Exception:
-            # Fallback: click the first visible contenteditable region
-            editor = page.locator("[contenteditable='true']").first
-            editor.click()
-        # Small wait to ensure the editor is ready
-        page.wait_for_timeout(300)
-
-        # Find the nearest composer container to scope subsequent actions
-        try:
-            container = editor.locator(
-                "xpath=ancestor::*[contains(@class,'comments-comment-box') or contains(@class,'comments-comment-item')]"
-            ).first
-            # Ensure it's present; if not, fallback to page
-            if container.count() == 0:
-                container = page
-        except Exception:
-            container = page
-
-        # Add image if provided
-        if image_path and os.path.exists(image_path):
-            print(f"Uploading image: {image_path}")
-            try:
-                with page.expect_file_chooser() as fc_info:
-                    container.locator("button[aria-label*='Add a photo'], button[aria-label*='photo']").first.click()
-                file_chooser = fc_info.value
-                file_chooser.set_files(image_path)
-                # Wait for a reasonable preview indicator to appear
-                page.wait_for_selector(
-                    "img[alt*='preview'], img[alt*='Image'], [data-test-media-urn], img[class*='comments-media']",
-                    timeout=15000,
-                )
-                print("Image uploaded and preview is visible.")
-            except Exception as e:
-                print(f"Could not upload image: {str(e)}")
-        else:
-            print(f"Image not found or path empty: {image_path}")
-
-        # Add the comment text (use the same disambiguated locator)
-        try:
-            page.get_by_role("textbox", name="Text editor for creating").first.fill(comment_text)
-        except Exception:
-            page.locator("[contenteditable='true']").first.fill(comment_text)
-
-        # Submit the comment
-        print("Submitting comment...")
-        try:
-            # Prefer submit within the same composer container
-            submit_btn = container.locator(
-                "button.comments-comment-box__submit-button, button[class*='comments-comment-box__submit-button']"
-            ).first
-            submit_btn.wait_for(state="visible", timeout=5000)
-            submit_btn.click()
-        except Exception:
-            # Fallback to Ctrl+Enter in the editor
-            try:
-                editor.press("Control+Enter")
-            except Exception:
-                # Last resort: click any visible submit button on the page
-                page.locator(
-                    "button.comments-comment-box__submit-button, button[class*='comments-comment-box__submit-button']"
-                ).first.click()
-        time.sleep(10)
-        page.close()
+        # Single comments are user-paced; only bulk and queued posting is limited unless opted in
+        if bool_env("YODAWG_POST_RATE_LIMIT_SINGLE", False):
+            with timer.step("rate_limit"):
+                get_post_rate_limiter().acquire()
+        status = post_comment(
+            page, comment_text, yo_dawg_response.image_upload() if yo_dawg_response else image_path, timer, timeouts
+        )
         result_message = f"Commented on post: {post_url}"
         if image_path:
             result_message += f" with image: {image_path}"
         result_message += f" (Generated Yo Dawg meme)"
+        if status != "confirmed":
+            result_message += f" [submit {status}]"
     else:
         result_message = f"Generated Yo Dawg meme with custom context only."
         if image_path:
+            # Nothing was uploaded, so the path handed back has to exist on disk
+            if yo_dawg_response:
+                image_path = yo_dawg_response.persist_image()
             result_message += f" Image: {image_path}"
-    return Response(result=result_message)
+    if yo_dawg_response and yo_dawg_response.image_size_bytes:
+        result_message += f" [{yo_dawg_response.image_size_bytes} bytes, {yo_dawg_response.encode_settings}]"
+    if yo_dawg_response and yo_dawg_response.sent_tokens is not None:
+        result_message += f" Caption input tokens: {yo_dawg_response.input_tokens}->{yo_dawg_response.sent_tokens}."
+    if yo_dawg_response and yo_dawg_response.caption_route:
+        result_message += f" Caption route: {yo_dawg_response.caption_route}."
+    result_message += f" Timings: {timer.summary()}"
+    return _timed_response(result_message, timer)
+
+
+class _BulkJob:
+    def __init__(self, index: int, post: BulkCommentPost, model: str):
+        self.index = index
+        self.post = post
+        self.model = model
+        self.timer = StepTimer(action="bulk_yo_dawg_comment")
+        self.page = None
+        self.response: Optional[YoDawgResponse] = None
+        self.ready_at = 0.0
+
+
+def _bulk_comment_on_linkedin(
+    posts: list,
+    default_model: Optional[str],
+    max_tabs: int,
+    head_mode: bool,
+    encode_settings: EncodeSettings,
+    use_caption_cache: bool,
+    use_image_cache: bool
+) -> list:
+    """
+    Pipeline for bulk_yo_dawg_comment. The browser is only touched from this thread
+    (Playwright's sync API is thread-bound): it fills up to max_tabs tabs with loaded,
+    scraped posts, hands meme generation to a thread pool, and posts finished memes as
+    rate-limit tokens allow. Returns one outcome line per post in completion order.
+    """
+    session = configure_browser(headless_mode=head_mode)
+    limiter = get_post_rate_limiter()
+    timeouts = FlowTimeouts.from_env()
+    queue = deque(_BulkJob(i, post, post.model or default_model) for i, post in enumerate(posts))
+    inflight = {}
+    ready = deque()
+    lines = []
+
+    def finish(job: _BulkJob, status: Optional[str] = None, error: Optional[Exception] = None):
+        if job.page is not None:
+            session.release_page(job.page, failed=error is not None)
+            job.page = None
+        if error is not None:
+            line = f"[{job.index}] {job.post.post_url} failed: {error}"
+        else:
+            line = f"[{job.index}] {job.post.post_url} commented ({status})"
+            if job.response:
+                line += f" with image: {job.response.image_filename}"
+        line += f" Timings: {job.timer.summary()}"
+        job.timer.finish(error=error)
+        print(line)
+        lines.append(line)
 
+    def generate(job: _BulkJob, post_content: str) -> YoDawgResponse:
+        with job.timer.step("generate"):
+            return _generate_meme(
+                post_content, job.post.mode == "rich", job.model, encode_settings,
+                use_caption_cache=use_caption_cache, use_image_cache=use_image_cache,
+                custom_context=job.post.custom_context
+            )
 
-def get_linkedin_post_content(page) -> str:
+    with ThreadPoolExecutor(max_workers=max_tabs) as pool:
+        while queue or inflight or ready:
+            # Load and scrape more posts while there are free tabs
+            while queue and len(inflight) + len(ready) < max_tabs:
+                job = queue.popleft()
+                future = None
+                try:
+                    # A cached post starts generating before its tab has even loaded
+                    post_content = get_post_content_cache().get(job.post.post_url)
+                    if post_content is not None:
+                        future = pool.submit(generate, job, post_content)
+                        inflight[future] = job
+                    job.page = session.acquire_page()
+                    with job.timer.step("navigate"):
+                        open_post(job.page, job.post.post_url, timeouts)
+                    with job.timer.step("auth_check"):
+                        session.ensure_authenticated(job.page, LINKEDIN_USERNAME, LINKEDIN_PASSWORD, timeout=timeouts.login)
+                    if future is None:
+                        with job.timer.step("extract"):
+                            post_content = get_linkedin_post_content(job.page, post_url=job.post.post_url)
+                        future = pool.submit(generate, job, post_content)
+                        inflight[future] = job
+                except Exception as e:
+                    if future is not None:
+                        inflight.pop(future, None)
+                    finish(job, error=e)
+
+            # Post one finished meme if the rate limit allows
+            wait = None
+            if ready:
+                wait = limiter.try_acquire()
+                if wait <= 0:
+                    job = ready.popleft()
+                    job.timer.record("rate_limit", time.perf_counter() - job.ready_at)
+                    try:
+                        comment_text = build_signature(mode=job.post.mode, model=job.response.caption_model or job.model)
+                        status = post_comment(job.page, comment_text, job.response.image_upload(), job.timer, timeouts)
+                        finish(job, status=status)
+                    except Exception as e:
+                        finish(job, error=e)
+                    continue
+
+            # Wait for a generation to finish or the next rate-limit token, whichever comes first
+            if inflight:
+                done, _ = wait_futures(list(inflight), timeout=wait, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = inflight.pop(future)
+                    try:
+                        job.response = future.result()
+                        job.ready_at = time.perf_counter()
+                        ready.append(job)
+                    except Exception as e:
+                        finish(job, error=e)
+            elif wait:
+                time.sleep(wait)
+    return lines
+
+
+def _generate_meme(
+    meme_context: str,
+    use_rich_man_mode: bool,
+    model: Optional[str],
+    encode_settings: EncodeSettings,
+    use_caption_cache: bool = True,
+    refresh_caption: bool = False,
+    use_image_cache: bool = True,
+    custom_context: Optional[str] = None
+) -> YoDawgResponse:
+    """
+    Generate the meme for a context (plus optional custom context appended to it): a new
+    image in rich man's mode, the default template otherwise.
+    """
+    if use_rich_man_mode:
+        if not model:
+            raise ActionError("Parameter 'model' is required for rich man mode.")
+        return yo_dawg_generator(
+            meme_context, model, encode_settings=encode_settings,
+            use_cache=use_caption_cache, force_refresh=refresh_caption, use_image_cache=use_image_cache,
+            custom_context=custom_context
+        )
+    # Poor man's mode draws on the pooled default template
+    if not model:
+        raise ActionError("Parameter 'model' is required for poor man mode.")
+    return _overlay_yo_dawg_quote_on_static_image(
+        meme_context, model=model, template=DEFAULT_TEMPLATE, encode_settings=encode_settings,
+        use_cache=use_caption_cache, force_refresh=refresh_caption, custom_context=custom_context
+    )
+
+
+def get_linkedin_post_content(page, post_url: Optional[str] = None) -> str:
     """
     Get the content text from a LinkedIn post page.
     
     :param page: The browser page object already navigated to the LinkedIn post.
+    :param post_url: When given, a successful extraction is stored in the post content cache.
     :return: The post content as a string.
     """
-    try:
-        # Try to find the main post content - updated selector
-        post_content = page.locator(".update-components-text").first.inner_text()
-        return post_content
-    except Exception as e:
-        # Fallback selectors
-        try:
-            post_content = page.locator("[data-test-id='main-feed-activity-card'] .feed-shared-text").first.inner_text()
-            return post_content
-        except Exception as e2:
-            try:
-                post_content = page.locator(".feed-shared-text").first.inner_text()
-                return post_content
-            except Exception as e3:
-                return "this post"  # fallback content
+    result = get_post_content_extractor().extract(page)
+    print(f"Extracted post content via {result.strategy or 'fallback'} in {result.seconds:.2f}s")
+    if post_url and result.matched:
+        get_post_content_cache().put(post_url, result.text, result.strategy)
+    return result.text
 
 
 def yo_dawg_generator(
     yo_dawg_content: str,
     model: str,
+    encode_settings: Optional[EncodeSettings] = None,
+    use_cache: bool = True,
+    force_refresh: bool = False,
+    use_image_cache: bool = True,
+    custom_context: Optional[str] = None,
 ) -> YoDawgResponse:
     """
     A 'Yo Dawg' action that generates a meme caption and image.
@@ -364,39 +1081,43 @@ def yo_dawg_generator(
             raise ActionError("No content provided for meme generation.")
 
         generator = YoDawgImageGenerator(model=model)
-        yo_caption = generator.generate_yo_dawg_quote(yo_dawg_content)
+        yo_caption = generator.generate_yo_dawg_quote(
+            yo_dawg_content, use_cache=use_cache, force_refresh=force_refresh, custom_context=custom_context
+        )
         if not yo_caption:
             raise ActionError("Failed to generate Yo Dawg caption.")
 
-        images_dir = "yo-dawg-images"
-        if not os.path.exists(images_dir):
-            os.makedirs(images_dir)
-        unique_filename = f"yo_dawg_image_{int(time.time())}.png"
-        image_path = os.path.join(images_dir, unique_filename)
-        generator.generate_image(yo_caption, image_path)
-
-        return YoDawgResponse(caption=yo_caption, image_filename=image_path)
+        # Stored under its content hash in the image store; "" posts the caption without an image
+        encoded = generator.generate_image(yo_caption, encode_settings=encode_settings, use_cache=use_image_cache)
+        return _yo_dawg_response(yo_caption, encoded.path if encoded else "", encoded, generator=generator)
     except Exception as e:
         raise ActionError(f"An error occurred: {str(e)}")
 
 
 
-def configure_browser(headless_mode: bool = True):
-    browser.configure(
-        screenshot="only-on-failure",
-        headless=headless_mode,
-        persistent_context_directory=os.path.join(os.getcwd(), "browser_context"),
-
-    )
-
-
+def configure_browser(headless_mode: bool = True, block_profile: Optional[str] = None):
+    """
+    Configure the shared warm browser session (persistent context in ./browser_context) and return it.
+    Requests of the context go through the request blocker (YODAWG_BLOCK_PROFILE, default 'safe') unless it blocks nothing.
+    :param block_profile: Switch the request blocking profile: off, safe or aggressive.
+    """
+    session = get_browser_session()
+    previous = get_request_blocker()
+    if block_profile and block_profile != previous.profile:
+        try:
+            blocker = set_block_profile(block_profile)
+        except ValueError as e:
+            raise ActionError(str(e))
+        if blocker.enabled != previous.enabled:
+            # Routing is only installed when something is blocked, so relaunch the context
+            session.close()
+    session.configure(headless=headless_mode)
+    session.add_context_hook(install_request_blocking)
+    session.add_release_hook(finish_navigation)
+    return session
 
 
-def _is_authenticated(page):
-    # Try to find an element that only appears when logged in, e.g., the profile avatar or "Me" menu
-    try:
-        # This selector may need adjustment based on LinkedIn's DOM
-        page.get_by_role("navigation").get_by_text("Me", exact=True, timeout=3000)
-        return True
-    except Exception:
-        return False
+# Resume queued comment jobs when the action server starts (opt-in). Only the worker process
+# holding the queue's autostart lock starts pools; the others start theirs when an action uses the queue.
+if bool_env("YODAWG_QUEUE_AUTOSTART", False) and get_job_queue().claim_autostart():
+    _job_queue()
@@ -0,0 +1,54 @@
+"""
+Regenerate the static overlay goldens in this directory with the baseline renderer: the
+draw loop of YoDawgImageGenerator.overlay_quote_on_static_image as of the repository's
+first commit, before the font registry, layout engine and single-pass outline. The font
+is pinned to the bundled Aileron-Regular.ttf (Pillow's default font, CC0) so the goldens
+do not depend on the fonts installed on the machine. Only the caption layer is stored
+(see overlay_cases.text_layer); the test composites it back onto the template.
+
+Usage:
+    python tests/golden/make_overlay_goldens.py [--rev <commit>]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from PIL import Image  # noqa: E402
+
+from overlay_cases import CASES, FONT, TEMPLATE, text_layer  # noqa: E402
+
+
+def baseline_renderer(rev):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:src/yodawg/image_generation.py"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    namespace = {"__file__": os.path.join(ROOT, "src", "yodawg", "image_generation.py"), "__name__": "baseline"}
+    exec(compile(source, "baseline_image_generation.py", "exec"), namespace)
+    return namespace["YoDawgImageGenerator"].overlay_quote_on_static_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rev", default=None, help="Baseline commit (default: the repository's first commit).")
+    args = parser.parse_args()
+    rev = args.rev or subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.split()[0]
+    render = baseline_renderer(rev)
+    template = Image.open(TEMPLATE)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, caption in CASES.items():
+            path = os.path.join(tmp, f"{name}.png")
+            render(None, caption, TEMPLATE, path, font_path=FONT)
+            text_layer(Image.open(path), template).save(os.path.join(HERE, f"{name}.png"), optimize=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import os
+from functools import reduce
+
+from PIL import Image, ImageChops
+
+_TESTS = os.path.dirname(os.path.abspath(__file__))
+
+TEMPLATE = os.path.join(os.path.dirname(_TESTS), "templates", "GtGTtP_WIAAHKqP.jpg")
+FONT = os.path.join(_TESTS, "golden", "Aileron-Regular.ttf")
+
+# Golden name -> caption. Each line fits the template at the largest font size, so the
+# baseline renderer and the layout engine place the text the same way and only the
+# outline rendering is compared.
+CASES = {
+    "overlay_short": "YO DAWG|||so I put a meme in your meme",
+    "overlay_tests": "YO DAWG, I heard you like tests|||so you test while you test",
+    "overlay_clusters": "YO DAWG, I heard you like k8s|||so you kube while you kube!",
+}
+
+
+def text_layer(render: Image.Image, template: Image.Image) -> Image.Image:
+    """
+    The pixels of render that differ from template, transparent elsewhere: the caption
+    layer alone, which is all a golden needs to store (and compresses far better).
+    """
+    render, template = render.convert("RGBA"), template.convert("RGBA")
+    changed = reduce(ImageChops.lighter, ImageChops.difference(render, template).split()[:3])
+    return Image.composite(render, Image.new("RGBA", render.size), changed.point(lambda v: 255 if v else 0))
@@ -0,0 +1,37 @@
+import pytest
+
+from yodawg import caption_input
+from yodawg.caption_input import estimate_tokens, normalize_post_text, prepare_caption_input
+
+
+@pytest.fixture(autouse=True)
+def offline_estimate(monkeypatch):
+    # Exercise the built-in counter even where tiktoken happens to be installed
+    monkeypatch.setattr(caption_input, "_encoder", False)
+
+
+@pytest.mark.parametrize("text", ["½¾ improvement", "Chapter ⅣⅤ", "🚀🚀 launch", "naïve café – déjà vu", "数据平台"])
+def test_estimate_tokens_non_ascii(text):
+    assert estimate_tokens(text) > 0
+
+
+def test_prepare_caption_input_non_ascii():
+    result = prepare_caption_input("Our results: ½¾ improvement #DevOps", budget=400)
+    assert "improvement" in result.text
+    assert "Dev Ops" in result.text
+    assert not result.trimmed
+
+
+def test_mentions_keep_email_addresses():
+    text = normalize_post_text("Mail jo@example.com, thanks @JaneDoe")
+    assert "jo@example.com" in text
+    assert "JaneDoe" in text and "@JaneDoe" not in text
+
+
+def test_custom_context_is_never_trimmed():
+    post = " ".join(f"Sentence {i} about Kubernetes operators." for i in range(60))
+    context = "Roast the YAML, " * 10
+    result = prepare_caption_input(post, budget=80, custom_context=context)
+    assert result.trimmed
+    assert result.text.endswith(context.strip())
+    assert result.sent_tokens < result.original_tokens
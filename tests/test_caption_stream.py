@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from yodawg.caption_stream import stream_caption
+
+
+class FakeStream:
+    def __init__(self, pieces, finish_reason=None):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)])
+            for piece in pieces
+        ]
+        if finish_reason:
+            self.chunks.append(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)])
+            )
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, stream):
+        self.stream = stream
+        self.kwargs = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.kwargs = kwargs
+        return self.stream
+
+
+def test_token_ceiling_is_sent_as_max_tokens():
+    client = FakeClient(FakeStream(["Yo dawg, I heard you like caches", "|||so we cached", " your cache\n", "extra"]))
+    caption, metrics = stream_caption(client, "gpt-4o-mini", "prompt", max_tokens=64)
+    assert client.kwargs["max_tokens"] == 64 and client.kwargs["stream"] is True
+    assert caption == "Yo dawg, I heard you like caches|||so we cached your cache"
+    assert metrics["stopped_early"] and not metrics["hit_token_ceiling"] and metrics["tokens"] == 3
+    assert client.stream.closed
+
+
+def test_server_length_stop_reports_the_ceiling():
+    client = FakeClient(FakeStream(["<think>hmm", " still thinking"], finish_reason="length"))
+    caption, metrics = stream_caption(client, "ollama:qwen3", "prompt", max_tokens=8)
+    assert caption == "" and metrics["hit_token_ceiling"] and not metrics["stopped_early"]
+
+
+def test_chunk_count_backstops_servers_that_ignore_the_limit():
+    client = FakeClient(FakeStream(["word "] * 10))
+    _, metrics = stream_caption(client, "gpt-4o-mini", "prompt", max_tokens=4)
+    assert metrics["tokens"] == 4 and metrics["hit_token_ceiling"]
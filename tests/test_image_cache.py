@@ -0,0 +1,37 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from yodawg.image_cache import ImageCache, image_cache_key
+
+
+def test_lock_files_stay_bounded(tmp_path):
+    cache = ImageCache(directory=str(tmp_path), max_bytes=2000)
+    cache.enabled = True
+    for n in range(40):
+        key = image_cache_key("gpt-image-1", f"prompt {n}")
+        assert cache.get_or_create(key, lambda: b"x" * 200) == b"x" * 200
+    images = [name for name in os.listdir(tmp_path) if name.endswith(".img")]
+    assert sum(os.path.getsize(tmp_path / name) for name in images) <= 2000
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".lock")]
+    assert len(os.listdir(tmp_path / "locks")) <= 40
+
+
+def test_concurrent_misses_share_one_call(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    cache.enabled = True
+    calls = []
+    lock = threading.Lock()
+
+    def producer():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return b"meme"
+
+    key = image_cache_key("gpt-image-1", "same prompt")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: cache.get_or_create(key, producer), range(4)))
+    assert results == [b"meme"] * 4
+    assert len(calls) == 1
@@ -0,0 +1,34 @@
+import os
+from multiprocessing import get_context
+
+from yodawg.image_store import ImageStore
+
+
+def _store_many(directory):
+    store = ImageStore(directory)
+    for n in range(20):
+        store.put(bytes([n % 5]) * 500, ".png")
+    return store.stored
+
+
+def test_put_deduplicates_across_processes(tmp_path):
+    directory = str(tmp_path / "store")
+    with get_context("spawn").Pool(3) as pool:
+        stored = pool.map(_store_many, [directory] * 3)
+    store = ImageStore(directory)
+    images = store.list_images(limit=100)
+    assert sum(stored) == len(images) == 5
+    assert sum(image.uses for image in images) == 60
+
+
+def test_prune_untracked_keeps_foreign_files(tmp_path):
+    store = ImageStore(str(tmp_path))
+    image, created = store.put(b"meme", ".jpg", caption="yo|||dawg")
+    assert created
+    for name in (".gitkeep", "notes.txt", "0123456789abcdef0123456789abcdef.png"):
+        (tmp_path / name).write_bytes(b"")
+    result = store.prune(remove_untracked=True)
+    assert result["untracked_removed"] == 1
+    remaining = set(os.listdir(tmp_path))
+    assert {".gitkeep", "notes.txt", os.path.basename(image.path)} <= remaining
+    assert "0123456789abcdef0123456789abcdef.png" not in remaining
@@ -0,0 +1,47 @@
+import threading
+
+from yodawg.model_router import ModelRouter
+from yodawg.timing import StepTimer, span
+
+
+def _caption(model):
+    with span(f"call_{model}"):
+        if model == "broken":
+            raise RuntimeError("down")
+        return "yo dawg|||so you can"
+
+
+def test_single_model_runs_inline():
+    router = ModelRouter()
+    threads = []
+
+    def call(model):
+        threads.append(threading.current_thread())
+        return _caption(model)
+
+    result, route = router.route(["gpt-4o-mini"], call, lambda r: "|||" in r)
+    assert result == "yo dawg|||so you can" and route.model == "gpt-4o-mini"
+    assert threads == [threading.current_thread()]
+
+
+def test_routed_calls_keep_the_action_timer():
+    router = ModelRouter()
+    router.hedge_enabled = True
+    timer = StepTimer()
+    with timer.request():
+        with timer.step("generate"):
+            result, route = router.route(["broken", "gpt-4o-mini"], _caption, lambda r: "|||" in r)
+    assert route.model == "gpt-4o-mini" and route.fallback
+    assert {"generate.call_broken", "generate.call_gpt-4o-mini"} <= set(timer.steps)
+    assert timer.counters["router_model_errors"] == 1
+
+
+def test_hedging_off_falls_back_in_order():
+    router = ModelRouter()
+    router.hedge_enabled = False
+    timer = StepTimer()
+    with timer.request():
+        result, route = router.route(["broken", "gpt-4o-mini"], _caption, lambda r: "|||" in r)
+    assert route.model == "gpt-4o-mini" and route.fallback
+    assert [outcome for _, _, outcome in route.attempts] == ["error", "won"]
+    assert timer.counters["router_model_errors"] == 1
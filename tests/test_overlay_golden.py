@@ -0,0 +1,32 @@
+import os
+
+import pytest
+from PIL import Image, ImageChops
+
+from overlay_cases import CASES, FONT, TEMPLATE
+from yodawg.encoding import EncodeSettings
+from yodawg.image_generation import render_static_overlay
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# Share of pixels allowed to differ noticeably (any channel by more than 32) from the
+# baseline render: the single-pass stroke antialiases the outline a little differently
+# than the baseline's 9x9 grid of stamped copies, but must not move or resize text
+MAX_DIFF_RATIO = 0.002
+CHANNEL_THRESHOLD = 32
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_overlay_matches_baseline_golden(name, tmp_path):
+    # Lossless output so the diff only sees rendering differences
+    encoded = render_static_overlay(
+        CASES[name], TEMPLATE, str(tmp_path / f"{name}.png"), font_path=FONT,
+        encode_settings=EncodeSettings(format="png", compress_level=1),
+    )
+    template = Image.open(TEMPLATE).convert("RGBA")
+    golden = Image.alpha_composite(template, Image.open(os.path.join(GOLDEN, f"{name}.png")).convert("RGBA"))
+    current = Image.open(encoded.path).convert("RGB")
+    diff = ImageChops.difference(golden.convert("RGB"), current).convert("L")
+    differing = diff.point(lambda v: 255 if v > CHANNEL_THRESHOLD else 0).histogram()[255]
+    ratio = differing / float(current.width * current.height)
+    assert ratio <= MAX_DIFF_RATIO, f"{name}: {ratio:.4%} of pixels differ from the baseline render"
@@ -0,0 +1,32 @@
+import time
+
+from yodawg.caption_cache import CaptionCache
+from yodawg.post_content import PostContentCache, canonical_post_url
+
+
+def test_caption_cache_evicts_least_recently_used(tmp_path):
+    cache = CaptionCache(path=str(tmp_path / "captions.sqlite3"), ttl=0, max_entries=2)
+    cache.enabled = True
+    cache.put("a", "gpt-4o-mini", "yo|||a")
+    cache.put("b", "gpt-4o-mini", "yo|||b")
+    time.sleep(0.01)
+    assert cache.get_entry("a") == ("yo|||a", "gpt-4o-mini")
+    cache.put("c", "ollama:phi4", "yo|||c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "yo|||a" and cache.get("c") == "yo|||c"
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_post_cache_expires_entries(tmp_path):
+    cache = PostContentCache(path=str(tmp_path / "posts.sqlite3"), ttl=60)
+    cache.enabled = True
+    url = "https://www.linkedin.com/posts/someone_yo-dawg-activity-7123456789012345678-AbCd?utm_source=share"
+    cache.put(url, "post text", "feed-shared-text")
+    assert cache.get("https://www.linkedin.com/feed/update/urn:li:activity:7123456789012345678/") == "post text"
+    cache.ttl = 0.001
+    time.sleep(0.01)
+    assert cache.get(url) is None and cache.evictions == 1
+
+
+def test_canonical_post_url_only_lowercases_scheme_and_host():
+    assert canonical_post_url("HTTP://LinkedIn.com/In/SomeOne/?trk=x#top") == "https://www.linkedin.com/In/SomeOne"
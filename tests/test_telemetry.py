@@ -0,0 +1,27 @@
+import os
+
+from yodawg.telemetry import Telemetry
+from yodawg.timing import StepTimer
+
+
+def test_record_request_buffers_until_flush(tmp_path, monkeypatch):
+    monkeypatch.setenv("YODAWG_METRICS_FLUSH_SECONDS", "3600")
+    telemetry = Telemetry(
+        trace_path=str(tmp_path / "trace.jsonl"),
+        metrics_path=str(tmp_path / "metrics.prom"),
+        db_path=str(tmp_path / "metrics.sqlite3"),
+    )
+    telemetry.enabled = True
+    timer = StepTimer(action="unit_test")
+    with timer.step("work"):
+        timer.count("widgets", 3)
+    telemetry.record_request(timer)
+    telemetry.incr("jobs_total", action="unit_test")
+    assert not os.path.exists(tmp_path / "trace.jsonl")
+    assert not os.path.exists(tmp_path / "metrics.prom")
+
+    text = telemetry.render()
+    assert 'yodawg_action_seconds_count{action="unit_test",status="ok"} 1' in text
+    assert "widgets" in text and "jobs_total" in text
+    assert (tmp_path / "trace.jsonl").read_text().count("\n") == 1
+    assert os.path.exists(tmp_path / "metrics.prom")